@@ -0,0 +1,102 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# =============================
+# Startup benchmark
+# =============================
+#
+# Launches the client repeatedly with --exit-after-first-frame and reports
+# time-to-first-frame, measured from process spawn to the STARTUP line, for
+# the legacy path (pygame.init + SysFont), a cold font cache and a warm one.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _run_once(extra_args: List[str], env: Dict[str, str]) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(HERE, "main.py"),
+            "--exit-after-first-frame",
+            "--history",
+            "off",
+        ]
+        + extra_args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env=env,
+        cwd=HERE,
+    )
+    assert proc.stdout is not None
+    result: Dict[str, float] = {}
+    for line in proc.stdout:
+        if line.startswith("STARTUP"):
+            result["wall_ms"] = 1000 * (time.perf_counter() - t0)
+            for kv in line.split()[1:]:
+                k, v = kv.split("=", 1)
+                result[k] = float(v)
+    proc.wait()
+    if "wall_ms" not in result:
+        raise RuntimeError(
+            f"client exited without a first frame (rc={proc.returncode})"
+        )
+    return result
+
+
+def _summary(name: str, runs: List[Dict[str, float]]) -> None:
+    def med(key: str) -> float:
+        return statistics.median(r[key] for r in runs)
+
+    wall = [r["wall_ms"] for r in runs]
+    print(
+        f"{name:<12}{med('wall_ms'):>10.1f}{min(wall):>10.1f}{max(wall):>10.1f}"
+        f"{med('init_ms'):>10.1f}{med('fonts_ms'):>10.1f}{med('first_frame_ms'):>14.1f}"
+    )
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Client time-to-first-frame benchmark")
+    ap.add_argument("-n", "--runs", type=int, default=10)
+    ap.add_argument(
+        "--headless",
+        action="store_true",
+        help="use SDL's dummy video driver (CI / test rigs)",
+    )
+    args = ap.parse_args(argv)
+
+    base_env = dict(os.environ)
+    base_env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    if args.headless:
+        base_env["SDL_VIDEODRIVER"] = "dummy"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = [_run_once(["--legacy-startup"], base_env) for _ in range(args.runs)]
+
+        cold = []
+        for i in range(args.runs):
+            env = dict(base_env, UPS_CLIENT_CACHE=os.path.join(tmp, f"cold{i}"))
+            cold.append(_run_once([], env))
+
+        warm_env = dict(base_env, UPS_CLIENT_CACHE=os.path.join(tmp, "warm"))
+        _run_once([], warm_env)
+        warm = [_run_once([], warm_env) for _ in range(args.runs)]
+
+    print(
+        f"{'mode':<12}{'wall p50':>10}{'min':>10}{'max':>10}"
+        f"{'init':>10}{'fonts':>10}{'in-proc TTFF':>14}   (ms, {args.runs} runs)"
+    )
+    _summary("legacy", legacy)
+    _summary("cold cache", cold)
+    _summary("warm cache", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import statistics
+import threading
+import time
+from queue import Empty
+from typing import List
+
+from mock_server import MockServer
+from network import PROFILES, TcpLineClient
+
+# =============================
+# Transport benchmark
+# =============================
+#
+# Two clients play rounds against the local mock server over loopback and we
+# time REQ_MOVE -> RES_ROUND_RESULT for the second mover, once per transport
+# profile. With --burst the second mover sends a keepalive right before its
+# move (as the UI does when a keepalive timer fires mid-round), which is the
+# small-write pattern Nagle + delayed ACK stalls on.
+
+
+def _expect(client: TcpLineClient, type_desc: str, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"no {type_desc} within {timeout}s")
+        try:
+            msg = client.inbox.get(timeout=left)
+        except Empty:
+            continue
+        if msg.type_desc == type_desc:
+            return
+        if msg.type_desc == "RES_ERROR":
+            raise RuntimeError(f"server error: {'|'.join(msg.params)}")
+
+
+def _run_profile(
+    port: int, profile: str, rounds: int, burst: bool, tag: str
+) -> List[float]:
+    a = TcpLineClient("127.0.0.1", port, profile)
+    b = TcpLineClient("127.0.0.1", port, profile)
+    a.connect()
+    b.connect()
+    try:
+        a.send("REQ_LOGIN", f"{tag}a")
+        _expect(a, "RES_LOGIN_OK")
+        b.send("REQ_LOGIN", f"{tag}b")
+        _expect(b, "RES_LOGIN_OK")
+        a.send("REQ_CREATE_LOBBY", tag)
+        _expect(a, "RES_LOBBY_CREATED")
+        b.send("REQ_JOIN_LOBBY", tag)
+        _expect(a, "RES_GAME_STARTED")
+        _expect(b, "RES_GAME_STARTED")
+
+        samples = []
+        for _ in range(rounds):
+            a.send("REQ_MOVE", "R")
+            # let the first move land so only b's write is on the clock
+            time.sleep(0.002)
+            if burst:
+                b.send("REQ_PONG", "0")
+            t0 = time.perf_counter()
+            b.send("REQ_MOVE", "P")
+            _expect(b, "RES_ROUND_RESULT")
+            samples.append(time.perf_counter() - t0)
+            _expect(a, "RES_ROUND_RESULT")
+        return samples
+    finally:
+        a.close()
+        b.close()
+
+
+def _summary(name: str, samples: List[float]) -> None:
+    ms = sorted(1000 * s for s in samples)
+
+    def pct(q: float) -> float:
+        return ms[min(len(ms) - 1, int(q * len(ms)))]
+
+    print(
+        f"{name:<14}{statistics.mean(ms):>9.3f}{pct(0.50):>9.3f}"
+        f"{pct(0.95):>9.3f}{pct(0.99):>9.3f}{ms[-1]:>9.3f}"
+    )
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Move-to-result latency per profile")
+    ap.add_argument("-n", "--rounds", type=int, default=200)
+    ap.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=sorted(PROFILES),
+        default=sorted(PROFILES),
+    )
+    ap.add_argument(
+        "--no-burst",
+        action="store_true",
+        help="do not send a keepalive right before the timed move",
+    )
+    args = ap.parse_args(argv)
+
+    # Match never ends: every round is a plain move/result exchange
+    srv = MockServer(port=0, wins_needed=10**9, ping_interval=3600.0)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+    results = {}
+    for i, profile in enumerate(args.profiles):
+        results[profile] = _run_profile(
+            srv.port, profile, args.rounds, not args.no_burst, f"bt{i}"
+        )
+    srv.stop()
+
+    print(
+        f"{'profile':<14}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+        f"   (ms, {args.rounds} rounds)"
+    )
+    for profile, samples in results.items():
+        _summary(profile, samples)
+
+
+if __name__ == "__main__":
+    main()
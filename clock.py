@@ -0,0 +1,87 @@
+import math
+import threading
+import time
+
+# =============================
+# Clocks
+# =============================
+#
+# Everything time-driven in the client (TimerService, HeartbeatManager, the
+# main loop's idle wait and frame cap, scene countdowns/animations) reads one
+# clock, so scenario tests and bot simulations can run faster than real time:
+#   SystemClock      time.monotonic (default)
+#   ScaledClock(k)   k× faster than wall-clock; still fine against a live
+#                    server, whose replies just look k× slower
+#   VirtualClock     time moves only on advance() and on waits, which return
+#                    immediately; deterministic, for flows without real I/O
+#                    (a silent server, timeouts, overlays)
+# Clocks are callables returning seconds, so they plug into the existing
+# `clock: Callable[[], float]` parameters.
+
+
+class SystemClock:
+    speed = 1.0
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def __call__(self) -> float:
+        return self.now()
+
+    def wait(self, seconds: float) -> float:
+        """Let `seconds` of clock time pass; returns wall seconds to block."""
+        return max(0.0, seconds)
+
+    def frame(self, fps: float) -> float:
+        """Account for one frame at `fps`; returns the wall FPS cap (0 = none)."""
+        return fps
+
+
+class ScaledClock(SystemClock):
+    def __init__(self, speed: float):
+        if speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        self.speed = speed
+        self._real0 = time.monotonic()
+
+    def now(self) -> float:
+        return self._real0 + (time.monotonic() - self._real0) * self.speed
+
+    def wait(self, seconds: float) -> float:
+        return max(0.0, seconds) / self.speed
+
+    def frame(self, fps: float) -> float:
+        return fps * self.speed
+
+
+class VirtualClock(SystemClock):
+    speed = math.inf
+
+    def __init__(self, start: float = 0.0):
+        self._t = start
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return self._t
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._t += max(0.0, seconds)
+
+    def wait(self, seconds: float) -> float:
+        self.advance(seconds)
+        return 0.0
+
+    def frame(self, fps: float) -> float:
+        if fps > 0:
+            self.advance(1.0 / fps)
+        return 0.0
+
+
+def make_clock(speed: float = 1.0) -> SystemClock:
+    """--time-scale value -> clock (inf = virtual time)."""
+    if math.isinf(speed):
+        return VirtualClock(time.monotonic())
+    if speed == 1.0:
+        return SystemClock()
+    return ScaledClock(speed)
@@ -0,0 +1,194 @@
+import bisect
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+
+from log_buffer import LogBuffer
+
+# =============================
+# Debug console
+# =============================
+#
+# Scrollable, filterable view over the LogBuffer. Only the visible rows are
+# drawn and each row is rendered once (LRU-cached by sequence number), so a
+# frame costs the same after ten lines or a hundred thousand.
+#
+# Filter: a direction (tx/rx/sys/err) or a message type (RES_STATE) uses the
+# log index; anything else is a case-insensitive substring match, kept up to
+# date incrementally (new lines only; typing more narrows the last result).
+#
+# Keys while visible: "/" or Ctrl+F edit the filter (Enter keeps it, Esc
+# clears it), PgUp/PgDn/mouse wheel scroll, Home = oldest, End = follow tail.
+
+ROW_H = 18
+ROW_CACHE_MAX = 256
+WHEEL_ROWS = 3
+
+
+class DebugConsole:
+    def __init__(self, log: LogBuffer):
+        self.log = log
+        self.filter = ""
+        self.editing = False
+        # Rows above the newest match; 0 = follow the tail
+        self.scroll = 0
+        self.rows_visible = 28
+
+        # Substring filter: matching seqs, scanned up to _scanned
+        self._needle = ""
+        self._matches: List[int] = []
+        self._scanned = 0
+
+        self._rows: "OrderedDict[int, pygame.Surface]" = OrderedDict()
+        self._panel: Optional[pygame.Surface] = None
+
+    # --- matching ---
+
+    def _index_key(self) -> Optional[str]:
+        f = self.filter.strip()
+        if not f:
+            return None
+        upper = f.upper()
+        return upper if self.log.indexed(upper) else None
+
+    def matches(self) -> Sequence[int]:
+        """Sequence numbers of lines passing the filter, oldest first."""
+        f = self.filter.strip()
+        if not f:
+            return range(self.log.first, self.log.total)
+        key = self._index_key()
+        if key is not None:
+            return self.log.seqs(key)
+        return self._substring_matches(f.lower())
+
+    def _substring_matches(self, needle: str) -> List[int]:
+        first = self.log.first
+        if needle != self._needle:
+            if self._needle and needle.startswith(self._needle):
+                # Typing more only narrows the previous result
+                self._matches = [
+                    s
+                    for s in self._matches
+                    if s >= first and needle in self.log.line(s).lower()
+                ]
+            else:
+                self._matches = []
+                self._scanned = first
+            self._needle = needle
+
+        # Drop evicted lines, then scan only what arrived since last time
+        cut = bisect.bisect_left(self._matches, first)
+        if cut:
+            del self._matches[:cut]
+        for seq in range(max(self._scanned, first), self.log.total):
+            if needle in self.log.line(seq).lower():
+                self._matches.append(seq)
+        self._scanned = self.log.total
+        return self._matches
+
+    def visible(self) -> Tuple[Sequence[int], int]:
+        """(seqs of the rows on screen, total matches)."""
+        m = self.matches()
+        n = len(m)
+        self.scroll = max(0, min(self.scroll, n - self.rows_visible))
+        end = n - self.scroll
+        start = max(0, end - self.rows_visible)
+        return [m[i] for i in range(start, end)], n
+
+    # --- input ---
+
+    def handle_event(self, e: pygame.event.Event) -> bool:
+        """Console input while visible; True = consumed (not for the scene)."""
+        if e.type == pygame.MOUSEWHEEL:
+            self.scroll += WHEEL_ROWS * e.y
+            return True
+        if e.type != pygame.KEYDOWN or e.key == pygame.K_F1:
+            return False
+
+        if self.editing:
+            if e.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.editing = False
+            elif e.key == pygame.K_ESCAPE:
+                self.filter = ""
+                self.editing = False
+            elif e.key == pygame.K_BACKSPACE:
+                self.filter = self.filter[:-1]
+            elif e.unicode and e.unicode.isprintable():
+                self.filter += e.unicode
+            self.scroll = 0
+            return True
+
+        ctrl = bool(getattr(e, "mod", 0) & pygame.KMOD_CTRL)
+        if e.unicode == "/" or (ctrl and e.key == pygame.K_f):
+            self.editing = True
+            return True
+        if e.key == pygame.K_ESCAPE and self.filter:
+            self.filter = ""
+            self.scroll = 0
+            return True
+        if e.key == pygame.K_PAGEUP:
+            self.scroll += self.rows_visible - 1
+            return True
+        if e.key == pygame.K_PAGEDOWN:
+            self.scroll = max(0, self.scroll - (self.rows_visible - 1))
+            return True
+        if e.key == pygame.K_HOME:
+            self.scroll = len(self.matches())
+            return True
+        if e.key == pygame.K_END:
+            self.scroll = 0
+            return True
+        return False
+
+    # --- drawing ---
+
+    def _row(self, seq: int, font: pygame.font.Font) -> pygame.Surface:
+        img = self._rows.get(seq)
+        if img is None:
+            img = self._rows[seq] = font.render(
+                self.log.line(seq), True, (230, 230, 240)
+            )
+            if len(self._rows) > ROW_CACHE_MAX:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(seq)
+        return img
+
+    def draw(
+        self, screen: pygame.Surface, font: pygame.font.Font, r: pygame.Rect
+    ) -> None:
+        if self._panel is None or self._panel.get_size() != r.size:
+            self._panel = pygame.Surface(r.size, pygame.SRCALPHA)
+            pygame.draw.rect(
+                self._panel, (0, 0, 0, 200), self._panel.get_rect(), border_radius=18
+            )
+            pygame.draw.rect(
+                self._panel,
+                (140, 140, 170, 160),
+                self._panel.get_rect(),
+                width=1,
+                border_radius=18,
+            )
+        screen.blit(self._panel, r.topleft)
+
+        self.rows_visible = max(1, (r.height - 28 - ROW_H) // ROW_H)
+        seqs, n = self.visible()
+
+        cursor = "_" if self.editing else ""
+        where = "tail" if self.scroll == 0 else f"-{self.scroll}"
+        header = (
+            f"filter: {self.filter}{cursor}   {n}/{len(self.log)} lines ({where})"
+            "   / filter  PgUp/PgDn  Home/End"
+        )
+        color = (255, 220, 120) if self.editing or self.filter else (150, 150, 170)
+        screen.blit(font.render(header, True, color), (r.x + 14, r.y + 10))
+
+        y = r.y + 14 + ROW_H
+        screen.blits(
+            [
+                (self._row(s, font), (r.x + 14, y + i * ROW_H))
+                for i, s in enumerate(seqs)
+            ],
+            doreturn=False,
+        )
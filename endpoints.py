@@ -0,0 +1,153 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from queue import Queue
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from metrics import ENDPOINT_PROBE_SECONDS
+from network import apply_profile, get_profile, parse_endpoint
+
+# =============================
+# Endpoint probing
+# =============================
+#
+# Several server instances can be given; each is probed concurrently and the
+# client uses the fastest healthy one. A probe is a bare TCP connect: the
+# handshake is one network round trip, and the protocol has no request a
+# server answers without side effects (REQ_LOGIN would create a player). Probes run on a background thread and hand
+# their ranking to the UI loop through a queue, like TcpLineClient.inbox.
+
+Endpoint = Tuple[str, int]
+
+
+def parse_endpoints(texts: Iterable[str]) -> List[Endpoint]:
+    """Accepts repeated and/or comma-separated HOST:PORT values."""
+    out: List[Endpoint] = []
+    for text in texts:
+        for part in text.split(","):
+            if part.strip():
+                ep = parse_endpoint(part)
+                if ep not in out:
+                    out.append(ep)
+    if not out:
+        raise ValueError("No server endpoint given")
+    return out
+
+
+def format_endpoint(ep: Endpoint) -> str:
+    host, port = ep
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    endpoint: Endpoint
+    connect_s: Optional[float] = None
+    error: str = ""
+
+    @property
+    def healthy(self) -> bool:
+        return not self.error
+
+    @property
+    def total_s(self) -> float:
+        if not self.healthy:
+            return float("inf")
+        return self.connect_s or 0.0
+
+    def __str__(self) -> str:
+        name = format_endpoint(self.endpoint)
+        if not self.healthy:
+            return f"{name} down ({self.error})"
+        return f"{name} {1000 * self.total_s:.2f} ms"
+
+
+def probe_endpoint(
+    ep: Endpoint, timeout: float = 1.5, profile: str = "default"
+) -> ProbeResult:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        apply_profile(s, get_profile(profile))
+        s.settimeout(timeout)
+        t0 = time.perf_counter()
+        s.connect(ep)
+        t1 = time.perf_counter()
+    except OSError as e:
+        return ProbeResult(ep, error=str(e) or type(e).__name__)
+    finally:
+        s.close()
+
+    ENDPOINT_PROBE_SECONDS.labels(format_endpoint(ep)).observe(t1 - t0)
+    return ProbeResult(ep, connect_s=t1 - t0)
+
+
+def rank(results: Iterable[ProbeResult]) -> List[ProbeResult]:
+    """Healthy endpoints fastest first, then the unreachable ones."""
+    return sorted(results, key=lambda r: r.total_s)
+
+
+class EndpointSelector:
+    def __init__(
+        self, endpoints: List[Endpoint], timeout: float = 1.5, profile: str = "default"
+    ):
+        self.endpoints = list(endpoints)
+        self.timeout = timeout
+        self.profile = profile
+
+        # Last ranking applied by the UI thread; empty until the first probe
+        self.ranking: List[ProbeResult] = []
+        # Finished probe rounds (written by the probe thread)
+        self.results: "Queue[List[ProbeResult]]" = Queue()
+        self.wakeup: Optional[Callable[[], None]] = None
+        self._probing = threading.Event()
+
+    @property
+    def probing(self) -> bool:
+        return self._probing.is_set()
+
+    def probe_all(self) -> List[ProbeResult]:
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as pool:
+            return rank(
+                pool.map(
+                    lambda ep: probe_endpoint(ep, self.timeout, self.profile),
+                    self.endpoints,
+                )
+            )
+
+    def probe_async(self) -> bool:
+        """Start a probe round unless one is running. Returns True if started."""
+        if self._probing.is_set():
+            return False
+        self._probing.set()
+        threading.Thread(target=self._probe_thread, daemon=True).start()
+        return True
+
+    def _probe_thread(self) -> None:
+        try:
+            self.results.put(self.probe_all())
+        finally:
+            self._probing.clear()
+            cb = self.wakeup
+            if cb is not None:
+                cb()
+
+    def order(self) -> List[Endpoint]:
+        """Endpoints best first (configured order until a probe finished)."""
+        if not self.ranking:
+            return list(self.endpoints)
+        ranked = [r.endpoint for r in self.ranking]
+        return ranked + [ep for ep in self.endpoints if ep not in ranked]
+
+    def best(self) -> Endpoint:
+        return self.order()[0]
+
+    def next_after(self, current: Endpoint) -> Optional[Endpoint]:
+        """Best endpoint other than `current`, healthy ones first."""
+        down = {r.endpoint for r in self.ranking if not r.healthy}
+        others = [ep for ep in self.order() if ep != current]
+        if not others:
+            return None
+        healthy = [ep for ep in others if ep not in down]
+        return (healthy or others)[0]
@@ -0,0 +1,119 @@
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+# =============================
+# Fonts
+# =============================
+#
+# pygame.font.SysFont scans the system font list (fc-list on Linux) on first
+# use. We resolve each (family, bold) once, remember the file path in a small
+# JSON cache and afterwards load fonts straight from disk. TTFs dropped into
+# assets/fonts/ (e.g. SegoeUI.ttf / SegoeUI-Bold.ttf) take precedence.
+
+# (family, size, bold) – order matches the scenes' fonts tuple
+FONT_SPECS = (
+    ("Segoe UI", 18, False),
+    ("Segoe UI", 22, True),
+    ("Segoe UI", 34, True),
+    ("Segoe UI", 26, True),
+)
+
+# Tried in order when the requested family is missing
+FALLBACK_FAMILIES = ("dejavusans", "liberationsans", "arial", "helvetica", "freesans")
+
+BUNDLED_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "assets", "fonts"
+)
+
+
+def cache_dir() -> str:
+    base = os.environ.get("UPS_CLIENT_CACHE") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+        "ups-client",
+    )
+    return base
+
+
+def _cache_path() -> str:
+    return os.path.join(cache_dir(), "fonts.json")
+
+
+def _load_cache() -> Dict[str, dict]:
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: Dict[str, dict]) -> None:
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        tmp = _cache_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp, _cache_path())
+    except OSError:
+        pass
+
+
+def _bundled(family: str, bold: bool) -> Optional[str]:
+    stem = family.replace(" ", "")
+    names = (f"{stem}-Bold.ttf", f"{stem}b.ttf") if bold else (f"{stem}.ttf",)
+    for n in names:
+        p = os.path.join(BUNDLED_DIR, n)
+        if os.path.isfile(p):
+            return p
+    return None
+
+
+def _resolve(family: str, bold: bool) -> dict:
+    """Return {"path": str|None, "synth_bold": bool} for one family/style."""
+    p = _bundled(family, bold)
+    if p is not None:
+        return {"path": p, "synth_bold": False}
+    if bold:
+        p = _bundled(family, False)
+        if p is not None:
+            return {"path": p, "synth_bold": True}
+
+    names = [family.replace(" ", "").lower(), *FALLBACK_FAMILIES]
+    path = pygame.font.match_font(names, bold=bold)
+    synth = False
+    if bold and path is not None and path == pygame.font.match_font(names):
+        synth = True
+    return {"path": path, "synth_bold": synth}
+
+
+def load_fonts(use_cache: bool = True) -> Tuple[pygame.font.Font, ...]:
+    """Build the scenes' font tuple; requires pygame.font.init()."""
+    if not use_cache:
+        return tuple(
+            pygame.font.SysFont(fam, size, bold=b) for fam, size, b in FONT_SPECS
+        )
+
+    cache = _load_cache()
+    dirty = False
+    fonts = []
+    for family, size, bold in FONT_SPECS:
+        key = f"{family}|{'bold' if bold else 'regular'}"
+        entry = cache.get(key)
+        if entry is None or (entry["path"] and not os.path.isfile(entry["path"])):
+            entry = cache[key] = _resolve(family, bold)
+            dirty = True
+
+        try:
+            font = pygame.font.Font(entry["path"], size)
+        except (OSError, pygame.error):
+            font = pygame.font.Font(None, size)
+        if entry.get("synth_bold"):
+            font.set_bold(True)
+        fonts.append(font)
+
+    if dirty:
+        _save_cache(cache)
+    return tuple(fonts)
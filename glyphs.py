@@ -0,0 +1,117 @@
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+# =============================
+# Glyph atlas
+# =============================
+#
+# Short, hot texts (move letters, score digits) come from glyphs rendered
+# once into one strip per (font, color): a letter is a sub-rect blit of the
+# atlas, a score is composed from cells the first time it is shown and then
+# blitted whole, so no font.render runs per frame. Glyphs are placed by their
+# rendered width (no kerning), which is fine for letters and digits. Text
+# with a character outside the atlas falls back to font.render.
+
+Color = Tuple[int, int, int]
+
+MOVE_LETTERS = "RPS"
+SCORE_CHARS = "0123456789 -:"
+
+RUN_CACHE_MAX = 256
+
+# Blit source for a text: (surface, area within it)
+Run = Tuple[pygame.Surface, pygame.Rect]
+
+
+class GlyphAtlas:
+    def __init__(self, font: pygame.font.Font, chars: str, color: Color):
+        chars = "".join(dict.fromkeys(chars))
+        glyphs = [font.render(ch, True, color) for ch in chars]
+        width = sum(g.get_width() for g in glyphs)
+        self.height = max((g.get_height() for g in glyphs), default=0)
+        self.surface = pygame.Surface(
+            (max(1, width), max(1, self.height)), pygame.SRCALPHA
+        )
+
+        self.cells: Dict[str, pygame.Rect] = {}
+        x = 0
+        for ch, g in zip(chars, glyphs):
+            self.surface.blit(g, (x, 0))
+            self.cells[ch] = pygame.Rect(x, 0, g.get_width(), g.get_height())
+            x += g.get_width()
+
+        self._runs: Dict[str, Optional[Run]] = {}
+
+    def run(self, text: str) -> Optional[Run]:
+        """
+        Blit source for `text`, None if a glyph is missing. One glyph is a
+        cell of the atlas; longer texts are composed from cells once and kept.
+        """
+        if text in self._runs:
+            return self._runs[text]
+        r: Optional[Run] = None
+        if len(text) == 1 and text in self.cells:
+            r = (self.surface, self.cells[text])
+        elif text and all(ch in self.cells for ch in text):
+            strip = pygame.Surface(
+                (sum(self.cells[ch].width for ch in text), self.height),
+                pygame.SRCALPHA,
+            )
+            x = 0
+            for ch in text:
+                strip.blit(self.surface, (x, 0), self.cells[ch])
+                x += self.cells[ch].width
+            r = (strip, strip.get_rect())
+        if len(self._runs) >= RUN_CACHE_MAX:
+            self._runs.clear()
+        self._runs[text] = r
+        return r
+
+
+# (id(font), color) -> atlas; fonts live for the whole process
+_ATLASES: Dict[Tuple[int, Color], GlyphAtlas] = {}
+
+
+def build_atlas(font: pygame.font.Font, chars: str, color: Color) -> GlyphAtlas:
+    atlas = _ATLASES[(id(font), color)] = GlyphAtlas(font, chars, color)
+    return atlas
+
+
+def build_default_atlases(fonts) -> None:
+    """Startup: the glyph sets the scenes draw every frame."""
+    font, font_b, font_xl, font_move = fonts
+    build_atlas(font_move, MOVE_LETTERS, (245, 245, 255))
+    build_atlas(font_xl, MOVE_LETTERS, (255, 255, 255))
+    build_atlas(font_b, SCORE_CHARS, (245, 245, 255))
+
+
+def draw_text(
+    surf: pygame.Surface,
+    font: pygame.font.Font,
+    text: str,
+    color: Color,
+    topleft: Optional[Tuple[int, int]] = None,
+    center: Optional[Tuple[int, int]] = None,
+) -> pygame.Rect:
+    """Blit `text` from the atlas when one covers it, else render it."""
+    atlas = _ATLASES.get((id(font), color))
+    r = atlas.run(text) if atlas is not None else None
+    if r is not None:
+        img, area = r
+        rect = pygame.Rect(0, 0, area.width, area.height)
+        if center is not None:
+            rect.center = center
+        elif topleft is not None:
+            rect.topleft = topleft
+        surf.blit(img, rect, area)
+        return rect
+
+    img = font.render(text, True, color)
+    rect = img.get_rect()
+    if center is not None:
+        rect.center = center
+    elif topleft is not None:
+        rect.topleft = topleft
+    surf.blit(img, rect)
+    return rect
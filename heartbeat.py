@@ -0,0 +1,84 @@
+import time
+from typing import Callable, Optional
+
+# =============================
+# Heartbeat / liveness
+# =============================
+
+
+class HeartbeatManager:
+    """
+    Tracks when the link last carried traffic in each direction.
+
+    - Keepalives are only due when nothing has been sent for `interval`
+      seconds; pongs and regular requests already prove we are alive.
+    - `interval` follows the server's RES_PING cadence (+2×RTT margin) so
+      answering pings is normally enough, clamped to [min, max].
+    - `last_rx` / `silence()` is the single liveness signal for the watchdog.
+
+    note_* methods are called from the network thread; float stores are atomic
+    under the GIL, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        base_interval: float = 1.5,
+        min_interval: float = 1.0,
+        max_interval: float = 5.0,
+    ):
+        self.clock = clock
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.last_tx = 0.0
+        self.last_rx = 0.0
+        self.ping_interval: Optional[float] = None
+        self.rtt: Optional[float] = None
+        self._last_ping = 0.0
+
+    def reset(self) -> None:
+        now = self.clock()
+        self.last_tx = now
+        self.last_rx = now
+        self.ping_interval = None
+        self._last_ping = 0.0
+
+    def note_tx(self) -> None:
+        self.last_tx = self.clock()
+
+    def note_rx(self) -> None:
+        self.last_rx = self.clock()
+
+    def note_ping(self) -> None:
+        now = self.clock()
+        if self._last_ping > 0:
+            gap = now - self._last_ping
+            if self.ping_interval is None:
+                self.ping_interval = gap
+            else:
+                self.ping_interval += 0.25 * (gap - self.ping_interval)
+        self._last_ping = now
+
+    def note_rtt(self, rtt: float) -> None:
+        if self.rtt is None:
+            self.rtt = rtt
+        else:
+            self.rtt += 0.125 * (rtt - self.rtt)
+
+    @property
+    def interval(self) -> float:
+        iv = self.base_interval
+        if self.ping_interval is not None:
+            iv = max(iv, self.ping_interval + 2 * (self.rtt or 0.0))
+        return min(self.max_interval, max(self.min_interval, iv))
+
+    def keepalive_due(self) -> bool:
+        return self.clock() - self.last_tx >= self.interval
+
+    def time_until_keepalive(self) -> float:
+        return max(0.0, self.last_tx + self.interval - self.clock())
+
+    def silence(self) -> float:
+        return self.clock() - self.last_rx
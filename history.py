@@ -0,0 +1,442 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from protocol import Message
+from store import parse_state_params
+
+# =============================
+# Match history
+# =============================
+#
+# Every round and match the player finishes is appended to a local SQLite
+# database (WAL mode). The UI thread only queues rows; a writer thread
+# commits them in batches. Rows are indexed by opponent and by date, and a
+# `totals` table (one row per player and opponent, plus opponent "" for all
+# opponents) is kept up to date in the same transaction, so the stats panel
+# reads a couple of rows by primary key however long the history grows.
+#
+# A batch that fails to commit (locked database, full disk, ...) is retried a
+# few times and then dropped, so the writer keeps draining the queue; the
+# failure goes to the UI log and the stats panel marks its totals incomplete.
+
+HISTORY_FILE = "history.sqlite3"
+
+# Writer: collect rows for up to this long (or this many) per transaction
+BATCH_WINDOW_S = 0.05
+BATCH_MAX = 500
+# Failed batch: attempts before it is dropped, and the pause between them
+COMMIT_ATTEMPTS = 3
+COMMIT_RETRY_S = 0.2
+
+ALL_OPPONENTS = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    me TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    match_started REAL NOT NULL,
+    t REAL NOT NULL,
+    ms REAL NOT NULL,
+    my_move TEXT NOT NULL,
+    opp_move TEXT NOT NULL,
+    result INTEGER NOT NULL,
+    my_score INTEGER NOT NULL,
+    opp_score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rounds_by_opponent ON rounds (opponent, t);
+CREATE INDEX IF NOT EXISTS rounds_by_time ON rounds (t);
+
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    me TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    my_wins INTEGER NOT NULL,
+    opp_wins INTEGER NOT NULL,
+    result INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_by_opponent ON matches (opponent, ended);
+CREATE INDEX IF NOT EXISTS matches_by_time ON matches (ended);
+
+CREATE TABLE IF NOT EXISTS totals (
+    me TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    matches INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    rounds INTEGER NOT NULL DEFAULT 0,
+    round_wins INTEGER NOT NULL DEFAULT 0,
+    round_draws INTEGER NOT NULL DEFAULT 0,
+    streak INTEGER NOT NULL DEFAULT 0,
+    best_streak INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (me, opponent)
+) WITHOUT ROWID;
+"""
+
+# result: 1 = win, 0 = draw, -1 = loss (from `me`'s side)
+_ADD_ROUND_TOTALS = """
+INSERT INTO totals (me, opponent, rounds, round_wins, round_draws)
+VALUES (?, ?, 1, ?, ?)
+ON CONFLICT (me, opponent) DO UPDATE SET
+    rounds = rounds + 1,
+    round_wins = round_wins + excluded.round_wins,
+    round_draws = round_draws + excluded.round_draws
+"""
+
+# streak: +n = n wins in a row, -n = n losses in a row
+_NEXT_STREAK = """
+    CASE excluded.wins - excluded.losses
+        WHEN 1 THEN CASE WHEN streak > 0 THEN streak + 1 ELSE 1 END
+        WHEN -1 THEN CASE WHEN streak < 0 THEN streak - 1 ELSE -1 END
+        ELSE 0
+    END
+"""
+
+_ADD_MATCH_TOTALS = f"""
+INSERT INTO totals (me, opponent, matches, wins, draws, losses, streak, best_streak)
+VALUES (?, ?, 1, ?, ?, ?, ?, MAX(?, 0))
+ON CONFLICT (me, opponent) DO UPDATE SET
+    matches = matches + 1,
+    wins = wins + excluded.wins,
+    draws = draws + excluded.draws,
+    losses = losses + excluded.losses,
+    streak = {_NEXT_STREAK},
+    best_streak = MAX(best_streak, {_NEXT_STREAK})
+"""
+
+
+def default_history_path() -> str:
+    base = os.environ.get("UPS_CLIENT_DATA") or os.path.join(
+        os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"),
+        "ups-client",
+    )
+    return os.path.join(base, HISTORY_FILE)
+
+
+@dataclass(frozen=True)
+class Totals:
+    matches: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    rounds: int = 0
+    round_wins: int = 0
+    round_draws: int = 0
+    streak: int = 0
+    best_streak: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.matches if self.matches else 0.0
+
+    @property
+    def round_win_rate(self) -> float:
+        return self.round_wins / self.rounds if self.rounds else 0.0
+
+
+class HistoryStore:
+    def __init__(self, path: str):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        db = self._open()
+        db.executescript(_SCHEMA)
+        db.close()
+
+        # Grows after every written or dropped batch (view caches key on it)
+        self.version = 0
+        # Called on the writer thread after each batch, committed or dropped
+        # (e.g. to wake the UI)
+        self.on_commit: Optional[Callable[[], None]] = None
+        # Rows lost to dropped batches (totals are incomplete while non-zero)
+        self.dropped = 0
+        # Write failures for the UI log (writer thread -> UI thread)
+        self.errors: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, tuple]]]" = (
+            queue.SimpleQueue()
+        )
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer = threading.Thread(
+            target=self._write_loop, name="history", daemon=True
+        )
+        self._writer.start()
+
+    def _open(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # --- UI thread ---
+
+    def add_round(
+        self,
+        me: str,
+        opponent: str,
+        match_started: float,
+        t: float,
+        ms: float,
+        my_move: str,
+        opp_move: str,
+        result: int,
+        my_score: int,
+        opp_score: int,
+    ) -> None:
+        self._queue.put(
+            (
+                "round",
+                (me, opponent, match_started, t, ms, my_move, opp_move, result)
+                + (my_score, opp_score),
+            )
+        )
+
+    def add_match(
+        self,
+        me: str,
+        opponent: str,
+        started: float,
+        ended: float,
+        my_wins: int,
+        opp_wins: int,
+        result: int,
+    ) -> None:
+        self._queue.put(
+            ("match", (me, opponent, started, ended, my_wins, opp_wins, result))
+        )
+
+    def totals(self, me: str, opponent: str = ALL_OPPONENTS) -> Totals:
+        """Committed totals of `me` against `opponent` (default: everyone)."""
+        if self._reader is None:
+            self._reader = self._open()
+        row = self._reader.execute(
+            "SELECT matches, wins, draws, losses, rounds, round_wins, round_draws,"
+            " streak, best_streak FROM totals WHERE me = ? AND opponent = ?",
+            (me, opponent),
+        ).fetchone()
+        return Totals(*row) if row else Totals()
+
+    def close(self) -> None:
+        """Commit everything queued so far and stop the writer."""
+        self._queue.put(None)
+        self._writer.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    # --- writer thread ---
+
+    def _write_loop(self) -> None:
+        db: Optional[sqlite3.Connection] = None
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + BATCH_WINDOW_S
+            while len(batch) < BATCH_MAX:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=left)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            db = self._write(db, batch)
+        if db is not None:
+            db.close()
+
+    def _write(
+        self, db: Optional[sqlite3.Connection], batch: List[Tuple[str, tuple]]
+    ) -> Optional[sqlite3.Connection]:
+        """Commit `batch`, retrying on a fresh connection; drop it if all fail."""
+        for attempt in range(COMMIT_ATTEMPTS):
+            if attempt:
+                time.sleep(COMMIT_RETRY_S)
+            try:
+                if db is None:
+                    db = self._open()
+                self._commit(db, batch)
+                return db
+            except sqlite3.Error as e:
+                error = e
+                if db is not None:
+                    db.close()
+                    db = None
+        self.dropped += len(batch)
+        self.errors.put(f"Match history: {len(batch)} row(s) not saved: {error}")
+        self._batch_done()
+        return db
+
+    def _commit(self, db: sqlite3.Connection, batch: List[Tuple[str, tuple]]) -> None:
+        rounds = [row for kind, row in batch if kind == "round"]
+        matches = [row for kind, row in batch if kind == "match"]
+        db.execute("BEGIN")
+        try:
+            if rounds:
+                db.executemany(
+                    "INSERT INTO rounds (me, opponent, match_started, t, ms,"
+                    " my_move, opp_move, result, my_score, opp_score)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rounds,
+                )
+                db.executemany(
+                    _ADD_ROUND_TOTALS,
+                    [
+                        (r[0], opp, int(r[7] == 1), int(r[7] == 0))
+                        for r in rounds
+                        for opp in (r[1], ALL_OPPONENTS)
+                    ],
+                )
+            if matches:
+                db.executemany(
+                    "INSERT INTO matches (me, opponent, started, ended, my_wins,"
+                    " opp_wins, result) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    matches,
+                )
+                # One by one: each match moves the streak the next one sees
+                for m in matches:
+                    res = m[6]
+                    for opp in (m[1], ALL_OPPONENTS):
+                        db.execute(
+                            _ADD_MATCH_TOTALS,
+                            (m[0], opp, int(res == 1), int(res == 0))
+                            + (int(res == -1), res, res),
+                        )
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        self._batch_done()
+
+    def _batch_done(self) -> None:
+        self.version += 1
+        cb = self.on_commit
+        if cb is not None:
+            cb()
+
+
+class HistoryTracker:
+    """
+    Turns one session's messages into history rows (UI thread, in message
+    order). Knows who is who from RES_STATE and the logged-in user id.
+    """
+
+    def __init__(self, store: HistoryStore, state):
+        self.store = store
+        self.state = state
+        self.ids = (0, 0)
+        self.names = ("", "")
+        self.match_started = 0.0
+        self.round_started = 0.0
+
+    def _my_side(self) -> Optional[int]:
+        try:
+            my_id = int(self.state.user_id)
+        except ValueError:
+            return None
+        if my_id and my_id in self.ids:
+            return self.ids.index(my_id)
+        return None
+
+    def feed(self, msg: Message) -> None:
+        t, p = msg.type_desc, msg.params
+        if t == "RES_STATE":
+            d = parse_state_params(p)
+            try:
+                self.ids = (
+                    int(d.get("p1Id", self.ids[0])),
+                    int(d.get("p2Id", self.ids[1])),
+                )
+            except ValueError:
+                pass
+            self.names = (
+                d.get("p1Name", self.names[0]),
+                d.get("p2Name", self.names[1]),
+            )
+        elif t == "RES_GAME_STARTED":
+            self.match_started = self.round_started = time.time()
+        elif t == "RES_ROUND_RESULT" and len(p) >= 5:
+            self._round(p)
+        elif t == "RES_MATCH_RESULT" and len(p) >= 3:
+            self._match(p)
+
+    def _players(self) -> Optional[Tuple[int, str, str]]:
+        side = self._my_side()
+        if side is None:
+            return None
+        other = 1 - side
+        opponent = self.names[other] or f"#{self.ids[other]}"
+        return side, self.state.username or self.names[side], opponent
+
+    def _result(self, winner: str) -> int:
+        try:
+            w = int(winner)
+        except ValueError:
+            return 0
+        if w == 0:
+            return 0
+        return 1 if w == int(self.state.user_id) else -1
+
+    def _round(self, p: List[str]) -> None:
+        who = self._players()
+        if who is None:
+            return
+        side, me, opponent = who
+        try:
+            scores = (int(p[3]), int(p[4]))
+        except ValueError:
+            return
+        now = time.time()
+        if not self.match_started:
+            self.match_started = self.round_started = now
+        moves = (p[1].strip().upper(), p[2].strip().upper())
+        self.store.add_round(
+            me,
+            opponent,
+            self.match_started,
+            now,
+            1000 * (now - self.round_started),
+            moves[side],
+            moves[1 - side],
+            self._result(p[0]),
+            scores[side],
+            scores[1 - side],
+        )
+        self.round_started = now
+
+    def _match(self, p: List[str]) -> None:
+        who = self._players()
+        if who is None:
+            return
+        side, me, opponent = who
+        try:
+            scores = (int(p[1]), int(p[2]))
+        except ValueError:
+            return
+        now = time.time()
+        self.store.add_match(
+            me,
+            opponent,
+            self.match_started or now,
+            now,
+            scores[side],
+            scores[1 - side],
+            self._result(p[0]),
+        )
+        self.match_started = 0.0
@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pygame
+
+# =============================
+# Input pipeline
+# =============================
+#
+# - Only the event types the client handles are enabled, so SDL drops the
+#   rest before they reach the queue.
+# - MOUSEMOTION is coalesced to the last one per frame and never reaches the
+#   scenes; it only moves hover.
+# - Each scene registers its widgets in a HitIndex (uniform grid), and clicks
+#   and hover resolve through it instead of every widget testing the point.
+# - Hover is tracked incrementally: motion that stays on the same widget
+#   changes nothing, otherwise only the widgets whose hover flipped are
+#   reported dirty.
+
+HANDLED_EVENTS = (
+    pygame.QUIT,
+    pygame.KEYDOWN,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEWHEEL,
+    pygame.WINDOWEXPOSED,
+)
+
+HIT_CELL = 64
+
+
+def enable_events(*extra: int) -> None:
+    """Block every event type except HANDLED_EVENTS and `extra` (custom types)."""
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(list(HANDLED_EVENTS) + list(extra))
+
+
+def coalesce_motion(events: Sequence[pygame.event.Event]) -> List[pygame.event.Event]:
+    """Drop all MOUSEMOTION events but the last one (kept in its place)."""
+    last = -1
+    for i, e in enumerate(events):
+        if e.type == pygame.MOUSEMOTION:
+            last = i
+    return [
+        e for i, e in enumerate(events) if e.type != pygame.MOUSEMOTION or i == last
+    ]
+
+
+class HitIndex:
+    """Widgets (anything with .rect, optionally .enabled) bucketed by grid cell."""
+
+    def __init__(self, widgets: Iterable[object] = (), cell: int = HIT_CELL):
+        self.cell = cell
+        self._grid: Dict[Tuple[int, int], List[object]] = {}
+        for w in widgets:
+            self.add(w)
+
+    def add(self, widget: object) -> None:
+        r: pygame.Rect = widget.rect  # type: ignore[attr-defined]
+        c = self.cell
+        for cx in range(r.left // c, (r.right - 1) // c + 1):
+            for cy in range(r.top // c, (r.bottom - 1) // c + 1):
+                self._grid.setdefault((cx, cy), []).append(widget)
+
+    def at(self, pos: Tuple[int, int], hoverable: bool = False) -> Optional[object]:
+        """Topmost (last added) enabled widget under `pos`."""
+        x, y = pos
+        for w in reversed(self._grid.get((x // self.cell, y // self.cell), ())):
+            if hoverable and not hasattr(w, "hover"):
+                continue
+            if getattr(w, "enabled", True) and w.rect.collidepoint(pos):  # type: ignore[attr-defined]
+                return w
+        return None
+
+
+class HoverTracker:
+    def __init__(self) -> None:
+        self.widget: Optional[object] = None
+        self.index: Optional[HitIndex] = None
+
+    def update(self, index: HitIndex, pos: Tuple[int, int]) -> List[pygame.Rect]:
+        """Move hover to the widget under `pos`; returns rects that changed."""
+        self.index = index
+        w = index.at(pos, hoverable=True)
+        if w is self.widget:
+            return []
+        dirty = []
+        if self.widget is not None:
+            self.widget.hover = False  # type: ignore[attr-defined]
+            dirty.append(self.widget.rect)  # type: ignore[attr-defined]
+        if w is not None:
+            w.hover = True  # type: ignore[attr-defined]
+            dirty.append(w.rect)  # type: ignore[attr-defined]
+        self.widget = w
+        return dirty
+
+    def sync(
+        self, index: HitIndex, origin: Tuple[int, int] = (0, 0)
+    ) -> List[pygame.Rect]:
+        """
+        Re-resolve hover after a scene switch (pointer did not move). `origin`
+        is the top-left of the viewport the index lives in.
+        """
+        if index is self.index:
+            return []
+        x, y = pygame.mouse.get_pos()
+        return self.update(index, (x - origin[0], y - origin[1]))
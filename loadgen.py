@@ -0,0 +1,452 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from dataclasses import dataclass
+from queue import Empty, Queue
+from typing import Dict, List, Optional
+
+from metrics import REGISTRY, MetricsExporter, Registry
+from multiplexer import MuxSession, SessionMultiplexer
+from protocol import Message
+from timers import TimerService
+
+# =============================
+# Sharded load generator
+# =============================
+#
+# Virtual players follow the same protocol flow as the GUI client (login,
+# create/join lobby, moves, rematch, leave, logout). Players are split into
+# shards, one process each; every shard drives its players on a single
+# SessionMultiplexer thread and sends a metrics snapshot back to the parent
+# through the pool's result pipe.
+#
+# Moves are random by default. With --strategy the shard's players are slots
+# of one StrategyEngine (strategy.py, needs numpy): a player whose think time
+# is up only queues a request, and the shard picks every queued move in one
+# batch per loop pass.
+
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)  # fmt: skip
+
+# Response type -> request it answers
+_REPLIES = {
+    "RES_LOGIN_OK": "REQ_LOGIN",
+    "RES_LOGIN_FAIL": "REQ_LOGIN",
+    "RES_LOBBY_CREATED": "REQ_CREATE_LOBBY",
+    "RES_LOBBY_JOINED": "REQ_JOIN_LOBBY",
+    "RES_ROUND_RESULT": "REQ_MOVE",
+    "RES_REMATCH_READY": "REQ_REMATCH",
+    "RES_LOBBY_LEFT": "REQ_LEAVE_LOBBY",
+    "RES_LOGOUT_OK": "REQ_LOGOUT",
+}
+
+
+@dataclass
+class ShardSpec:
+    shard: int
+    host: str
+    port: int
+    pairs: int
+    matches: int
+    think: float
+    ramp: float
+    timeout: float
+    run_id: str
+    seed: int
+    strategy: str = "random"
+
+
+class _NotifyQueue(Queue):
+    """Inbox that also reports its owner on the shard's ready queue."""
+
+    def __init__(self, owner: "VirtualPlayer", ready: "Queue[VirtualPlayer]"):
+        super().__init__()
+        self._owner = owner
+        self._ready = ready
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        self._ready.put(self._owner)
+
+
+class VirtualPlayer:
+    def __init__(
+        self,
+        name: str,
+        lobby: str,
+        creator: bool,
+        session: MuxSession,
+        shard: "_Shard",
+    ):
+        self.name = name
+        self.lobby = lobby
+        self.creator = creator
+        self.session = session
+        self.shard = shard
+        self.partner: Optional["VirtualPlayer"] = None
+
+        self.matches = 0
+        self.done = False
+        self.logged_in = False
+        self.lobby_ready = False
+        self._sent_at: Dict[str, float] = {}
+        # Strategy engine slot (None = random moves)
+        self.slot = shard.engine.add(shard.spec.strategy) if shard.engine else None
+
+        session.inbox = _NotifyQueue(self, shard.ready)
+
+    # --- helpers ---
+
+    def send(self, type_desc: str, *params: str) -> None:
+        if self.done:
+            return
+        self._sent_at[type_desc] = time.perf_counter()
+        try:
+            self.session.send(type_desc, *params)
+        except RuntimeError:
+            self.fail("send_closed")
+
+    def fail(self, kind: str) -> None:
+        self.shard.errors.labels(kind).inc()
+        self.finish()
+
+    def finish(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.shard.n_done += 1
+        self.shard.timers.cancel(f"move:{self.name}")
+        self.session.close()
+
+    def _move_later(self) -> None:
+        delay = self.shard.rng.uniform(0.5, 1.5) * self.shard.spec.think
+        self.shard.timers.schedule(f"move:{self.name}", delay, self._move)
+
+    def _move(self) -> None:
+        if self.slot is not None:
+            self.shard.engine.request(self.slot)
+        else:
+            self.play(self.shard.rng.choice("RPS"))
+
+    def play(self, move: str) -> None:
+        self.send("REQ_MOVE", move)
+
+    def _maybe_join(self) -> None:
+        # Joiner needs its own login and the partner's lobby first
+        p = self.partner
+        if not self.creator and self.logged_in and p is not None and p.lobby_ready:
+            self.send("REQ_JOIN_LOBBY", self.lobby)
+
+    # --- flow ---
+
+    def start(self) -> None:
+        try:
+            self.session.connect()
+        except OSError:
+            self.fail("connect")
+            return
+        self.send("REQ_LOGIN", self.name)
+
+    def on_message(self, msg: Message) -> None:
+        t, p = msg.type_desc, msg.params
+
+        req = _REPLIES.get(t)
+        if req is not None:
+            sent = self._sent_at.pop(req, None)
+            if sent is not None:
+                self.shard.latency.labels(req).observe(time.perf_counter() - sent)
+
+        if t == "RES_PING":
+            self.send("REQ_PONG", p[0] if p else "0")
+        elif t == "RES_LOGIN_OK":
+            self.logged_in = True
+            if self.creator:
+                self.send("REQ_CREATE_LOBBY", self.lobby)
+            else:
+                self._maybe_join()
+        elif t == "RES_LOGIN_FAIL":
+            self.fail("login")
+        elif t == "RES_LOBBY_CREATED":
+            self.lobby_ready = True
+            if self.partner is not None:
+                self.partner._maybe_join()
+        elif t == "RES_GAME_STARTED":
+            self._move_later()
+        elif t == "RES_ROUND_RESULT":
+            # Both players get the result; count each round once
+            if self.creator:
+                self.shard.rounds.inc()
+            # winner, p1 move, p2 move, ...; the lobby creator is p1
+            if self.slot is not None and len(p) >= 3:
+                mine, theirs = (p[1], p[2]) if self.creator else (p[2], p[1])
+                self.shard.engine.observe(self.slot, mine, theirs)
+            self._move_later()
+        elif t == "RES_MATCH_RESULT":
+            self.shard.timers.cancel(f"move:{self.name}")
+            self.matches += 1
+            if self.creator:
+                self.shard.matches.inc()
+            if self.matches < self.shard.spec.matches:
+                self.send("REQ_REMATCH")
+            elif self.creator:
+                self.send("REQ_LEAVE_LOBBY")
+        elif t == "RES_LOBBY_LEFT" or t == "RES_GAME_CANNOT_CONTINUE":
+            self.send("REQ_LOGOUT")
+        elif t == "RES_LOGOUT_OK":
+            self.finish()
+        elif t == "RES_ERROR":
+            self.shard.errors.labels("server_error").inc()
+
+    def on_error(self, err: str) -> None:
+        if not self.done:
+            self.fail("disconnect")
+
+
+class _Shard:
+    def __init__(self, spec: ShardSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.timers = TimerService()
+        self.ready: "Queue[VirtualPlayer]" = Queue()
+        self.n_done = 0
+        self.engine = None
+        if spec.strategy != "random":
+            from strategy import StrategyEngine
+
+            self.engine = StrategyEngine(2 * spec.pairs, seed=spec.seed)
+
+        self.registry = Registry()
+        self.latency = self.registry.histogram(
+            "loadgen_latency_seconds",
+            "Request to response latency.",
+            _LATENCY_BUCKETS,
+            ("request",),
+        )
+        self.errors = self.registry.counter(
+            "loadgen_errors_total", "Player errors.", ("kind",)
+        )
+        self.rounds = self.registry.counter("loadgen_rounds_total", "Rounds played.")
+        self.matches = self.registry.counter(
+            "loadgen_matches_total", "Matches finished."
+        )
+        self.players_done = self.registry.counter(
+            "loadgen_players_done_total", "Players that completed their script."
+        )
+
+        self.mux = SessionMultiplexer()
+        self.players: List[VirtualPlayer] = []
+        for i in range(spec.pairs):
+            lobby = f"lg{spec.run_id}-{spec.shard}-{i}"
+            a = VirtualPlayer(
+                f"b{spec.run_id}-{spec.shard}-{i}a",
+                lobby,
+                True,
+                self.mux.session(spec.host, spec.port),
+                self,
+            )
+            b = VirtualPlayer(
+                f"b{spec.run_id}-{spec.shard}-{i}b",
+                lobby,
+                False,
+                self.mux.session(spec.host, spec.port),
+                self,
+            )
+            a.partner, b.partner = b, a
+            self.players += [a, b]
+        self.by_slot = {p.slot: p for p in self.players if p.slot is not None}
+
+    def _play_moves(self) -> None:
+        """Send the moves the engine picked for this pass's requests."""
+        for slot, move in self.engine.tick().items():
+            pl = self.by_slot[slot]
+            if not pl.done:
+                pl.play(move)
+
+    def run(self) -> Dict[str, dict]:
+        # Process-wide message counters also hold earlier shards of this worker
+        messages_before = _message_counts()
+        self.mux.start()
+        step = self.spec.ramp / max(1, len(self.players))
+        for n, pl in enumerate(self.players):
+            self.timers.schedule(f"start:{n}", n * step, pl.start)
+
+        deadline = time.monotonic() + self.spec.timeout
+        next_err_scan = 0.0
+        while time.monotonic() < deadline:
+            self.timers.run_due()
+            if self.engine is not None:
+                self._play_moves()
+            if self.n_done >= len(self.players):
+                break
+
+            wait = self.timers.time_until_next()
+            try:
+                pl = self.ready.get(
+                    timeout=min(0.25, wait if wait is not None else 0.25)
+                )
+            except Empty:
+                pl = None
+
+            while pl is not None:
+                try:
+                    msg = pl.session.inbox.get_nowait()
+                    pl.on_message(msg)
+                except Empty:
+                    pass
+                try:
+                    pl = self.ready.get_nowait()
+                except Empty:
+                    pl = None
+
+            if time.monotonic() >= next_err_scan:
+                next_err_scan = time.monotonic() + 0.2
+                for p in self.players:
+                    if not p.done and not p.session.errors.empty():
+                        p.on_error(p.session.errors.get_nowait())
+
+        for pl in self.players:
+            if pl.done and pl.matches >= self.spec.matches:
+                self.players_done.inc()
+            elif not pl.done:
+                self.errors.labels("timeout").inc()
+                pl.finish()
+        self.mux.stop()
+
+        snap = self.registry.snapshot()
+        for name, d in _message_counts().items():
+            before = messages_before.get(name, {}).get("children", {})
+            d["children"] = {
+                labels: value - before.get(labels, 0)
+                for labels, value in d["children"].items()
+            }
+            snap[name] = d
+        return snap
+
+
+def _message_counts() -> Dict[str, dict]:
+    """Snapshot of the process-wide ups_messages_* counters."""
+    return {
+        k: v for k, v in REGISTRY.snapshot().items() if k.startswith("ups_messages")
+    }
+
+
+def run_shard(spec: ShardSpec) -> Dict[str, dict]:
+    return _Shard(spec).run()
+
+
+# =============================
+# Report
+# =============================
+
+
+def print_report(reg: Registry, players: int, shards: int, elapsed: float) -> None:
+    by_name = {m.name: m for m in reg.metrics()}
+
+    def total(name: str) -> float:
+        m = by_name.get(name)
+        return sum(c.value for _, c in m.children()) if m else 0.0
+
+    print()
+    print(f"players: {players} in {shards} shard(s), elapsed {elapsed:.1f}s")
+    print(
+        f"completed: {total('loadgen_players_done_total'):.0f}  "
+        f"matches: {total('loadgen_matches_total'):.0f}  "
+        f"rounds: {total('loadgen_rounds_total'):.0f}"
+    )
+
+    errors = by_name.get("loadgen_errors_total")
+    if errors is not None:
+        for (kind,), c in sorted(errors.children()):
+            print(f"errors[{kind}]: {c.value:.0f}")
+
+    tx = total("ups_messages_sent_total")
+    rx = total("ups_messages_received_total")
+    print(
+        f"messages: tx {tx:.0f} ({tx / elapsed:.0f}/s)  rx {rx:.0f} ({rx / elapsed:.0f}/s)"
+    )
+
+    lat = by_name.get("loadgen_latency_seconds")
+    if lat is None:
+        return
+    print()
+    print(
+        f"{'request':<18}{'count':>9}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    for (req,), h in sorted(lat.children()):
+        if not h.count:
+            continue
+        print(
+            f"{req:<18}{h.count:>9}"
+            f"{1000 * h.sum / h.count:>10.2f}"
+            f"{1000 * h.quantile(0.50):>9.2f}"
+            f"{1000 * h.quantile(0.95):>9.2f}"
+            f"{1000 * h.quantile(0.99):>9.2f}"
+        )
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Sharded bot load generator")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=10000)
+    ap.add_argument("--players", type=int, default=100, help="total (rounded to pairs)")
+    ap.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--matches", type=int, default=2, help="matches per pair")
+    ap.add_argument("--think", type=float, default=0.05, help="mean think time (s)")
+    ap.add_argument("--ramp", type=float, default=1.0, help="connect ramp-up (s)")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument(
+        "--strategy",
+        default="random",
+        help="bot move model: random (default), frequency, markov, pattern or"
+        " ensemble (all but random need numpy)",
+    )
+    ap.add_argument("--metrics-file", help="write merged metrics (Prometheus text)")
+    args = ap.parse_args(argv)
+    if args.strategy != "random":
+        try:
+            from strategy import MODELS
+        except ImportError as e:
+            ap.error(f"--strategy {args.strategy} needs numpy ({e})")
+        if args.strategy not in MODELS:
+            ap.error(f"--strategy: choose from {', '.join(MODELS)}")
+
+    pairs = max(1, args.players // 2)
+    shards = max(1, min(args.shards, pairs))
+    run_id = f"{random.randrange(16**6):06x}"
+    specs = [
+        ShardSpec(
+            shard=i,
+            host=args.host,
+            port=args.port,
+            pairs=pairs // shards + (1 if i < pairs % shards else 0),
+            matches=args.matches,
+            think=args.think,
+            ramp=args.ramp,
+            timeout=args.timeout,
+            run_id=run_id,
+            seed=args.seed * 1000 + i,
+            strategy=args.strategy,
+        )
+        for i in range(shards)
+    ]
+
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(shards) as pool:
+        snaps = pool.map(run_shard, specs)
+    elapsed = time.perf_counter() - t0
+
+    merged = Registry()
+    for snap in snaps:
+        merged.merge(snap)
+
+    print_report(merged, pairs * 2, shards, elapsed)
+    if args.metrics_file:
+        MetricsExporter(merged, path=args.metrics_file).dump()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# =============================
+# Indexed in-app log
+# =============================
+#
+# Ring buffer of the last LOG_CAPACITY log lines. Every line gets a sequence
+# number (`total` counts lines ever appended, so it keeps growing after the
+# ring wraps) and is indexed by direction ("TX", "RX", "SYS", "ERR") and, for
+# wire lines, by message type. Appends and evictions are O(1), so the debug
+# console can jump to e.g. all RES_STATE lines without scanning.
+
+LOG_CAPACITY = 10_000
+
+DIRECTIONS = ("TX", "RX", "SYS", "ERR")
+
+
+def line_keys(line: str) -> Tuple[str, ...]:
+    """Index keys of a log line: direction and, for TX/RX, message type."""
+    if not line.startswith("["):
+        return ()
+    end = line.find("]")
+    direction = line[1:end]
+    if direction not in DIRECTIONS:
+        return ()
+    if direction in ("TX", "RX"):
+        parts = line[end + 2 :].split("|", 2)
+        if len(parts) >= 2 and parts[1]:
+            return (direction, parts[1])
+    return (direction,)
+
+
+class LogBuffer:
+    def __init__(self, capacity: int = LOG_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self._lines: List[Optional[str]] = [None] * capacity
+        self._slot_keys: List[Tuple[str, ...]] = [()] * capacity
+        self._index: Dict[str, Deque[int]] = {}
+
+    @property
+    def first(self) -> int:
+        """Sequence number of the oldest retained line."""
+        return max(0, self.total - self.capacity)
+
+    def append(self, line: str) -> None:
+        seq = self.total
+        slot = seq % self.capacity
+        if seq >= self.capacity:
+            # The evicted line is the oldest overall, so it heads its key lists
+            for key in self._slot_keys[slot]:
+                seqs = self._index[key]
+                seqs.popleft()
+                if not seqs:
+                    del self._index[key]
+
+        keys = line_keys(line)
+        self._lines[slot] = line
+        self._slot_keys[slot] = keys
+        for key in keys:
+            seqs = self._index.get(key)
+            if seqs is None:
+                seqs = self._index[key] = deque()
+            seqs.append(seq)
+        self.total += 1
+
+    def line(self, seq: int) -> str:
+        if not self.first <= seq < self.total:
+            raise IndexError(seq)
+        return self._lines[seq % self.capacity]  # type: ignore[return-value]
+
+    def keys(self) -> List[str]:
+        return sorted(self._index)
+
+    def indexed(self, key: str) -> bool:
+        return key in self._index
+
+    def seqs(self, key: str) -> Sequence[int]:
+        """Retained sequence numbers of lines with index key `key`."""
+        return self._index.get(key, ())
+
+    def __len__(self) -> int:
+        return self.total - self.first
+
+    def __iter__(self) -> Iterator[str]:
+        for seq in range(self.first, self.total):
+            yield self.line(seq)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        seqs = range(self.first, self.total)[i]
+        if isinstance(seqs, range):
+            return [self.line(s) for s in seqs]
+        return self.line(seqs)
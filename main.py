@@ -1,145 +1,775 @@
+import argparse
+import math
+import sqlite3
+import threading
+import time
 from queue import Empty
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pygame
 
-from network import TcpLineClient
+from clock import SystemClock, make_clock
+from endpoints import EndpointSelector, format_endpoint, parse_endpoints
+from fonts import load_fonts
+from glyphs import build_default_atlases
+from history import HistoryStore, HistoryTracker, default_history_path
+from input_router import HoverTracker, coalesce_motion, enable_events
+from metrics import (
+    DRAIN_SECONDS,
+    ENDPOINT_FAILOVERS,
+    FRAME_SECONDS,
+    FRAMES_SKIPPED,
+    INBOX_DEPTH,
+    LOG_LINES,
+    RECONNECT_ATTEMPTS,
+    REGISTRY,
+    WATCHDOG_TIMEOUTS,
+    MetricsExporter,
+)
+from network import PROFILES, TcpLineClient
+from recorder import RECORD_BUFFERS, RECORD_FORMATS, FrameRecorder
+from render import BACKENDS, create_backend
 from scenes import AfterMatchScene, ConnectScene, GameScene, LobbyScene
-from state import AppState, H, SceneId, W, log_err, log_rx, log_sys, toast
+from state import (
+    AppState,
+    H,
+    SceneId,
+    W,
+    log_err,
+    log_rx,
+    log_sys,
+    note_server_contact,
+    toast,
+)
+from store import StateStore
+from timers import TimerService
+from tracing import TRACER, now_us
 
+# Timing (seconds)
+WATCHDOG_S = 20.0
+RECONNECT_COOLDOWN_S = 2.0
+# Failed reconnects to one endpoint before failing over to the next best
+RECONNECT_MAX_FAILURES = 3
 
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((W, H))
-    pygame.display.set_caption("UPS – Rock Paper Scissors")
-    clock = pygame.time.Clock()
+# The loop blocks in pygame.event.wait until input, a network wakeup
+# (NET_EVENT), the next timer or the scene's animation interval; IDLE_MAX_S
+# caps the sleep as a safety net. Frames are still capped at 60 FPS.
+IDLE_MAX_S = 1.0
+# Recorder dropped a frame: look again this soon for a free buffer
+RECORD_RETRY_S = 0.05
 
-    fonts = (
-        pygame.font.SysFont("Segoe UI", 18),
-        pygame.font.SysFont("Segoe UI", 22, bold=True),
-        pygame.font.SysFont("Segoe UI", 34, bold=True),
-        pygame.font.SysFont("Segoe UI", 26, bold=True),
+# =============================
+# Sessions
+# =============================
+#
+# One Session = one player: its own AppState, TcpLineClient, StateStore,
+# timers and scene set, drawn into its own viewport. With --sessions N the
+# window is a grid of N viewports (subsurfaces of one display surface) and
+# one loop drives them all; pygame, fonts, glyph atlases and the static art
+# cache are shared. Mouse events go to the viewport under the pointer
+# (positions made local), keys to the viewport clicked last.
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="UPS – Rock Paper Scissors client")
+    ap.add_argument(
+        "--metrics-file",
+        help="periodically dump metrics in Prometheus text format to this file",
+    )
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve metrics on http://127.0.0.1:PORT/metrics",
+    )
+    ap.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=5.0,
+        help="seconds between metrics file dumps (default: 5)",
+    )
+    ap.add_argument(
+        "--server",
+        action="append",
+        help="game server HOST:PORT (default: 127.0.0.1:10000); repeat or"
+        " comma-separate to probe several and use the fastest",
+    )
+    ap.add_argument(
+        "--transport",
+        choices=sorted(PROFILES),
+        default="low_latency",
+        help="socket transport profile (default: low_latency)",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="negotiate the session resume extension (server must support it)",
+    )
+    ap.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="run client timers N× faster than real time (tests/simulations;"
+        " inf = virtual time)",
+    )
+    ap.add_argument(
+        "--renderer",
+        choices=BACKENDS,
+        default="software",
+        help="software display surface (default), or pygame._sdl2 textures"
+        " (sdl2 = any driver, sdl2-software = SDL's software renderer)",
+    )
+    ap.add_argument(
+        "--record",
+        metavar="DIR",
+        help="record what the window shows (plus a timestamped network trace)"
+        " into DIR",
+    )
+    ap.add_argument(
+        "--record-format",
+        choices=RECORD_FORMATS,
+        default="stream",
+        help="png = one image per frame, stream = compressed changed regions"
+        " (export with recorder.py; default: stream)",
+    )
+    ap.add_argument(
+        "--record-buffers",
+        type=int,
+        default=RECORD_BUFFERS,
+        help="frame buffers waiting for the encoder; when all are busy frames"
+        f" are dropped, never waited for (default: {RECORD_BUFFERS})",
+    )
+    ap.add_argument(
+        "--trace",
+        action="store_true",
+        help="start latency tracing at launch (F3 toggles it at runtime)",
     )
+    ap.add_argument(
+        "--trace-file",
+        default="latency_trace.json",
+        help="where stopping the trace writes Chrome trace-event JSON"
+        " (default: latency_trace.json)",
+    )
+    ap.add_argument(
+        "--history",
+        metavar="PATH",
+        help="match history database (default: ~/.local/share/ups-client/"
+        "history.sqlite3, or $UPS_CLIENT_DATA); 'off' disables it",
+    )
+    ap.add_argument(
+        "--bot",
+        metavar="MODEL[,MODEL...]",
+        help="autoplay in game with a strategy: frequency, markov, pattern,"
+        " ensemble or random, per session ('none' = human; e.g. none,markov"
+        " with --sessions 2); needs numpy",
+    )
+    ap.add_argument(
+        "--sessions",
+        type=int,
+        default=1,
+        help="independent clients in one window, each in its own viewport"
+        " (QA: play both sides of a match in one process; default: 1)",
+    )
+    ap.add_argument(
+        "--legacy-startup",
+        action="store_true",
+        help="pygame.init() + SysFont lookups (old startup path, for comparison)",
+    )
+    ap.add_argument(
+        "--exit-after-first-frame",
+        action="store_true",
+        help="print startup timings after the first frame and exit",
+    )
+    return ap.parse_args(argv)
 
-    client = TcpLineClient("127.0.0.1", 10000)
-    state = AppState()
-    state.last_server_contact = pygame.time.get_ticks()
 
-    # Cooldown pro reconnect (v sekundách)
-    reconnect_cooldown = 0.0
+class Session:
+    def __init__(
+        self,
+        index: int,
+        client: TcpLineClient,
+        state: AppState,
+        fonts,
+        selector: EndpointSelector,
+        origin: Tuple[int, int] = (0, 0),
+    ):
+        self.index = index
+        self.client = client
+        self.state = state
+        self.selector = selector
+        self.timers = state.timers
+        self.hb = client.heartbeat
+        self.viewport = pygame.Rect(origin, (W, H))
+        self.view: Optional[pygame.Surface] = None
+        self.hover = HoverTracker()
+        self.reconnect_failures = 0
+        self.drawn_key = None
+        self.history = (
+            HistoryTracker(state.history, state) if state.history is not None else None
+        )
+        # --bot: StrategyEngine and this session's slot in it (None = human)
+        self.engine = None
+        self.bot: Optional[int] = None
 
-    # Keepalive pro heartbeat
-    pong_keepalive = 0.0
+        # Síťové vlákno redukuje zprávy do back bufferu, smyčka jednou za snímek swapne
+        self.store = StateStore()
+        client.on_rx = self.store.apply
 
-    scenes = {
-        SceneId.CONNECT: ConnectScene(client, state, fonts),
-        SceneId.LOBBY: LobbyScene(client, state, fonts),
-        SceneId.GAME: GameScene(client, state, fonts),
-        SceneId.AFTER_MATCH: AfterMatchScene(client, state, fonts),
-    }
+        self.scenes = {
+            SceneId.CONNECT: ConnectScene(client, state, fonts),
+            SceneId.LOBBY: LobbyScene(client, state, fonts),
+            SceneId.GAME: GameScene(client, state, fonts),
+            SceneId.AFTER_MATCH: AfterMatchScene(client, state, fonts),
+        }
+        self.timers.schedule("keepalive", self.hb.interval, self._keepalive)
 
-    running = True
-    while running:
-        dt = clock.tick(60) / 1000.0
-
-        # --- Timery (UI state) ---
-        if state.toast_ttl > 0:
-            state.toast_ttl = max(0.0, state.toast_ttl - dt)
-            if state.toast_ttl <= 0:
-                state.toast = ""
-
-        # Round result overlay timer
-        if state.round_result_visible and state.round_result_ttl > 0:
-            state.round_result_ttl = max(0.0, state.round_result_ttl - dt)
-            if state.round_result_ttl <= 0:
-                state.round_result_visible = False
-                if state.pending_scene is not None:
-                    state.scene = state.pending_scene
-                    state.pending_scene = None
-
-        if reconnect_cooldown > 0:
-            reconnect_cooldown = max(0.0, reconnect_cooldown - dt)
-
-        # --- Client keepalive ---
-        if client.connected and (state.in_game or state.in_lobby):
-            pong_keepalive += dt
-            if pong_keepalive >= 1.5:
+    @property
+    def scene(self):
+        return self.scenes[self.state.scene]
+
+    # Watchdog: po WATCHDOG_S bez dat od serveru se odpojíme
+    def _watchdog(self) -> None:
+        if not self.client.connected:
+            return
+        silence = self.hb.silence()
+        if silence >= WATCHDOG_S:
+            log_err(
+                self.state, f"No data from server for {WATCHDOG_S:.0f}s. Disconnecting."
+            )
+            WATCHDOG_TIMEOUTS.inc()
+            self.client.close()
+        else:
+            self.timers.schedule("watchdog", WATCHDOG_S - silence, self._watchdog)
+
+    # Keepalive jen pokud linka skutečně mlčí (pongy/požadavky stačí)
+    def _keepalive(self) -> None:
+        state, hb = self.state, self.hb
+        if self.client.connected and (state.in_game or state.in_lobby):
+            if hb.keepalive_due():
                 try:
-                    client.send("REQ_PONG", "0")
+                    self.client.send("REQ_PONG", "0")
                 except Exception:
                     pass
-                pong_keepalive = 0.0
+            delay = hb.time_until_keepalive()
         else:
-            pong_keepalive = 0.0
+            delay = hb.interval
+        self.timers.schedule("keepalive", delay, self._keepalive)
+
+    def idle(self) -> bool:
+        return self.client.inbox.empty() and self.client.errors.empty()
+
+    def wait_timeout(self, timeout: float) -> float:
+        """`timeout` cut down to the next timer / animation frame."""
+        anim = self.scene.animation_interval()
+        if anim is not None:
+            timeout = min(timeout, anim)
+        nxt = self.timers.time_until_next()
+        if nxt is not None:
+            timeout = min(timeout, nxt)
+        return timeout
+
+    def update(self) -> int:
+        """Timers, network messages, errors and reconnect; returns work done."""
+        client, state, timers, hb = self.client, self.state, self.timers, self.hb
+        selector = self.selector
+
+        # --- Timery (toast, round overlay, watchdog, keepalive, ...) ---
+        fired = timers.run_due()
+
+        if client.connected and not timers.pending("watchdog"):
+            note_server_contact(state, hb.last_rx)
+            timers.schedule("watchdog", WATCHDOG_S, self._watchdog)
 
         # 1) Zpracování příchozích zpráv
+        drained = 0
         while True:
             try:
                 msg = client.inbox.get_nowait()
-                state.last_server_contact = pygame.time.get_ticks()
+                t0 = TRACER.on and now_us()
+                drained += 1
+                # Snímek už obsahuje i tuto zprávu (síťové vlákno redukuje před
+                # zařazením), scény a boti tak nečtou stav z minulého snímku
+                state.match = self.store.swap()
+                note_server_contact(state, hb.last_rx)
                 log_rx(state, msg)
-                nxt = scenes[state.scene].on_message(msg)
+                answered = state.pending.complete(msg)
+                if answered is not None:
+                    hb.note_rtt(answered[1])
+                if msg.type_desc == "RES_RESUMED":
+                    log_sys(state, "SESSION: Resumed, missed messages replayed.")
+                elif msg.type_desc == "RES_RESUME_FAIL" and state.username:
+                    log_sys(state, "SESSION: Resume refused, logging in again.")
+                    try:
+                        state.pending.begin("REQ_LOGIN")
+                        client.send("REQ_LOGIN", state.username)
+                    except Exception:
+                        state.pending.cancel("REQ_LOGIN")
+                if self.bot is not None and msg.type_desc == "RES_ROUND_RESULT":
+                    self._bot_observe(msg.params)
+                nxt = self.scene.on_message(msg)
                 if nxt:
                     state.scene = nxt
+                if self.history is not None:
+                    self.history.feed(msg)
+                if t0:
+                    TRACER.handled(msg, t0)
             except Empty:
                 break
 
-        # 2) Watchdog (detekce ticha ze strany serveru)
-        if client.connected and state.last_server_contact > 0:
-            # Sjednocený timeout pro všechny herní fáze (Lobby, Game, AfterMatch)
-            if pygame.time.get_ticks() - state.last_server_contact > 20000:
-                log_err(state, "No data from server for 20s. Disconnecting.")
+        # Konzistentní snímek stavu zápasu pro kreslení celého framu
+        state.match = self.store.swap()
+
+        # 2) Zpracování chyb sítě (před reconnectem, ať nezavřeme nové spojení)
+        while True:
+            try:
+                err = client.errors.get_nowait()
+                log_err(state, f"Network error: {err}")
                 client.close()
-                state.last_server_contact = 0
+                state.pending.clear()
+
+                # FIX: Pokud nastane chyba (např. WinError 10038) v AFTER_MATCH,
+                # neresetujeme scénu ani jméno, aby mohl proběhnout reconnect.
+                if state.scene not in (SceneId.GAME, SceneId.AFTER_MATCH):
+                    state.scene = SceneId.CONNECT
+                    state.username = ""
+            except Empty:
+                break
 
         # 3) Reconnect logika
         # FIX: Povolujeme automatický reconnect v GAME i AFTER_MATCH fázích.
         if (not client.connected) and state.username:
             if state.scene in (SceneId.GAME, SceneId.AFTER_MATCH):
-                if reconnect_cooldown <= 0:
+                if not timers.pending("reconnect_cooldown"):
+                    if self.reconnect_failures == 0 and len(selector.endpoints) > 1:
+                        selector.probe_async()
+                    state.pending.clear()
                     try:
                         log_sys(
                             state, "Attempting to restore socket (Session Reconnect)..."
                         )
+                        RECONNECT_ATTEMPTS.inc()
                         client.connect()
+                        self.reconnect_failures = 0
                         if client.connected:
-                            state.last_server_contact = pygame.time.get_ticks()
-                            client.send("REQ_LOGIN", state.username)
-                        reconnect_cooldown = 2.0
+                            note_server_contact(state, hb.last_rx)
+                            state.pending.begin("REQ_RESUME")
+                            if not client.begin_resume():
+                                state.pending.cancel("REQ_RESUME")
+                                state.pending.begin("REQ_LOGIN")
+                                client.send("REQ_LOGIN", state.username)
+                        timers.schedule("reconnect_cooldown", RECONNECT_COOLDOWN_S)
                     except Exception:
-                        reconnect_cooldown = 2.0
+                        self.reconnect_failures += 1
+                        current = (client.host, client.port)
+                        fallback = selector.next_after(current)
+                        if (
+                            self.reconnect_failures >= RECONNECT_MAX_FAILURES
+                            and fallback is not None
+                        ):
+                            log_sys(
+                                state,
+                                f"{format_endpoint(current)} unreachable, failing"
+                                f" over to {format_endpoint(fallback)}",
+                            )
+                            ENDPOINT_FAILOVERS.inc()
+                            client.host, client.port = fallback
+                            self.reconnect_failures = 0
+                        timers.schedule("reconnect_cooldown", RECONNECT_COOLDOWN_S)
             else:
                 # Pokud jsme v lobby nebo menu a ztratíme spojení, jdeme na login
                 log_sys(state, "Connection lost. Returning to menu.")
+                state.pending.clear()
                 state.scene = SceneId.CONNECT
                 state.username = ""
                 state.in_lobby = False
                 state.in_game = False
 
-        # 4) Zpracování chyb sítě
+        return fired + drained
+
+    def _bot_observe(self, p: List[str]) -> None:
+        # winner, p1 move, p2 move, ...; which player we are from the ids
+        match = self.state.match
+        try:
+            me = int(self.state.user_id)
+        except ValueError:
+            return
+        if len(p) >= 3 and me and me in (match.p1_id, match.p2_id):
+            mine, theirs = (p[1], p[2]) if me == match.p1_id else (p[2], p[1])
+            self.engine.observe(self.bot, mine, theirs)
+
+    def bot_turn(self) -> bool:
+        """Bot session that may move now (asks the engine for a move)."""
+        state = self.state
+        if (
+            self.bot is None
+            or state.scene != SceneId.GAME
+            or not state.in_game
+            or state.waiting_for_opponent
+            or state.round_result_visible
+            or self.scene.reconnect_wait
+            or not self.client.connected
+        ):
+            return False
+        self.engine.request(self.bot)
+        return True
+
+    def local(self, e: pygame.event.Event) -> pygame.event.Event:
+        """`e` with its mouse position relative to this viewport."""
+        if self.viewport.topleft == (0, 0) or not hasattr(e, "pos"):
+            return e
+        x, y = e.pos
+        return pygame.event.Event(
+            e.type, {**e.dict, "pos": (x - self.viewport.x, y - self.viewport.y)}
+        )
+
+    def move_hover(self, pos: Tuple[int, int]) -> List[pygame.Rect]:
+        """Hover for a pointer at window position `pos`; window-space dirty rects."""
+        ox, oy = self.viewport.topleft
+        dirty = self.hover.update(self.scene.hits, (pos[0] - ox, pos[1] - oy))
+        return [r.move(ox, oy) for r in dirty]
+
+    def sync_hover(self) -> List[pygame.Rect]:
+        dirty = self.hover.sync(self.scene.hits, self.viewport.topleft)
+        return [r.move(self.viewport.topleft) for r in dirty]
+
+    def handle_event(self, e: pygame.event.Event) -> None:
+        # Otevřená konzole si bere scroll a psaní filtru
+        if self.state.debug_visible and self.state.console.handle_event(e):
+            return
+        self.scene.handle_event(self.local(e))
+
+    def _frame_key(self) -> tuple:
+        history = self.state.history
+        return (
+            self.state.scene,
+            self.state.match.version,
+            self.state.log.total,
+            history.version if history is not None else 0,
+        )
+
+    def needs_draw(self) -> bool:
+        """Whether the view may be stale (new state version, log line, animation)."""
+        return (
+            self._frame_key() != self.drawn_key
+            or self.scene.animation_interval() is not None
+        )
+
+    def draw(self) -> None:
+        self.scene.draw(self.view)
+        self.drawn_key = self._frame_key()
+
+
+def toggle_trace(state: AppState, path: str) -> None:
+    """Start latency tracing, or stop it and write the Chrome trace to `path`."""
+    if not TRACER.on:
+        TRACER.start()
+        log_sys(state, f"TRACE: Recording (F3 again writes {path}).")
+        return
+    TRACER.stop()
+    try:
+        n = TRACER.dump(path)
+        log_sys(state, f"TRACE: {n} events written to {path}.")
+    except OSError as e:
+        log_err(state, f"TRACE: Cannot write {path}: {e}")
+
+
+def layout(n: int) -> Tuple[Tuple[int, int], List[Tuple[int, int]]]:
+    """Window size and viewport origins for `n` sessions (near-square grid)."""
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    origins = [((i % cols) * W, (i // cols) * H) for i in range(n)]
+    return (cols * W, rows * H), origins
+
+
+def main(
+    argv=None,
+    clock: Optional[SystemClock] = None,
+    on_frame: Optional[Callable[[AppState, Dict[SceneId, object]], None]] = None,
+):
+    t_start = time.perf_counter()
+    args = parse_args(argv)
+    # Jediný zdroj času pro timery, heartbeat i čekání smyčky (testy ho zrychlí)
+    if clock is None:
+        clock = make_clock(args.time_scale)
+    n_sessions = max(1, args.sessions)
+
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        exporter = MetricsExporter(
+            REGISTRY, args.metrics_file, args.metrics_port, args.metrics_interval
+        )
+        exporter.start()
+
+    # Jen subsystémy, které používáme (display zahrnuje i události)
+    if args.legacy_startup:
+        pygame.init()
+    else:
+        pygame.display.init()
+        pygame.font.init()
+    window_size, origins = layout(n_sessions)
+    title = "UPS – Rock Paper Scissors"
+    if n_sessions > 1:
+        title += f" ({n_sessions} sessions)"
+    backend, backend_note = create_backend(args.renderer, window_size, title)
+    frame_clock = pygame.time.Clock()
+    t_init = time.perf_counter()
+
+    fonts = load_fonts(use_cache=not args.legacy_startup)
+    build_default_atlases(fonts)
+    t_fonts = time.perf_counter()
+
+    selector = EndpointSelector(
+        parse_endpoints(args.server or ["127.0.0.1:10000"]), profile=args.transport
+    )
+    host, port = selector.best()
+
+    # Historie zápasů: jedna databáze pro všechny session, zápis ve vlákně
+    history = None
+    startup_errors = [backend_note] if backend_note else []
+    if args.history != "off":
+        try:
+            history = HistoryStore(args.history or default_history_path())
+        except (OSError, sqlite3.Error) as e:
+            startup_errors.append(f"Match history disabled: {e}")
+
+    # Sdílené: fonty, atlasy, statická grafika; vlastní: stav, spojení, scény
+    sessions: List[Session] = []
+    canvas = backend.begin()
+    for i, origin in enumerate(origins):
+        client = TcpLineClient(host, port, args.transport, args.resume, clock)
+        state = AppState(timers=TimerService(clock), history=history)
+        session = Session(i, client, state, fonts, selector, origin)
+        session.view = (
+            canvas if n_sessions == 1 else canvas.subsurface(session.viewport)
+        )
+        toast(state, "Welcome.", 3.0)
+        for note in startup_errors:
+            log_err(state, note)
+        sessions.append(session)
+    focus = sessions[0]
+
+    # Boti: jeden StrategyEngine pro všechny session, tahy dávkově jednou za snímek
+    engine = None
+    bots: Dict[int, Session] = {}
+    if args.bot:
+        models = [m.strip() or "none" for m in args.bot.split(",")]
+        if len(models) == 1:
+            models *= n_sessions
+        try:
+            from strategy import StrategyEngine
+
+            engine = StrategyEngine(n_sessions)
+            slots = [None if m == "none" else engine.add(m) for m in models]
+        except (ImportError, ValueError) as e:
+            engine = None
+            for session in sessions:
+                log_err(session.state, f"Bot play disabled: {e}")
+        else:
+            for session, slot in zip(sessions, slots):
+                if slot is not None:
+                    session.engine, session.bot = engine, slot
+                    bots[slot] = session
+    if args.trace:
+        toggle_trace(focus.state, args.trace_file)
+
+    recorder = None
+    if args.record:
+        recorder = FrameRecorder(
+            args.record,
+            window_size,
+            args.record_format,
+            args.record_buffers,
+            [s.state.log for s in sessions],
+        )
+
+    # Síťové vlákno probudí smyčku přes NET_EVENT (stačí jeden ve frontě)
+    NET_EVENT = pygame.event.custom_type()
+    enable_events(NET_EVENT)
+    net_wake = threading.Event()
+
+    def wake_ui() -> None:
+        if not net_wake.is_set():
+            net_wake.set()
+            try:
+                pygame.event.post(pygame.event.Event(NET_EVENT))
+            except pygame.error:
+                net_wake.clear()
+
+    for session in sessions:
+        session.client.wakeup = wake_ui
+    if history is not None:
+        history.on_commit = wake_ui
+    selector.wakeup = wake_ui
+    if len(selector.endpoints) > 1:
+        selector.probe_async()
+
+    first_frame = True
+    running = True
+    while running:
+        # Spíme do události / síťové zprávy / nejbližšího deadline / animace
+        events = []
+        if not first_frame and all(s.idle() for s in sessions):
+            timeout = IDLE_MAX_S
+            for session in sessions:
+                timeout = session.wait_timeout(timeout)
+            if recorder is not None and recorder.behind:
+                timeout = min(timeout, RECORD_RETRY_S)
+            real = clock.wait(timeout)
+            if real > 0:
+                first = pygame.event.wait(max(1, math.ceil(real * 1000)))
+            else:
+                first = pygame.event.poll()
+            if first.type != pygame.NOEVENT:
+                events.append(first)
+        first_frame = False
+        frame_clock.tick(clock.frame(60))
+        frame_start = time.perf_counter()
+
+        # Timery, zprávy, chyby a reconnect každé session
+        net_wake.clear()
+        INBOX_DEPTH.set(sum(s.client.inbox.qsize() for s in sessions))
+        drain_start = time.perf_counter()
+        busy = {s: s.update() for s in sessions}
+        DRAIN_SECONDS.observe(time.perf_counter() - drain_start)
+
+        # Boti na tahu: všechny tahy z jednoho tick() enginu
+        if engine is not None and any([s.bot_turn() for s in bots.values()]):
+            for slot, move in engine.tick().items():
+                session = bots[slot]
+                session.scenes[SceneId.GAME]._choose(move)
+                busy[session] += 1
+
+        # Výsledky měření serverů (na menu rovnou přepneme na nejrychlejší)
         while True:
             try:
-                err = client.errors.get_nowait()
-                log_err(state, f"Network error: {err}")
-                client.close()
+                selector.ranking = selector.results.get_nowait()
+            except Empty:
+                break
+            for session in sessions:
+                log_sys(
+                    session.state,
+                    "Endpoints: " + "; ".join(map(str, selector.ranking)),
+                )
+                if (
+                    not session.client.connected
+                    and session.state.scene == SceneId.CONNECT
+                ):
+                    session.scenes[SceneId.CONNECT].set_endpoint(*selector.best())
 
-                # FIX: Pokud nastane chyba (např. WinError 10038) v AFTER_MATCH,
-                # neresetujeme scénu ani jméno, aby mohl proběhnout reconnect.
-                if state.scene not in (SceneId.GAME, SceneId.AFTER_MATCH):
-                    state.scene = SceneId.CONNECT
-                    state.username = ""
+        # Neuložené dávky historie (zapisovací vlákno běží dál) do logu
+        while history is not None:
+            try:
+                err = history.errors.get_nowait()
             except Empty:
                 break
+            for session in sessions:
+                log_err(session.state, err)
 
-        # 5) Události Pygame + Vykreslování
-        for e in pygame.event.get():
+        # 4) Události Pygame + Vykreslování
+        events.extend(pygame.event.get())
+        hover_dirty: Dict[Session, List[pygame.Rect]] = {s: [] for s in sessions}
+        for e in coalesce_motion(events):
+            if e.type == NET_EVENT:
+                continue
+            # Pohyb myši jen posouvá hover (přes hit index scény)
+            if e.type == pygame.MOUSEMOTION:
+                for session in sessions:
+                    hover_dirty[session] += session.move_hover(e.pos)
+                continue
             if e.type == pygame.QUIT:
                 running = False
-            scenes[state.scene].handle_event(e)
+                for session in sessions:
+                    busy[session] += 1
+                    session.handle_event(e)
+                continue
+            # F3 zapíná/vypíná trasování latence (při vypnutí ho zapíšeme)
+            if e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                toggle_trace(focus.state, args.trace_file)
+                busy[focus] += 1
+                continue
+            # Klik přepne fokus (klávesnice) na viewport pod kurzorem
+            if e.type == pygame.MOUSEBUTTONDOWN and n_sessions > 1:
+                for session in sessions:
+                    if session.viewport.collidepoint(e.pos):
+                        focus = session
+            t0 = TRACER.on and now_us()
+            busy[focus] += 1
+            focus.handle_event(e)
+            if t0:
+                TRACER.input(pygame.event.event_name(e.type), t0)
+
+        # Kreslíme jen když se něco mohlo změnit (verze stavu, log, vstup, ...)
+        full = []
+        partial = []
+        for session in sessions:
+            hover_dirty[session] += session.sync_hover()
+            if busy[session] or session.needs_draw():
+                full.append(session)
+            elif hover_dirty[session]:
+                partial.append(session)
+        if full or partial:
+            t_draw = TRACER.on and now_us()
+            backend.begin()
+            rects = None
+            if backend.keeps_frame:
+                for session in full + partial:
+                    session.draw()
+                # Jen změna hoveru -> na displej stačí dotčená tlačítka
+                if len(full) < n_sessions:
+                    rects = [s.viewport for s in full]
+                    for session in partial:
+                        rects += hover_dirty[session]
+            else:
+                for session in sessions:
+                    session.draw()
+            if t_draw:
+                TRACER.complete("draw", "ui", t_draw)
+            # Záznam jen kopíruje pixely do bufferu, kódování běží ve vlákně
+            if recorder is not None:
+                recorder.capture(backend, rects)
+            t_present = TRACER.on and now_us()
+            backend.present(rects)
+            if t_present:
+                TRACER.presented(t_present)
+        else:
+            FRAMES_SKIPPED.inc()
+            # Zahozený snímek dohrajeme, jakmile se uvolní buffer
+            if recorder is not None and recorder.behind:
+                recorder.capture(backend, [])
+
+        # Háček pro headless harness (soak.py): stav + scény po každém snímku
+        if on_frame is not None:
+            for session in sessions:
+                on_frame(session.state, session.scenes)
+
+        if args.exit_after_first_frame:
+            t_frame = time.perf_counter()
+            print(
+                f"STARTUP init_ms={1000 * (t_init - t_start):.1f}"
+                f" fonts_ms={1000 * (t_fonts - t_init):.1f}"
+                f" first_frame_ms={1000 * (t_frame - t_start):.1f}",
+                flush=True,
+            )
+            running = False
 
-        scenes[state.scene].draw(screen)
-        pygame.display.flip()
+        LOG_LINES.set(sum(len(s.state.log) for s in sessions))
+        FRAME_SECONDS.observe(time.perf_counter() - frame_start)
 
-    client.close()
+    for session in sessions:
+        session.client.close()
+    if TRACER.on:
+        toggle_trace(focus.state, args.trace_file)
+    if history is not None:
+        history.close()
+    if recorder is not None:
+        recorder.close()
+        print(
+            f"RECORD {args.record}: {recorder.frames} frames,"
+            f" {recorder.dropped} dropped",
+            flush=True,
+        )
+    backend.close()
+    if exporter is not None:
+        exporter.stop()
     pygame.quit()
 
 
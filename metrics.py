@@ -0,0 +1,440 @@
+import os
+import socket
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# =============================
+# Metrics registry
+# =============================
+#
+# Observations are plain attribute updates (no locks) so the hot path stays
+# well below a microsecond. Under the GIL a lost increment is possible only
+# when two threads race on the very same child, which is acceptable for
+# telemetry.
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, v: float) -> None:
+        self.value = v
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+    def dec(self, n: float = 1.0) -> None:
+        self.value -= n
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bound plus the implicit +Inf bucket.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Bucket-interpolated quantile estimate (like histogram_quantile)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        acc = 0
+        lo = 0.0
+        for i, n in enumerate(self.counts):
+            if acc + n >= rank and n > 0:
+                if i >= len(self.bounds):
+                    return self.bounds[-1] if self.bounds else 0.0
+                hi = self.bounds[i]
+                return lo + (hi - lo) * ((rank - acc) / n)
+            acc += n
+            if i < len(self.bounds):
+                lo = self.bounds[i]
+        return self.bounds[-1] if self.bounds else 0.0
+
+
+class _Metric:
+    kind = ""
+    _child_cls: type = _CounterChild
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._default = None if self.labelnames else self._new_child()
+        if self._default is not None:
+            self._children[()] = self._default
+
+    def _new_child(self):
+        return self._child_cls()
+
+    def labels(self, *values: str):
+        key = tuple(values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name}: expected labels {self.labelnames}, got {key!r}"
+                )
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        return list(self._children.items())
+
+
+class Counter(_Metric):
+    kind = "counter"
+    _child_cls = _CounterChild
+
+    def inc(self, n: float = 1.0) -> None:
+        self._default.value += n
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    _child_cls = _GaugeChild
+
+    def set(self, v: float) -> None:
+        self._default.value = v
+
+    def inc(self, n: float = 1.0) -> None:
+        self._default.value += n
+
+    def dec(self, n: float = 1.0) -> None:
+        self._default.value -= n
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, v: float) -> None:
+        self._default.observe(v)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ):
+        return self._register(Histogram(name, help_text, buckets, labelnames))
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Plain-data copy of every metric (picklable, for merging elsewhere)."""
+        out: Dict[str, dict] = {}
+        for m in self.metrics():
+            children = {}
+            for values, child in m.children():
+                if isinstance(child, _HistogramChild):
+                    children[values] = (list(child.counts), child.sum, child.count)
+                else:
+                    children[values] = child.value
+            out[m.name] = {
+                "kind": m.kind,
+                "help": m.help,
+                "labelnames": m.labelnames,
+                "buckets": getattr(m, "buckets", None),
+                "children": children,
+            }
+        return out
+
+    def merge(self, snap: Dict[str, dict]) -> None:
+        """Add a snapshot into this registry (counters, gauges and histograms sum)."""
+        for name, d in snap.items():
+            if d["kind"] == "histogram":
+                m = self.histogram(name, d["help"], d["buckets"], d["labelnames"])
+            elif d["kind"] == "gauge":
+                m = self.gauge(name, d["help"], d["labelnames"])
+            else:
+                m = self.counter(name, d["help"], d["labelnames"])
+            for values, v in d["children"].items():
+                child = m.labels(*values)
+                if isinstance(child, _HistogramChild):
+                    counts, total, n = v
+                    for i, c in enumerate(counts):
+                        child.counts[i] += c
+                    child.sum += total
+                    child.count += n
+                else:
+                    child.value += v
+
+
+# =============================
+# Prometheus text format
+# =============================
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(
+    names: Tuple[str, ...], values: Tuple[str, ...], extra: str = ""
+) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_float(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if v == int(v):
+        return str(int(v))
+    return repr(float(v))
+
+
+def render_text(registry: "Registry") -> str:
+    out: List[str] = []
+    for m in registry.metrics():
+        out.append(f"# HELP {m.name} {m.help}")
+        out.append(f"# TYPE {m.name} {m.kind}")
+        for values, child in m.children():
+            if isinstance(child, _HistogramChild):
+                acc = 0
+                for bound, n in zip(child.bounds + (float("inf"),), child.counts):
+                    acc += n
+                    le = 'le="' + _fmt_float(bound) + '"'
+                    out.append(
+                        f"{m.name}_bucket{_fmt_labels(m.labelnames, values, le)} {acc}"
+                    )
+                lbl = _fmt_labels(m.labelnames, values)
+                out.append(f"{m.name}_sum{lbl} {_fmt_float(child.sum)}")
+                out.append(f"{m.name}_count{lbl} {child.count}")
+            else:
+                lbl = _fmt_labels(m.labelnames, values)
+                out.append(f"{m.name}{lbl} {_fmt_float(child.value)}")
+    out.append("")
+    return "\n".join(out)
+
+
+# =============================
+# Exporter (file dump / localhost socket)
+# =============================
+
+
+class MetricsExporter:
+    """
+    Periodically writes the registry to `path` (atomic replace) and/or serves
+    it over HTTP on 127.0.0.1:`port` so a Prometheus scraper can pick it up.
+    """
+
+    def __init__(
+        self,
+        registry: "Registry",
+        path: Optional[str] = None,
+        port: Optional[int] = None,
+        interval: float = 5.0,
+    ):
+        self.registry = registry
+        self.path = path
+        self.port = port
+        self.interval = interval
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> None:
+        if self.path:
+            self._thread = threading.Thread(target=self._dump_loop, daemon=True)
+            self._thread.start()
+
+        if self.port is not None:
+            registry = self.registry
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_GET(self):  # noqa: N802 (http.server API)
+                    body = render_text(registry).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header(
+                        "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                    )
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._httpd = ThreadingHTTPServer(("127.0.0.1", self.port), _Handler)
+            self._httpd.daemon_threads = True
+            threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._httpd is not None:
+            try:
+                self._httpd.shutdown()
+                self._httpd.server_close()
+            except (OSError, socket.error):
+                pass
+            self._httpd = None
+        if self.path:
+            self.dump()
+
+    def dump(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(render_text(self.registry))
+        os.replace(tmp, self.path)
+
+    def _dump_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.dump()
+            except OSError:
+                pass
+
+
+# =============================
+# Client metrics
+# =============================
+
+REGISTRY = Registry()
+
+_LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+_FRAME_BUCKETS = (0.002, 0.004, 0.008, 0.012, 0.0167, 0.025, 0.033, 0.05, 0.1, 0.25)
+_DRAIN_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+MESSAGES_RX = REGISTRY.counter(
+    "ups_messages_received_total", "Decoded messages received.", ("type",)
+)
+MESSAGES_TX = REGISTRY.counter("ups_messages_sent_total", "Messages sent.", ("type",))
+MALFORMED_LINES = REGISTRY.counter(
+    "ups_malformed_lines_total", "Received lines that failed to decode."
+)
+RECONNECT_ATTEMPTS = REGISTRY.counter(
+    "ups_reconnect_attempts_total", "Session reconnect attempts."
+)
+ENDPOINT_FAILOVERS = REGISTRY.counter(
+    "ups_endpoint_failovers_total", "Switches to another server endpoint."
+)
+RESUME_REPLAYED = REGISTRY.counter(
+    "ups_resume_replayed_total", "Messages replayed to the server after a resume."
+)
+RESUME_DUPLICATES = REGISTRY.counter(
+    "ups_resume_duplicates_total", "Numbered messages dropped as already seen."
+)
+WATCHDOG_TIMEOUTS = REGISTRY.counter(
+    "ups_watchdog_timeouts_total", "Disconnects caused by server silence."
+)
+INBOX_DEPTH = REGISTRY.gauge(
+    "ups_inbox_depth", "Messages waiting in the inbox at the start of a drain."
+)
+LOG_LINES = REGISTRY.gauge("ups_log_lines", "Lines held in the in-app log.")
+RTT_SECONDS = REGISTRY.histogram(
+    "ups_rtt_seconds",
+    "Request to response round-trip time.",
+    _LATENCY_BUCKETS,
+    ("request",),
+)
+REQUEST_TIMEOUTS = REGISTRY.counter(
+    "ups_request_timeouts_total", "Requests that got no response in time.", ("request",)
+)
+REQUESTS_SUPPRESSED = REGISTRY.counter(
+    "ups_requests_suppressed_total",
+    "Requests not sent because the same one was still in flight.",
+    ("request",),
+)
+FRAMES_SKIPPED = REGISTRY.counter(
+    "ups_frames_skipped_total", "Frames whose redraw was skipped (nothing changed)."
+)
+FRAME_SECONDS = REGISTRY.histogram(
+    "ups_frame_seconds", "Main loop frame time.", _FRAME_BUCKETS
+)
+DRAIN_SECONDS = REGISTRY.histogram(
+    "ups_inbox_drain_seconds",
+    "Time spent draining the inbox per frame.",
+    _DRAIN_BUCKETS,
+)
+ENDPOINT_PROBE_SECONDS = REGISTRY.histogram(
+    "ups_endpoint_probe_seconds",
+    "TCP connect time of an endpoint probe.",
+    _LATENCY_BUCKETS,
+    ("endpoint",),
+)
+FRAMES_RECORDED = REGISTRY.counter(
+    "ups_record_frames_total", "Frames handed to the session recorder."
+)
+FRAMES_DROPPED = REGISTRY.counter(
+    "ups_record_dropped_total",
+    "Frames the recorder dropped because every buffer was still encoding.",
+)
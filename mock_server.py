@@ -0,0 +1,424 @@
+import argparse
+import itertools
+import random
+import secrets
+import selectors
+import socket
+import time
+from typing import Dict, List, Optional
+
+from protocol import Message, encode, try_decode_line
+from resume import UNSEQUENCED, ResumeSession
+
+# =============================
+# Local mock server
+# =============================
+#
+# Single-threaded selectors server speaking the game protocol closely enough
+# for benchmarks, soak runs and load tests: login, lobbies, best-of-N matches,
+# rematch, leave/logout, RES_PING heartbeats, session restore on re-login and
+# the resume extension (numbered messages, REQ_RESUME gap replay).
+
+_BEATS = {"R": "S", "P": "R", "S": "P"}
+
+
+class _Conn:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.rbuf = b""
+        self.wbuf = bytearray()
+        self.player: Optional["_Player"] = None
+        # Outbound messages carry sequence numbers (resume negotiated)
+        self.sequenced = False
+
+
+class _Player:
+    def __init__(self, pid: int, name: str):
+        self.id = pid
+        self.name = name
+        self.conn: Optional[_Conn] = None
+        self.lobby: Optional["_Lobby"] = None
+        self.resume: Optional[ResumeSession] = None
+
+
+class _Lobby:
+    def __init__(self, name: str):
+        self.name = name
+        self.players: List[_Player] = []
+        self.in_game = False
+        self.after_match = False
+        self.moves: Dict[int, str] = {}
+        self.wins = [0, 0]
+        self.rematch: set = set()
+
+
+class MockServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 10000,
+        wins_needed: int = 2,
+        ping_interval: float = 3.0,
+    ):
+        self.wins_needed = wins_needed
+        self.ping_interval = ping_interval
+
+        self.sel = selectors.DefaultSelector()
+        self.lsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.lsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.lsock.bind((host, port))
+        self.lsock.listen(1024)
+        self.lsock.setblocking(False)
+        self.sel.register(self.lsock, selectors.EVENT_READ, None)
+        self.port = self.lsock.getsockname()[1]
+
+        self.players: Dict[str, _Player] = {}
+        self.lobbies: Dict[str, _Lobby] = {}
+        self.tokens: Dict[str, _Player] = {}
+        self._ids = itertools.count(1)
+        self._running = True
+
+    # --- I/O ---
+
+    def serve_forever(self) -> None:
+        next_ping = time.monotonic() + self.ping_interval
+        while self._running:
+            timeout = max(0.0, next_ping - time.monotonic())
+            for key, mask in self.sel.select(timeout):
+                if key.data is None:
+                    self._accept()
+                    continue
+                conn: _Conn = key.data
+                if mask & selectors.EVENT_READ:
+                    self._read(conn)
+                if mask & selectors.EVENT_WRITE:
+                    self._flush(conn)
+            if time.monotonic() >= next_ping:
+                next_ping = time.monotonic() + self.ping_interval
+                nonce = str(random.randint(1, 1_000_000))
+                for key in list(self.sel.get_map().values()):
+                    if key.data is not None:
+                        self._send(key.data, "RES_PING", nonce)
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                s, _ = self.lsock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            s.setblocking(False)
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sel.register(s, selectors.EVENT_READ, _Conn(s))
+
+    def _read(self, conn: _Conn) -> None:
+        try:
+            data = conn.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+        conn.rbuf += data
+        while b"\n" in conn.rbuf:
+            raw, conn.rbuf = conn.rbuf.split(b"\n", 1)
+            try:
+                msg = try_decode_line(raw.decode("utf-8", errors="replace"))
+            except ValueError:
+                self._drop(conn)
+                return
+            if msg is None:
+                continue
+            p = conn.player
+            if (
+                conn.sequenced
+                and p is not None
+                and p.resume is not None
+                and not p.resume.accept(msg)
+            ):
+                continue
+            self._handle(conn, msg)
+
+    def _send(self, conn: Optional[_Conn], type_desc: str, *params: str) -> None:
+        if conn is None:
+            return
+        p = conn.player
+        if (
+            conn.sequenced
+            and p is not None
+            and p.resume is not None
+            and type_desc not in UNSEQUENCED
+        ):
+            conn.wbuf += p.resume.stamp(type_desc, *params)
+        else:
+            conn.wbuf += encode(type_desc, *params)
+        self._flush(conn)
+
+    def _notify(self, p: _Player, type_desc: str, *params: str) -> None:
+        """Send to a player; while a resumable player is away, keep it for replay."""
+        if p.conn is not None:
+            self._send(p.conn, type_desc, *params)
+        elif p.resume is not None:
+            p.resume.stamp(type_desc, *params)
+
+    def _forget_resume(self, p: _Player) -> None:
+        if p.resume is not None:
+            self.tokens.pop(p.resume.token, None)
+            p.resume = None
+
+    def _flush(self, conn: _Conn) -> None:
+        try:
+            n = conn.sock.send(conn.wbuf)
+            del conn.wbuf[:n]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._drop(conn)
+            return
+        events = selectors.EVENT_READ
+        if conn.wbuf:
+            events |= selectors.EVENT_WRITE
+        try:
+            self.sel.modify(conn.sock, events, conn)
+        except (KeyError, ValueError):
+            pass
+
+    def _drop(self, conn: _Conn) -> None:
+        try:
+            self.sel.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+        p = conn.player
+        if p is not None and p.conn is conn:
+            p.conn = None
+            lobby = p.lobby
+            if lobby is not None and (lobby.in_game or lobby.after_match):
+                for o in lobby.players:
+                    if o is not p:
+                        self._notify(o, "RES_OPPONENT_DISCONNECTED", "30")
+            elif lobby is not None:
+                self._leave(p)
+
+    # --- Game logic ---
+
+    def _state_str(self, lobby: _Lobby, p: _Player) -> str:
+        p1 = lobby.players[0]
+        p2 = lobby.players[1] if len(lobby.players) > 1 else None
+        mv = lobby.moves.get(p.id, "")
+        return (
+            f"score={lobby.wins[0]}:{lobby.wins[1]};"
+            f"p1Id={p1.id};p2Id={p2.id if p2 else 0};"
+            f"p1Name={p1.name};p2Name={p2.name if p2 else ''};"
+            f"hasMoved={'true' if mv else 'false'};lastMove={mv}"
+        )
+
+    def _start_game(self, lobby: _Lobby) -> None:
+        lobby.in_game = True
+        lobby.after_match = False
+        lobby.moves.clear()
+        lobby.wins = [0, 0]
+        lobby.rematch.clear()
+        for p in lobby.players:
+            self._notify(p, "RES_GAME_STARTED")
+            self._notify(p, "RES_STATE", self._state_str(lobby, p))
+
+    def _leave(self, p: _Player) -> None:
+        lobby = p.lobby
+        if lobby is None:
+            return
+        p.lobby = None
+        lobby.players.remove(p)
+        for o in lobby.players:
+            o.lobby = None
+            if lobby.in_game or lobby.after_match:
+                self._notify(o, "RES_GAME_CANNOT_CONTINUE", "Opponent left")
+            else:
+                self._notify(o, "RES_LOBBY_LEFT")
+        self.lobbies.pop(lobby.name, None)
+
+    def _handle(self, conn: _Conn, msg: Message) -> None:
+        t, a = msg.type_desc, msg.params
+        p = conn.player
+
+        if t == "REQ_PONG":
+            return
+
+        if t == "REQ_RESUME":
+            self._resume(conn, a)
+            return
+
+        if t == "REQ_LOGIN":
+            name = a[0] if a else ""
+            if not name:
+                self._send(conn, "RES_LOGIN_FAIL")
+                return
+            p = self.players.get(name)
+            if p is None:
+                p = self.players[name] = _Player(next(self._ids), name)
+            elif p.conn is not None and p.conn is not conn:
+                self._drop(p.conn)
+            self._forget_resume(p)
+            p.conn = conn
+            conn.player = p
+            conn.sequenced = False
+            self._send(conn, "RES_LOGIN_OK", str(p.id))
+            lobby = p.lobby
+            if lobby is not None and (lobby.in_game or lobby.after_match):
+                self._send(conn, "RES_GAME_RESUMED")
+                self._send(conn, "RES_STATE", self._state_str(lobby, p))
+            return
+
+        if p is None:
+            self._send(conn, "RES_ERROR", "Not logged in")
+            return
+
+        if t == "REQ_RESUME_ENABLE":
+            self._forget_resume(p)
+            p.resume = ResumeSession(secrets.token_hex(8))
+            self.tokens[p.resume.token] = p
+            self._send(conn, "RES_RESUME_TOKEN", p.resume.token)
+            conn.sequenced = True
+            return
+
+        if t == "REQ_CREATE_LOBBY":
+            name = a[0] if a else ""
+            if not name or name in self.lobbies or p.lobby is not None:
+                self._send(conn, "RES_ERROR", "Cannot create lobby")
+                return
+            lobby = self.lobbies[name] = _Lobby(name)
+            lobby.players.append(p)
+            p.lobby = lobby
+            self._send(conn, "RES_LOBBY_CREATED", name)
+            return
+
+        if t == "REQ_JOIN_LOBBY":
+            name = a[0] if a else ""
+            lobby = self.lobbies.get(name)
+            if lobby is None or len(lobby.players) >= 2 or p.lobby is not None:
+                self._send(conn, "RES_ERROR", "Cannot join lobby")
+                return
+            lobby.players.append(p)
+            p.lobby = lobby
+            self._send(conn, "RES_LOBBY_JOINED", name)
+            self._start_game(lobby)
+            return
+
+        if t == "REQ_MOVE":
+            lobby = p.lobby
+            mv = (a[0] if a else "").strip().upper()
+            if lobby is None or not lobby.in_game or mv not in _BEATS:
+                self._send(conn, "RES_ERROR", "Unexpected move in this state")
+                return
+            if p.id in lobby.moves:
+                self._send(conn, "RES_ERROR", "Already moved")
+                return
+            lobby.moves[p.id] = mv
+            if len(lobby.moves) < 2:
+                return
+            p1, p2 = lobby.players
+            m1, m2 = lobby.moves[p1.id], lobby.moves[p2.id]
+            winner = 0
+            if _BEATS[m1] == m2:
+                winner = p1.id
+                lobby.wins[0] += 1
+            elif _BEATS[m2] == m1:
+                winner = p2.id
+                lobby.wins[1] += 1
+            lobby.moves.clear()
+            res = (str(winner), m1, m2, str(lobby.wins[0]), str(lobby.wins[1]))
+            for o in lobby.players:
+                self._notify(o, "RES_ROUND_RESULT", *res)
+            if max(lobby.wins) >= self.wins_needed:
+                mw = p1.id if lobby.wins[0] > lobby.wins[1] else p2.id
+                lobby.in_game = False
+                lobby.after_match = True
+                for o in lobby.players:
+                    self._notify(
+                        o,
+                        "RES_MATCH_RESULT",
+                        str(mw),
+                        str(lobby.wins[0]),
+                        str(lobby.wins[1]),
+                    )
+            return
+
+        if t == "REQ_REMATCH":
+            lobby = p.lobby
+            if lobby is None or not lobby.after_match:
+                self._send(conn, "RES_ERROR", "Unexpected rematch in this state")
+                return
+            lobby.rematch.add(p.id)
+            self._send(conn, "RES_REMATCH_READY")
+            if len(lobby.rematch) == 2:
+                self._start_game(lobby)
+            return
+
+        if t == "REQ_LEAVE_LOBBY":
+            if p.lobby is None:
+                self._send(conn, "RES_ERROR", "Unexpected leave in this state")
+                return
+            self._leave(p)
+            self._send(conn, "RES_LOBBY_LEFT")
+            return
+
+        if t == "REQ_LOGOUT":
+            self._leave(p)
+            self._forget_resume(p)
+            self.players.pop(p.name, None)
+            conn.player = None
+            self._send(conn, "RES_LOGOUT_OK")
+            return
+
+        self._send(conn, "RES_ERROR", f"Unknown request {t}")
+
+    def _resume(self, conn: _Conn, a: List[str]) -> None:
+        p = self.tokens.get(a[0]) if a else None
+        try:
+            last_seen = int(a[1])
+        except (IndexError, ValueError):
+            last_seen = -1
+        if p is None or p.resume is None or last_seen < 0:
+            self._send(conn, "RES_RESUME_FAIL", "Unknown session")
+            return
+        replay = p.resume.replay_after(last_seen)
+        if replay is None:
+            self._forget_resume(p)
+            self._send(conn, "RES_RESUME_FAIL", "Backlog exhausted")
+            return
+
+        old = p.conn
+        if old is not None and old is not conn:
+            old.player = None
+            self._drop(old)
+        p.conn = conn
+        conn.player = p
+        self._send(conn, "RES_RESUMED", str(p.resume.rx_seq))
+        conn.sequenced = True
+        for data in replay:
+            conn.wbuf += data
+        self._flush(conn)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Local mock game server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=10000)
+    ap.add_argument("--wins", type=int, default=2, help="round wins per match")
+    ap.add_argument("--ping-interval", type=float, default=3.0)
+    args = ap.parse_args(argv)
+
+    srv = MockServer(args.host, args.port, args.wins, args.ping_interval)
+    print(f"Mock server listening on {args.host}:{srv.port}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import selectors
+import socket
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from metrics import MESSAGES_TX
+from network import TcpLineClient, apply_profile, rearm_quickack
+from protocol import encode
+
+# =============================
+# Session multiplexer
+# =============================
+#
+# One selector thread serves many client sockets. Each MuxSession keeps the
+# TcpLineClient API (connect / send / close / connected / inbox / errors /
+# heartbeat), so scenes and bots do not care which transport they run on.
+
+
+class MuxSession(TcpLineClient):
+    def __init__(
+        self, mux: "SessionMultiplexer", host: str, port: int, profile: str = "default"
+    ):
+        super().__init__(host, port, profile)
+        self._mux = mux
+        self._out = bytearray()
+        self._out_lock = threading.Lock()
+
+    def connect(self) -> None:
+        if self.connected:
+            return
+
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        apply_profile(s, self.profile)
+        s.settimeout(5.0)
+        s.connect((self.host, self.port))
+        s.setblocking(False)
+
+        with self._out_lock:
+            self._out.clear()
+        self._sock = s
+        self._framer.reset()
+        self.heartbeat.reset()
+        self.running.set()
+        self._mux._call_soon(lambda: self._mux._register(self, s))
+
+    def close(self) -> None:
+        self.running.clear()
+        s = self._sock
+        self._sock = None
+        if s is not None:
+            self._mux._call_soon(lambda: self._mux._unregister(s))
+
+    def send(self, type_desc: str, *params: str) -> None:
+        s = self._sock
+        if not self.connected or s is None:
+            raise RuntimeError("Not connected")
+
+        data = encode(type_desc, *params)
+        try:
+            with self._out_lock:
+                if self._out:
+                    self._out += data
+                else:
+                    n = 0
+                    try:
+                        n = s.send(data)
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                    if n < len(data):
+                        self._out += data[n:]
+                        self._mux._call_soon(lambda: self._mux._want_write(self, s))
+            MESSAGES_TX.labels(type_desc).inc()
+            self.heartbeat.note_tx()
+        except Exception as e:
+            self.errors.put(f"Send failed: {e}")
+            self.close()
+
+    # --- selector thread ---
+
+    def _on_readable(self, s: socket.socket) -> None:
+        try:
+            chunk = s.recv(65536)
+            rearm_quickack(s, self.profile)
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception as e:
+            self.errors.put(f"Receive failed: {e}")
+            self.close()
+            self._wake()
+            return
+
+        if not chunk:
+            self.errors.put("Disconnected by server.")
+            self.close()
+            self._wake()
+            return
+
+        if not self._feed(chunk):
+            self.close()
+
+    def _on_writable(self, s: socket.socket) -> bool:
+        """Flush pending output. Returns True once the buffer is empty."""
+        with self._out_lock:
+            try:
+                n = s.send(self._out)
+                del self._out[:n]
+            except (BlockingIOError, InterruptedError):
+                return False
+            except Exception as e:
+                self.errors.put(f"Send failed: {e}")
+                self.close()
+                return True
+            return not self._out
+
+
+class SessionMultiplexer:
+    def __init__(self) -> None:
+        self._sel = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+
+        self._pending: Deque[Callable[[], None]] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self.running = threading.Event()
+
+    def session(self, host: str, port: int, profile: str = "default") -> MuxSession:
+        return MuxSession(self, host, port, profile)
+
+    def start(self) -> None:
+        if self.running.is_set():
+            return
+        self.running.set()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.running.clear()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for key in list(self._sel.get_map().values()):
+            if key.data is not None:
+                key.data.close()
+                try:
+                    key.fileobj.close()
+                except OSError:
+                    pass
+        self._sel.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    # --- called from any thread ---
+
+    def _call_soon(self, fn: Callable[[], None]) -> None:
+        self._pending.append(fn)
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    # --- selector thread only ---
+
+    def _register(self, session: MuxSession, s: socket.socket) -> None:
+        events = selectors.EVENT_READ
+        if session._out:
+            events |= selectors.EVENT_WRITE
+        try:
+            self._sel.register(s, events, session)
+        except (KeyError, ValueError):
+            pass
+
+    def _unregister(self, s: socket.socket) -> None:
+        try:
+            self._sel.unregister(s)
+        except (KeyError, ValueError):
+            pass
+        try:
+            s.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        s.close()
+
+    def _want_write(self, session: MuxSession, s: socket.socket) -> None:
+        try:
+            self._sel.modify(s, selectors.EVENT_READ | selectors.EVENT_WRITE, session)
+        except (KeyError, ValueError):
+            pass
+
+    def _loop(self) -> None:
+        while self.running.is_set():
+            for key, mask in self._sel.select():
+                session = key.data
+                if session is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                    continue
+
+                s = key.fileobj
+                # Socket replaced by close()/reconnect: its _unregister is
+                # queued; handling it could close the session's new socket
+                if session._sock is not s:
+                    continue
+                if mask & selectors.EVENT_READ:
+                    session._on_readable(s)
+                if mask & selectors.EVENT_WRITE and session._sock is s:
+                    if session._on_writable(s):
+                        try:
+                            self._sel.modify(s, selectors.EVENT_READ, session)
+                        except (KeyError, ValueError):
+                            pass
+
+            while self._pending:
+                self._pending.popleft()()
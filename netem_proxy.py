@@ -0,0 +1,594 @@
+import argparse
+import dataclasses
+import errno
+import itertools
+import json
+import os
+import random
+import selectors
+import socket
+import statistics
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import IO, Deque, Dict, List, Optional, Tuple
+
+from network import parse_endpoint
+
+# =============================
+# Network impairment proxy
+# =============================
+#
+# TCP proxy between the client and any server that degrades the link on
+# purpose: latency distributions, bandwidth caps, segment splitting and
+# coalescing, stalls and mid-stream resets, per direction ("up" = client ->
+# server, "down" = server -> client). A scenario file switches impairments
+# over time; every forwarded chunk is logged with its queueing delay so
+# client recovery times can be measured from the log.
+
+UPSTREAM_CONNECT_TIMEOUT_S = 5.0
+
+
+@dataclass(frozen=True)
+class Impairment:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # constant | uniform | normal | pareto (heavy tail: latency + jitter*(X-1))
+    distribution: str = "normal"
+    # bytes per second; None = unlimited
+    bandwidth: Optional[float] = None
+    # forward in segments of at most `split` bytes, `split_gap_ms` apart
+    split: int = 0
+    split_gap_ms: float = 1.0
+    # hold data for this long and forward it as one write
+    coalesce_ms: float = 0.0
+    # random stalls: mean seconds between stalls, stall length
+    stall_every_s: float = 0.0
+    stall_ms: float = 0.0
+    # reset a connection after an exponentially distributed lifetime (mean s)
+    reset_every_s: float = 0.0
+
+    def sample_delay(self, rng: random.Random) -> float:
+        base, j = self.latency_ms, self.jitter_ms
+        if self.distribution == "constant" or j <= 0:
+            d = base
+        elif self.distribution == "uniform":
+            d = rng.uniform(base - j, base + j)
+        elif self.distribution == "pareto":
+            d = base + j * (rng.paretovariate(3.0) - 1.0)
+        else:
+            d = rng.gauss(base, j)
+        return max(0.0, d) / 1000.0
+
+
+PRESETS: Dict[str, Dict[str, float]] = {
+    "lan": {"latency_ms": 1, "jitter_ms": 0.3},
+    "wifi": {"latency_ms": 15, "jitter_ms": 10, "distribution": "pareto"},
+    "mobile": {
+        "latency_ms": 80,
+        "jitter_ms": 40,
+        "bandwidth": 50_000,
+        "split": 64,
+        "coalesce_ms": 20,
+    },
+    "satellite": {"latency_ms": 300, "jitter_ms": 30, "bandwidth": 20_000},
+    "stally": {
+        "latency_ms": 30,
+        "jitter_ms": 10,
+        "stall_every_s": 20,
+        "stall_ms": 4000,
+    },
+    "flaky": {"latency_ms": 40, "jitter_ms": 20, "reset_every_s": 30},
+}
+
+_FIELDS = {f.name for f in dataclasses.fields(Impairment)}
+
+
+def make_impairment(base: Impairment, spec: dict) -> Impairment:
+    """`spec` may name a "preset" and override any Impairment field."""
+    fields = dict(PRESETS[spec["preset"]]) if "preset" in spec else {}
+    fields.update({k: v for k, v in spec.items() if k in _FIELDS})
+    unknown = set(spec) - _FIELDS - {"preset", "at", "up", "down", "reset"}
+    if unknown:
+        raise ValueError(f"Unknown impairment fields: {', '.join(sorted(unknown))}")
+    return dataclasses.replace(base, **fields)
+
+
+@dataclass(frozen=True)
+class Phase:
+    at: float
+    up: Impairment
+    down: Impairment
+    # reset every open connection when the phase starts
+    reset: bool = False
+
+
+def load_scenario(path: str, base: Impairment) -> List[Phase]:
+    """
+    {"phases": [{"at": 0, "preset": "wifi"},
+                {"at": 30, "stall_every_s": 5, "stall_ms": 3000},
+                {"at": 60, "reset": true, "down": {"latency_ms": 200}}]}
+    Each phase starts from `base` (the command-line impairment). Top-level
+    fields apply to both directions; "up"/"down" refine one side.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    phases = []
+    for spec in sorted(data["phases"], key=lambda p: p.get("at", 0)):
+        both = make_impairment(base, spec)
+        phases.append(
+            Phase(
+                at=float(spec.get("at", 0)),
+                up=make_impairment(both, spec.get("up", {})),
+                down=make_impairment(both, spec.get("down", {})),
+                reset=bool(spec.get("reset", False)),
+            )
+        )
+    return phases
+
+
+class _Direction:
+    def __init__(self, name: str, src: socket.socket, dst: socket.socket):
+        self.name = name
+        self.src = src
+        self.dst = dst
+        # (deliver_at, received_at, data) in FIFO order
+        self.queue: Deque[Tuple[float, float, bytes]] = deque()
+        self.out = bytearray()
+        self.last_at = 0.0
+        self.link_free_at = 0.0
+        self.coalesce_buf = bytearray()
+        self.coalesce_since = 0.0
+        self.coalesce_until = 0.0
+        self.stall_until = 0.0
+        self.next_stall_at: Optional[float] = None
+        self.eof = False
+
+    def idle(self) -> bool:
+        return not (self.queue or self.out or self.coalesce_buf)
+
+
+class _Conn:
+    def __init__(self, cid: int, client: socket.socket, upstream: socket.socket):
+        self.id = cid
+        self.client = client
+        self.upstream = upstream
+        self.peer = ""
+        self.up = _Direction("up", client, upstream)
+        self.down = _Direction("down", upstream, client)
+        self.opened_at = time.monotonic()
+        self.reset_at: Optional[float] = None
+        # Set while the upstream connect is still in progress
+        self.connect_deadline: Optional[float] = None
+        self.closed = False
+
+
+class ImpairmentProxy:
+    def __init__(
+        self,
+        listen: Tuple[str, int],
+        upstream: Tuple[str, int],
+        phases: List[Phase],
+        log: Optional[IO[str]] = None,
+        seed: Optional[int] = None,
+    ):
+        # Resolved once: the accept path must not block on DNS
+        self.upstream_addr = socket.getaddrinfo(
+            upstream[0], upstream[1], socket.AF_INET, socket.SOCK_STREAM
+        )[0][4]
+        self.phases = phases
+        self.log = log
+        self.rng = random.Random(seed)
+
+        self.sel = selectors.DefaultSelector()
+        self.lsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.lsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.lsock.bind(listen)
+        self.lsock.listen(64)
+        self.lsock.setblocking(False)
+        self.sel.register(self.lsock, selectors.EVENT_READ, None)
+        self.host, self.port = self.lsock.getsockname()[:2]
+
+        self.conns: Dict[int, _Conn] = {}
+        self._ids = itertools.count(1)
+        self._phase_idx = -1
+        self.up = Impairment()
+        self.down = Impairment()
+        self.t0 = time.monotonic()
+        self._running = True
+        # per-direction forwarding delays (s) for the summary
+        self.delays: Dict[str, List[float]] = {"up": [], "down": []}
+        self.bytes: Dict[str, int] = {"up": 0, "down": 0}
+
+    # --- logging ---
+
+    def _log(self, event: str, **fields) -> None:
+        if self.log is None:
+            return
+        row = {"t": round(time.monotonic() - self.t0, 6), "event": event}
+        row.update(fields)
+        self.log.write(json.dumps(row) + "\n")
+
+    # --- main loop ---
+
+    def serve_forever(self, duration: Optional[float] = None) -> None:
+        while self._running:
+            now = time.monotonic()
+            if duration is not None and now - self.t0 >= duration:
+                break
+            self._advance_phase(now)
+            for conn in list(self.conns.values()):
+                self._tick(conn, now)
+
+            timeout = self._next_wakeup(time.monotonic())
+            for key, mask in self.sel.select(timeout):
+                if key.data is None:
+                    self._accept()
+                    continue
+                conn, d = key.data
+                if conn.closed:
+                    continue
+                if conn.connect_deadline is not None:
+                    self._connected(conn)
+                    continue
+                if mask & selectors.EVENT_READ:
+                    self._read(conn, d)
+                if mask & selectors.EVENT_WRITE and not conn.closed:
+                    self._flush(conn, self._peer(conn, d))
+
+        for conn in list(self.conns.values()):
+            self._close(conn, "shutdown")
+        self.sel.close()
+        self.lsock.close()
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _advance_phase(self, now: float) -> None:
+        while (
+            self._phase_idx + 1 < len(self.phases)
+            and now - self.t0 >= self.phases[self._phase_idx + 1].at
+        ):
+            self._phase_idx += 1
+            ph = self.phases[self._phase_idx]
+            self.up, self.down = ph.up, ph.down
+            self._log(
+                "phase",
+                index=self._phase_idx,
+                up=dataclasses.asdict(ph.up),
+                down=dataclasses.asdict(ph.down),
+            )
+            for conn in self.conns.values():
+                for d in (conn.up, conn.down):
+                    d.next_stall_at = None
+                self._arm_reset(conn, now)
+            if ph.reset:
+                for conn in list(self.conns.values()):
+                    self._reset(conn, "scenario")
+
+    def _next_wakeup(self, now: float) -> float:
+        t = 0.5
+        if self._phase_idx + 1 < len(self.phases):
+            t = min(t, self.t0 + self.phases[self._phase_idx + 1].at - now)
+        for conn in self.conns.values():
+            if conn.connect_deadline is not None:
+                t = min(t, conn.connect_deadline - now)
+            if conn.reset_at is not None:
+                t = min(t, conn.reset_at - now)
+            for d in (conn.up, conn.down):
+                if d.coalesce_buf:
+                    t = min(t, d.coalesce_until - now)
+                if d.queue:
+                    t = min(t, max(d.queue[0][0], d.stall_until) - now)
+                if d.next_stall_at is not None and not d.idle():
+                    t = min(t, d.next_stall_at - now)
+        return max(0.0, t)
+
+    def _imp(self, d: _Direction) -> Impairment:
+        return self.up if d.name == "up" else self.down
+
+    def _peer(self, conn: _Conn, d: _Direction) -> _Direction:
+        """Direction whose destination is the socket `d` reads from."""
+        return conn.down if d is conn.up else conn.up
+
+    # --- connections ---
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                cs, addr = self.lsock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            # Non-blocking connect: the loop keeps serving the other
+            # connections, writability of `us` reports the outcome
+            us = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            for s in (cs, us):
+                s.setblocking(False)
+                s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            err = us.connect_ex(self.upstream_addr)
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                self._log("upstream_failed", error=os.strerror(err))
+                cs.close()
+                us.close()
+                continue
+            conn = _Conn(next(self._ids), cs, us)
+            conn.peer = f"{addr[0]}:{addr[1]}"
+            conn.connect_deadline = time.monotonic() + UPSTREAM_CONNECT_TIMEOUT_S
+            self.conns[conn.id] = conn
+            # The client is not read until upstream can take its bytes
+            self.sel.register(us, selectors.EVENT_WRITE, (conn, conn.down))
+
+    def _connected(self, conn: _Conn) -> None:
+        err = conn.upstream.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self._abort_connect(conn, os.strerror(err))
+            return
+        conn.connect_deadline = None
+        self.sel.modify(conn.upstream, selectors.EVENT_READ, (conn, conn.down))
+        self.sel.register(conn.client, selectors.EVENT_READ, (conn, conn.up))
+        self._arm_reset(conn, time.monotonic())
+        self._log("open", conn=conn.id, peer=conn.peer)
+
+    def _abort_connect(self, conn: _Conn, error: str) -> None:
+        conn.closed = True
+        try:
+            self.sel.unregister(conn.upstream)
+        except (KeyError, ValueError):
+            pass
+        for s in (conn.client, conn.upstream):
+            s.close()
+        self.conns.pop(conn.id, None)
+        self._log("upstream_failed", error=error)
+
+    def _arm_reset(self, conn: _Conn, now: float) -> None:
+        every = max(self.up.reset_every_s, self.down.reset_every_s)
+        conn.reset_at = now + self.rng.expovariate(1.0 / every) if every > 0 else None
+
+    def _reset(self, conn: _Conn, reason: str) -> None:
+        # SO_LINGER 0 turns close() into an RST
+        for s in (conn.client, conn.upstream):
+            try:
+                s.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+                )
+            except OSError:
+                pass
+        self._close(conn, f"reset:{reason}")
+
+    def _close(self, conn: _Conn, reason: str) -> None:
+        if conn.closed:
+            return
+        conn.closed = True
+        for s in (conn.client, conn.upstream):
+            try:
+                self.sel.unregister(s)
+            except (KeyError, ValueError):
+                pass
+            try:
+                s.close()
+            except OSError:
+                pass
+        self.conns.pop(conn.id, None)
+        self._log(
+            "close",
+            conn=conn.id,
+            reason=reason,
+            lifetime=round(time.monotonic() - conn.opened_at, 6),
+        )
+
+    # --- data path ---
+
+    def _read(self, conn: _Conn, d: _Direction) -> None:
+        try:
+            data = d.src.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        now = time.monotonic()
+        if not data:
+            d.eof = True
+            self._set_events(conn, d)
+            self._log("eof", conn=conn.id, dir=d.name)
+            self._maybe_finish(conn)
+            return
+
+        imp = self._imp(d)
+        if imp.coalesce_ms > 0:
+            if not d.coalesce_buf:
+                d.coalesce_since = now
+                d.coalesce_until = now + imp.coalesce_ms / 1000.0
+            d.coalesce_buf += data
+            return
+        self._enqueue(d, imp, bytes(data), now, now)
+
+    def _enqueue(
+        self, d: _Direction, imp: Impairment, data: bytes, now: float, rx_at: float
+    ) -> None:
+        pieces = [data]
+        if imp.split > 0:
+            pieces = [data[i : i + imp.split] for i in range(0, len(data), imp.split)]
+
+        at = max(now + imp.sample_delay(self.rng), d.last_at)
+        for i, piece in enumerate(pieces):
+            if i:
+                at += imp.split_gap_ms / 1000.0
+            if imp.bandwidth:
+                at = max(at, d.link_free_at)
+                d.link_free_at = at + len(piece) / imp.bandwidth
+            d.queue.append((at, rx_at, piece))
+        d.last_at = at
+
+    def _tick(self, conn: _Conn, now: float) -> None:
+        if conn.connect_deadline is not None:
+            if now >= conn.connect_deadline:
+                self._abort_connect(conn, "timed out")
+            return
+        if conn.reset_at is not None and now >= conn.reset_at:
+            self._reset(conn, "random")
+            return
+
+        for d in (conn.up, conn.down):
+            imp = self._imp(d)
+            if d.coalesce_buf and now >= d.coalesce_until:
+                data, d.coalesce_buf = bytes(d.coalesce_buf), bytearray()
+                self._enqueue(d, imp, data, now, d.coalesce_since)
+
+            if imp.stall_every_s > 0 and imp.stall_ms > 0:
+                if d.next_stall_at is None:
+                    d.next_stall_at = now + self.rng.expovariate(
+                        1.0 / imp.stall_every_s
+                    )
+                elif now >= d.next_stall_at:
+                    d.stall_until = now + imp.stall_ms / 1000.0
+                    d.next_stall_at = d.stall_until + self.rng.expovariate(
+                        1.0 / imp.stall_every_s
+                    )
+                    self._log("stall", conn=conn.id, dir=d.name, ms=imp.stall_ms)
+
+            if now < d.stall_until:
+                continue
+            moved = False
+            while d.queue and d.queue[0][0] <= now:
+                _, rx_at, piece = d.queue.popleft()
+                d.out += piece
+                delay = now - rx_at
+                self.delays[d.name].append(delay)
+                self.bytes[d.name] += len(piece)
+                self._log(
+                    "fwd",
+                    conn=conn.id,
+                    dir=d.name,
+                    bytes=len(piece),
+                    delay_ms=round(1000 * delay, 3),
+                )
+                moved = True
+                if imp.split > 0:
+                    # one write per segment so they leave as separate segments
+                    break
+            if moved:
+                self._flush(conn, d)
+                if conn.closed:
+                    return
+        self._maybe_finish(conn)
+
+    def _flush(self, conn: _Conn, d: _Direction) -> None:
+        if d.out:
+            try:
+                n = d.dst.send(d.out)
+                del d.out[:n]
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                self._close(conn, f"send_failed:{d.name}")
+                return
+        self._set_events(conn, self._peer(conn, d))
+
+    def _set_events(self, conn: _Conn, d: _Direction) -> None:
+        """Selector interest for d.src: read until EOF, write while its peer has output."""
+        events = 0 if d.eof else selectors.EVENT_READ
+        if self._peer(conn, d).out:
+            events |= selectors.EVENT_WRITE
+        try:
+            if events:
+                try:
+                    self.sel.modify(d.src, events, (conn, d))
+                except KeyError:
+                    self.sel.register(d.src, events, (conn, d))
+            else:
+                self.sel.unregister(d.src)
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def _maybe_finish(self, conn: _Conn) -> None:
+        if conn.closed:
+            return
+        for d in (conn.up, conn.down):
+            if d.eof and d.idle():
+                self._close(conn, f"eof:{d.name}")
+                return
+
+    # --- report ---
+
+    def summary(self) -> str:
+        lines = [f"{'dir':<6}{'chunks':>8}{'bytes':>10}{'p50 ms':>9}{'p95 ms':>9}"]
+        for name in ("up", "down"):
+            ds = sorted(self.delays[name])
+            if ds:
+                p50 = 1000 * statistics.median(ds)
+                p95 = 1000 * ds[min(len(ds) - 1, int(0.95 * len(ds)))]
+            else:
+                p50 = p95 = 0.0
+            lines.append(
+                f"{name:<6}{len(ds):>8}{self.bytes[name]:>10}{p50:>9.1f}{p95:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="TCP network-impairment proxy")
+    ap.add_argument("--listen", default="127.0.0.1:10001", help="HOST:PORT")
+    ap.add_argument("--upstream", default="127.0.0.1:10000", help="HOST:PORT")
+    ap.add_argument("--preset", choices=sorted(PRESETS))
+    ap.add_argument("--latency", type=float, help="mean one-way delay (ms)")
+    ap.add_argument("--jitter", type=float, help="delay spread (ms)")
+    ap.add_argument(
+        "--distribution", choices=("constant", "uniform", "normal", "pareto")
+    )
+    ap.add_argument("--bandwidth", type=float, help="bytes per second")
+    ap.add_argument("--split", type=int, help="max forwarded segment (bytes)")
+    ap.add_argument("--coalesce", type=float, help="coalescing window (ms)")
+    ap.add_argument("--stall-every", type=float, help="mean s between stalls")
+    ap.add_argument("--stall", type=float, help="stall length (ms)")
+    ap.add_argument("--reset-every", type=float, help="mean s between resets")
+    ap.add_argument("--scenario", help="JSON file with timed phases")
+    ap.add_argument("--duration", type=float, help="exit after this many seconds")
+    ap.add_argument("--log", help="write per-chunk JSON lines here")
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args(argv)
+
+    spec = {"preset": args.preset} if args.preset else {}
+    for field, value in (
+        ("latency_ms", args.latency),
+        ("jitter_ms", args.jitter),
+        ("distribution", args.distribution),
+        ("bandwidth", args.bandwidth),
+        ("split", args.split),
+        ("coalesce_ms", args.coalesce),
+        ("stall_every_s", args.stall_every),
+        ("stall_ms", args.stall),
+        ("reset_every_s", args.reset_every),
+    ):
+        if value is not None:
+            spec[field] = value
+    base = make_impairment(Impairment(), spec)
+    if args.scenario:
+        phases = load_scenario(args.scenario, base)
+    else:
+        phases = [Phase(at=0.0, up=base, down=base)]
+
+    log = open(args.log, "w", encoding="utf-8") if args.log else None
+    proxy = ImpairmentProxy(
+        parse_endpoint(args.listen),
+        parse_endpoint(args.upstream),
+        phases,
+        log=log,
+        seed=args.seed,
+    )
+    print(
+        f"Proxy {proxy.host}:{proxy.port} -> {args.upstream} ({len(phases)} phase(s))",
+        flush=True,
+    )
+    try:
+        proxy.serve_forever(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log is not None:
+            log.close()
+    print(proxy.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,169 @@
 import socket
+import sys
 import threading
+import time
+from dataclasses import dataclass
 from queue import Empty, Queue
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
+from heartbeat import HeartbeatManager
+from metrics import (
+    MALFORMED_LINES,
+    MESSAGES_RX,
+    MESSAGES_TX,
+    RESUME_DUPLICATES,
+    RESUME_REPLAYED,
+)
 from protocol import Message, encode, try_decode_line
+from resume import UNSEQUENCED, ResumeSession
+from tracing import TRACER, now_us
+
+
+def parse_endpoint(text: str, default_port: int = 10000) -> Tuple[str, int]:
+    """ "host:port" / "host" / "[v6addr]:port" -> (host, port)."""
+    text = text.strip()
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        port = rest.lstrip(":")
+    elif text.count(":") == 1:
+        host, port = text.split(":")
+    else:
+        host, port = text, ""
+    if not host:
+        raise ValueError(f"Invalid endpoint: {text!r}")
+    try:
+        return host, int(port) if port else default_port
+    except ValueError:
+        raise ValueError(f"Invalid port in endpoint {text!r}") from None
+
+
+# =============================
+# Transport profiles
+# =============================
+
+
+@dataclass(frozen=True)
+class TransportProfile:
+    name: str
+    nodelay: bool = False
+    # Linux only; the kernel clears it after each ACK, so it is re-armed per recv
+    quickack: bool = False
+    rcvbuf: Optional[int] = None
+    sndbuf: Optional[int] = None
+    # Kernel TCP keepalive (seconds / probe count); None = OS defaults / off
+    keepalive_idle: Optional[int] = None
+    keepalive_interval: Optional[int] = None
+    keepalive_count: Optional[int] = None
+    # recv() timeout used as a poll by the rx thread; None = block until data
+    # (close() shuts the socket down, which wakes a blocked recv)
+    recv_timeout: Optional[float] = 0.2
+
+
+PROFILES: Dict[str, TransportProfile] = {
+    "default": TransportProfile("default"),
+    "low_latency": TransportProfile(
+        "low_latency",
+        nodelay=True,
+        quickack=True,
+        rcvbuf=64 * 1024,
+        sndbuf=16 * 1024,
+        keepalive_idle=10,
+        keepalive_interval=3,
+        keepalive_count=3,
+        recv_timeout=None,
+    ),
+}
+
+
+def get_profile(name: str) -> TransportProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown transport profile {name!r} (choose from {', '.join(PROFILES)})"
+        ) from None
+
+
+def apply_profile(s: socket.socket, profile: TransportProfile) -> None:
+    """Set socket options for `profile`. Call before connect() (buffer sizes)."""
+    if profile.rcvbuf is not None:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, profile.rcvbuf)
+    if profile.sndbuf is not None:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, profile.sndbuf)
+    if profile.nodelay:
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    if profile.keepalive_idle is not None:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        idle = profile.keepalive_idle
+        intvl = profile.keepalive_interval or idle
+        if sys.platform == "win32":
+            s.ioctl(socket.SIO_KEEPALIVE_VALS, (1, idle * 1000, intvl * 1000))
+        else:
+            # macOS names the idle option TCP_KEEPALIVE
+            opt_idle = getattr(socket, "TCP_KEEPIDLE", None) or getattr(
+                socket, "TCP_KEEPALIVE", None
+            )
+            for opt, val in (
+                (opt_idle, idle),
+                (getattr(socket, "TCP_KEEPINTVL", None), intvl),
+                (getattr(socket, "TCP_KEEPCNT", None), profile.keepalive_count),
+            ):
+                if opt is not None and val is not None:
+                    s.setsockopt(socket.IPPROTO_TCP, opt, val)
+
+    rearm_quickack(s, profile)
+
+
+def rearm_quickack(s: socket.socket, profile: TransportProfile) -> None:
+    if profile.quickack and hasattr(socket, "TCP_QUICKACK"):
+        try:
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        except OSError:
+            pass
+
 
 # =============================
 # Network client
 # =============================
 
 
+class LineFramer:
+    """Splits a TCP byte stream into text lines (safe for split UTF-8)."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def reset(self) -> None:
+        self._buf.clear()
+
+    def feed(self, chunk: bytes) -> List[str]:
+        self._buf += chunk
+        if b"\n" not in chunk:
+            return []
+        *lines, rest = self._buf.split(b"\n")
+        self._buf = bytearray(rest)
+        return [ln.decode("utf-8", errors="replace") for ln in lines]
+
+
 class TcpLineClient:
-    def __init__(self, host: str, port: int):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        profile: str = "default",
+        resume: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.host = host
         self.port = port
+        self.profile = get_profile(profile)
+
+        # Session resume extension (see resume.py); negotiated after login
+        self.resume_enabled = resume
+        self.resume: Optional[ResumeSession] = None
+        self._resuming = False
+        self._send_lock = threading.Lock()
 
         self._sock: Optional[socket.socket] = None
         self._rx_thread: Optional[threading.Thread] = None
@@ -22,6 +172,16 @@ class TcpLineClient:
         self.inbox: "Queue[Message]" = Queue()
         self.errors: "Queue[str]" = Queue()
 
+        self.heartbeat = HeartbeatManager(clock)
+        self._framer = LineFramer()
+
+        # Called from the network thread after new inbox/errors entries
+        # (e.g. to post a pygame event so the UI loop can block on events).
+        self.wakeup: Optional[Callable[[], None]] = None
+        # Called on the network thread with each message before it is queued
+        # (e.g. StateStore.apply, so decoding work stays off the UI thread).
+        self.on_rx: Optional[Callable[[Message], None]] = None
+
     @property
     def connected(self) -> bool:
         return self._sock is not None and self.running.is_set()
@@ -31,11 +191,15 @@ class TcpLineClient:
             return
 
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        apply_profile(s, self.profile)
         s.settimeout(5.0)
         s.connect((self.host, self.port))
-        s.settimeout(0.2)
+        s.settimeout(self.profile.recv_timeout)
 
         self._sock = s
+        self._resuming = False
+        self._framer.reset()
+        self.heartbeat.reset()
         self.running.set()
         self._rx_thread = threading.Thread(target=self._rx_loop, daemon=True)
         self._rx_thread.start()
@@ -54,50 +218,169 @@ class TcpLineClient:
         self._sock = None
 
     def send(self, type_desc: str, *params: str) -> None:
-        if not self.connected or self._sock is None:
-            raise RuntimeError("Not connected")
+        with self._send_lock:
+            r = self.resume
+            if r is not None and type_desc not in UNSEQUENCED:
+                data = r.stamp(type_desc, *params)
+                if not self.connected or self._resuming:
+                    # Kept in the backlog and replayed after RES_RESUMED
+                    return
+            else:
+                if not self.connected or self._sock is None:
+                    raise RuntimeError("Not connected")
+                data = encode(type_desc, *params)
+            t0 = TRACER.on and now_us()
+            if self._write(data):
+                MESSAGES_TX.labels(type_desc).inc()
+            if t0:
+                TRACER.complete(f"send {type_desc}", "net", t0)
+            if type_desc == "REQ_LOGOUT":
+                self.resume = None
+
+    def begin_resume(self) -> bool:
+        """
+        Ask the server to resume the session on a fresh connection.
+        Returns False when there is nothing to resume (log in instead).
+        """
+        with self._send_lock:
+            r = self.resume
+            if r is None or not self.connected:
+                return False
+            self._resuming = True
+            if self._write(encode("REQ_RESUME", r.token, str(r.rx_seq))):
+                MESSAGES_TX.labels("REQ_RESUME").inc()
+            return True
+
+    def _write(self, data: bytes) -> bool:
+        s = self._sock
+        if s is None:
+            return False
         try:
-            self._sock.sendall(encode(type_desc, *params))
+            s.sendall(data)
+            self.heartbeat.note_tx()
+            return True
         except Exception as e:
             self.errors.put(f"Send failed: {e}")
             self.close()
+            return False
+
+    def _on_resume_control(self, msg: Message) -> Optional[Message]:
+        """
+        Network thread: drive the resume handshake. Returns a message to
+        queue instead of `msg` (None = queue `msg` unchanged).
+        """
+        t = msg.type_desc
+        if t == "RES_LOGIN_OK":
+            # A full login discards any earlier resumable session
+            with self._send_lock:
+                self.resume = None
+                self._resuming = False
+            if self.resume_enabled:
+                self.send("REQ_RESUME_ENABLE")
+        elif t == "RES_RESUME_TOKEN" and msg.params:
+            with self._send_lock:
+                self.resume = ResumeSession(msg.params[0])
+        elif t == "RES_RESUMED":
+            with self._send_lock:
+                r = self.resume
+                try:
+                    peer_seq = int(msg.params[0])
+                except (IndexError, ValueError):
+                    peer_seq = -1
+                replay = r.replay_after(peer_seq) if r and peer_seq >= 0 else None
+                self._resuming = False
+                if replay is None:
+                    self.resume = None
+                    return Message("RES_RESUME_FAIL", ["client backlog exhausted"])
+                for data in replay:
+                    if not self._write(data):
+                        break
+                    RESUME_REPLAYED.inc()
+        elif t == "RES_RESUME_FAIL":
+            with self._send_lock:
+                self.resume = None
+                self._resuming = False
+        return None
+
+    def _feed(self, chunk: bytes) -> bool:
+        """
+        Decode every complete line in `chunk` into the inbox.
+        Returns False on a fatal protocol error (connection must be closed).
+        """
+        lines = self._framer.feed(chunk)
+        if not lines:
+            return True
+
+        try:
+            for line in lines:
+                t0 = TRACER.on and now_us()
+                try:
+                    msg = try_decode_line(line)
+                except Exception as e:
+                    MALFORMED_LINES.inc()
+                    self.errors.put(str(e))
+                    return False
+
+                if msg is None:
+                    MALFORMED_LINES.inc()
+                    self.errors.put(f"Malformed line: {line!r}")
+                    continue
+
+                r = self.resume
+                if r is not None and not r.accept(msg):
+                    RESUME_DUPLICATES.inc()
+                    continue
+                msg = self._on_resume_control(msg) or msg
+                if self.on_rx is not None:
+                    self.on_rx(msg)
+
+                MESSAGES_RX.labels(msg.type_desc).inc()
+                self.heartbeat.note_rx()
+                if msg.type_desc == "RES_PING":
+                    self.heartbeat.note_ping()
+                if t0:
+                    TRACER.rx(msg, t0)
+                self.inbox.put(msg)
+        finally:
+            self._wake()
+        return True
+
+    def _wake(self) -> None:
+        cb = self.wakeup
+        if cb is not None:
+            cb()
 
     def _rx_loop(self) -> None:
-        assert self._sock is not None
-        buf = ""
+        s = self._sock
+        assert s is not None
         while self.running.is_set():
             try:
-                chunk = self._sock.recv(4096)
+                chunk = s.recv(4096)
+                if self._sock is not s:
+                    # Closed locally (or already replaced by a reconnect)
+                    return
+                rearm_quickack(s, self.profile)
                 if not chunk:
                     self.errors.put("Disconnected by server.")
                     break
 
-                buf += chunk.decode("utf-8", errors="replace")
-                while "\n" in buf:
-                    line, buf = buf.split("\n", 1)
-                    try:
-                        msg = try_decode_line(line)
-                    except Exception as e:
-                        self.errors.put(str(e))
-                        self.close()
-                        return
-
-                    if msg is None:
-                        self.errors.put(f"Malformed line: {line!r}")
-                        continue
-
-                    self.inbox.put(msg)
+                if not self._feed(chunk):
+                    self.close()
+                    return
 
             except socket.timeout:
                 continue
             except Exception as e:
+                if self._sock is not s:
+                    return
                 self.errors.put(f"Receive failed: {e}")
                 break
 
-        self.running.clear()
         try:
-            if self._sock:
-                self._sock.close()
+            s.close()
         except Exception:
             pass
-        self._sock = None
+        if self._sock is s:
+            self.running.clear()
+            self._sock = None
+        self._wake()
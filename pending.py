@@ -0,0 +1,109 @@
+from typing import Callable, Dict, Optional, Tuple
+
+from metrics import REQUEST_TIMEOUTS, REQUESTS_SUPPRESSED, RTT_SECONDS
+from protocol import Message
+from timers import TimerService
+
+# =============================
+# Pending requests
+# =============================
+#
+# Tracks requests that expect an answer: at most one in flight per type
+# (repeated clicks are dropped), a timeout with UI feedback when the server
+# stays silent, and per-request latency in ups_rtt_seconds. Responses settle
+# the oldest in-flight request that lists them, so a RES_ERROR is attributed
+# to the request sent first.
+
+# Request -> responses that settle it
+EXPECTED: Dict[str, Tuple[str, ...]] = {
+    "REQ_LOGIN": ("RES_LOGIN_OK", "RES_LOGIN_FAIL", "RES_ERROR"),
+    "REQ_CREATE_LOBBY": ("RES_LOBBY_CREATED", "RES_ERROR"),
+    "REQ_JOIN_LOBBY": ("RES_LOBBY_JOINED", "RES_ERROR"),
+    "REQ_LEAVE_LOBBY": ("RES_LOBBY_LEFT", "RES_GAME_CANNOT_CONTINUE", "RES_ERROR"),
+    "REQ_MOVE": ("RES_ROUND_RESULT", "RES_ERROR"),
+    "REQ_REMATCH": ("RES_REMATCH_READY", "RES_ERROR"),
+    "REQ_LOGOUT": ("RES_LOGOUT_OK", "RES_ERROR"),
+    "REQ_RESUME": ("RES_RESUMED", "RES_RESUME_FAIL"),
+}
+
+# Request -> messages that end it unanswered (the game it belonged to is
+# over, e.g. forfeit or the opponent left after we moved)
+DROPPED_BY: Dict[str, Tuple[str, ...]] = {
+    "REQ_MOVE": (
+        "RES_GAME_CANNOT_CONTINUE",
+        "RES_LOBBY_LEFT",
+        "RES_MATCH_RESULT",
+        "RES_GAME_STARTED",
+    ),
+}
+
+DEFAULT_TIMEOUT_S = 5.0
+
+# Per-request overrides; None = never time out (REQ_MOVE is answered only
+# once the opponent has moved as well)
+TIMEOUTS: Dict[str, Optional[float]] = {
+    "REQ_MOVE": None,
+}
+
+
+class PendingRequests:
+    def __init__(
+        self,
+        timers: TimerService,
+        on_timeout: Optional[Callable[[str], None]] = None,
+    ):
+        self.timers = timers
+        self.on_timeout = on_timeout
+        # request type -> send time; dict order = send order
+        self._sent_at: Dict[str, float] = {}
+
+    @staticmethod
+    def _timer_key(type_desc: str) -> str:
+        return f"request:{type_desc}"
+
+    def in_flight(self, type_desc: str) -> bool:
+        return type_desc in self._sent_at
+
+    def begin(self, type_desc: str) -> bool:
+        """Register an outgoing request. False = same type already in flight."""
+        if type_desc not in EXPECTED:
+            return True
+        if type_desc in self._sent_at:
+            REQUESTS_SUPPRESSED.labels(type_desc).inc()
+            return False
+
+        self._sent_at[type_desc] = self.timers.now()
+        timeout = TIMEOUTS.get(type_desc, DEFAULT_TIMEOUT_S)
+        if timeout is not None:
+            self.timers.schedule(
+                self._timer_key(type_desc), timeout, lambda: self._expire(type_desc)
+            )
+        return True
+
+    def cancel(self, type_desc: str) -> None:
+        self._sent_at.pop(type_desc, None)
+        self.timers.cancel(self._timer_key(type_desc))
+
+    def clear(self) -> None:
+        for type_desc in list(self._sent_at):
+            self.cancel(type_desc)
+
+    def complete(self, msg: Message) -> Optional[Tuple[str, float]]:
+        """Settle the request `msg` answers; returns (request, latency)."""
+        for req, ends in DROPPED_BY.items():
+            if msg.type_desc in ends:
+                self.cancel(req)
+        for req in self._sent_at:
+            if msg.type_desc in EXPECTED[req]:
+                rtt = self.timers.now() - self._sent_at[req]
+                self.cancel(req)
+                RTT_SECONDS.labels(req).observe(rtt)
+                return req, rtt
+        return None
+
+    def _expire(self, type_desc: str) -> None:
+        if self._sent_at.pop(type_desc, None) is None:
+            return
+        REQUEST_TIMEOUTS.labels(type_desc).inc()
+        if self.on_timeout is not None:
+            self.on_timeout(type_desc)
@@ -16,14 +16,20 @@ PROTOCOL_MAGIC = "MRLLN"
 class Message:
     type_desc: str
     params: List[str]
+    # Resume extension: per-direction sequence number ("MRLLN@<seq>|...")
+    seq: Optional[int] = None
 
     def __str__(self) -> str:
-        return f"{PROTOCOL_MAGIC}|{self.type_desc}|{'|'.join(self.params)}|"
+        return f"{_magic(self.seq)}|{self.type_desc}|{'|'.join(self.params)}|"
 
 
-def encode(type_desc: str, *params: str) -> bytes:
+def _magic(seq: Optional[int]) -> str:
+    return PROTOCOL_MAGIC if seq is None else f"{PROTOCOL_MAGIC}@{seq}"
+
+
+def encode(type_desc: str, *params: str, seq: Optional[int] = None) -> bytes:
     safe = [p.replace("\n", " ").replace("\r", " ") for p in params]
-    line = f"{PROTOCOL_MAGIC}|{type_desc}|{'|'.join(safe)}|\n"
+    line = f"{_magic(seq)}|{type_desc}|{'|'.join(safe)}|\n"
     return line.encode("utf-8")
 
 
@@ -39,12 +45,17 @@ def try_decode_line(line: str) -> Optional[Message]:
     if len(parts) < 2:
         return None
 
-    magic = parts[0].strip()
+    magic, _, seq_txt = parts[0].strip().partition("@")
     if magic != PROTOCOL_MAGIC:
-        raise ValueError(f"Invalid protocol magic: {magic!r}")
+        raise ValueError(f"Invalid protocol magic: {parts[0]!r}")
+    seq = None
+    if seq_txt:
+        if not seq_txt.isdigit():
+            raise ValueError(f"Invalid sequence number: {parts[0]!r}")
+        seq = int(seq_txt)
 
     type_desc = parts[1].strip()
     if not type_desc:
         return None
 
-    return Message(type_desc=type_desc, params=parts[2:])
+    return Message(type_desc=type_desc, params=parts[2:], seq=seq)
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+
+from log_buffer import LogBuffer
+from metrics import FRAMES_DROPPED, FRAMES_RECORDED
+
+# =============================
+# Session recorder
+# =============================
+#
+# capture() runs on the UI thread and only copies pixels: the frame (or just
+# its dirty rects) is blitted into one of a fixed ring of preallocated
+# surfaces and handed to a worker thread, which encodes it. When every slot
+# is still waiting for the encoder the frame is dropped instead of blocking
+# the loop; its dirty rects and log lines are carried into the next capture,
+# so the recording stays correct, only coarser in time.
+#
+# Output directory:
+#   frames/frame_NNNNNN.png  (format "png": full frames)
+#   frames.rec               (format "stream": zlib-compressed dirty rects)
+#   frames.jsonl             {"frame", "t", "rects"} per recorded frame
+#   trace.jsonl              {"frame", "t", "session", "seq", "line"} per
+#                            log line (TX/RX/SYS/ERR), stamped with the first
+#                            recorded frame that could show it
+#   meta.json                size, format, time base, captured/dropped
+#
+# "t" is time.monotonic() (the system-wide clock netem_proxy and the mock
+# server also run on); meta.json holds the wall time of the start.
+
+RECORD_FORMATS = ("png", "stream")
+RECORD_BUFFERS = 8
+
+STREAM_MAGIC = b"UPSREC1\n"
+_FRAME_HEAD = struct.Struct("<dIH")  # t, frame number, rect count
+_RECT_HEAD = struct.Struct("<HHHHI")  # x, y, w, h, compressed length
+
+
+class FrameRecorder:
+    def __init__(
+        self,
+        out_dir: str,
+        size: Tuple[int, int],
+        fmt: str = "stream",
+        buffers: int = RECORD_BUFFERS,
+        logs: Sequence[LogBuffer] = (),
+    ):
+        if fmt not in RECORD_FORMATS:
+            raise ValueError(f"unknown record format {fmt!r}")
+        self.out_dir = out_dir
+        self.size = size
+        self.fmt = fmt
+        self.logs = list(logs)
+        os.makedirs(out_dir, exist_ok=True)
+
+        self._slots = [pygame.Surface(size) for _ in range(max(1, buffers))]
+        self._free: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        for i in range(len(self._slots)):
+            self._free.put(i)
+        self._ready: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+
+        # Changes since the last recorded frame (None = whole frame)
+        self._pending: Optional[List[pygame.Rect]] = None
+        self._log_seen = [log.first for log in self.logs]
+
+        self.frames = 0
+        self.dropped = 0
+        self.started = time.monotonic()
+        self.started_wall = time.time()
+
+        self._worker = threading.Thread(
+            target=self._encode_loop, name="recorder", daemon=True
+        )
+        self._worker.start()
+
+    # --- UI thread ---
+
+    @property
+    def behind(self) -> bool:
+        """A dropped frame's changes are still waiting to be recorded."""
+        return self._pending is None or bool(self._pending)
+
+    def capture(self, backend, dirty: Optional[Sequence[pygame.Rect]] = None) -> bool:
+        """
+        Record the frame just drawn on `backend` (before present). `dirty`
+        lists the areas that changed, None = the whole frame. Returns False
+        when the frame was dropped.
+        """
+        if self._pending is not None:
+            if dirty is None:
+                self._pending = None
+            else:
+                self._pending.extend(dirty)
+
+        t = time.monotonic()
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            # Encoder behind: drop, the changes stay pending
+            self.dropped += 1
+            FRAMES_DROPPED.inc()
+            return False
+
+        rects = backend.grab(self._slots[slot], self._pending)
+        lines = []
+        for i, log in enumerate(self.logs):
+            for seq in range(max(self._log_seen[i], log.first), log.total):
+                lines.append((i, seq, log.line(seq)))
+            self._log_seen[i] = log.total
+
+        self._ready.put((slot, self.frames, t, rects, lines))
+        self.frames += 1
+        self._pending = []
+        FRAMES_RECORDED.inc()
+        return True
+
+    def close(self) -> None:
+        """Finish encoding what was captured and write meta.json."""
+        self._ready.put(None)
+        self._worker.join()
+        meta = {
+            "size": list(self.size),
+            "format": self.fmt,
+            "clock": "monotonic",
+            "started": self.started,
+            "started_wall": self.started_wall,
+            "frames": self.frames,
+            "dropped": self.dropped,
+        }
+        with open(os.path.join(self.out_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    # --- worker thread ---
+
+    def _encode_loop(self) -> None:
+        d = self.out_dir
+        index = open(os.path.join(d, "frames.jsonl"), "w", encoding="utf-8")
+        trace = open(os.path.join(d, "trace.jsonl"), "w", encoding="utf-8")
+        stream = None
+        canvas = None
+        if self.fmt == "stream":
+            stream = open(os.path.join(d, "frames.rec"), "wb")
+            stream.write(STREAM_MAGIC + struct.pack("<HH", *self.size))
+        else:
+            os.makedirs(os.path.join(d, "frames"), exist_ok=True)
+            canvas = pygame.Surface(self.size)
+        try:
+            while True:
+                item = self._ready.get()
+                if item is None:
+                    break
+                slot, n, t, rects, lines = item
+                surf = self._slots[slot]
+                if rects is None:
+                    rects = [surf.get_rect()]
+                if stream is not None:
+                    _write_frame(stream, surf, n, t, rects)
+                else:
+                    for r in rects:
+                        canvas.blit(surf, r, r)
+                    pygame.image.save(
+                        canvas, os.path.join(d, "frames", f"frame_{n:06d}.png")
+                    )
+                self._free.put(slot)
+
+                index.write(json.dumps({"frame": n, "t": t, "rects": len(rects)}))
+                index.write("\n")
+                for session, seq, line in lines:
+                    row = {"frame": n, "t": t, "session": session, "seq": seq}
+                    row["line"] = line
+                    trace.write(json.dumps(row) + "\n")
+        finally:
+            index.close()
+            trace.close()
+            if stream is not None:
+                stream.close()
+
+
+def _write_frame(f, surf: pygame.Surface, n: int, t: float, rects) -> None:
+    bounds = surf.get_rect()
+    parts = []
+    for r in rects:
+        r = pygame.Rect(r).clip(bounds)
+        if r.width and r.height:
+            raw = pygame.image.tobytes(surf.subsurface(r), "RGB")
+            parts.append((r, zlib.compress(raw, 1)))
+    f.write(_FRAME_HEAD.pack(t, n, len(parts)))
+    for r, data in parts:
+        f.write(_RECT_HEAD.pack(r.x, r.y, r.width, r.height, len(data)))
+        f.write(data)
+
+
+def read_stream(path: str):
+    """Yield (frame number, t, full frame Surface) from a frames.rec file."""
+    with open(path, "rb") as f:
+        if f.read(len(STREAM_MAGIC)) != STREAM_MAGIC:
+            raise ValueError(f"{path}: not a recording")
+        size = struct.unpack("<HH", f.read(4))
+        canvas = pygame.Surface(size)
+        while True:
+            head = f.read(_FRAME_HEAD.size)
+            if len(head) < _FRAME_HEAD.size:
+                return
+            t, n, count = _FRAME_HEAD.unpack(head)
+            for _ in range(count):
+                x, y, w, h, length = _RECT_HEAD.unpack(f.read(_RECT_HEAD.size))
+                raw = zlib.decompress(f.read(length))
+                canvas.blit(pygame.image.frombytes(raw, (w, h), "RGB"), (x, y))
+            yield n, t, canvas
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Export a frames.rec recording as PNGs")
+    ap.add_argument("recording", help="frames.rec written by main.py --record")
+    ap.add_argument("out_dir")
+    args = ap.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    count = 0
+    for n, _t, frame in read_stream(args.recording):
+        pygame.image.save(frame, os.path.join(args.out_dir, f"frame_{n:06d}.png"))
+        count += 1
+    print(f"{count} frames -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
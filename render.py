@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+
+import pygame
+
+# =============================
+# Render backends
+# =============================
+#
+# Scenes draw into the Surface returned by backend.begin() and route art that
+# rarely changes (background, panels) through blit_static(). The software
+# backend blits that art from a cache onto the display surface. The renderer
+# backend (pygame._sdl2) uploads it once as a texture and composites it
+# under a transparent, streamed layer holding the rest of the frame; any SDL
+# render driver works, including the software one (headless CI).
+
+STATIC_ART_MAX = 64
+
+BACKENDS = ("software", "sdl2", "sdl2-software")
+
+
+class StaticArt:
+    """Pre-rendered surfaces by key, least recently used dropped first."""
+
+    def __init__(self, limit: int = STATIC_ART_MAX):
+        self.limit = limit
+        self._items: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+
+    def get(self, key: Hashable, paint: Callable[[], pygame.Surface]) -> pygame.Surface:
+        art = self._items.get(key)
+        if art is None:
+            art = self._items[key] = paint()
+            if len(self._items) > self.limit:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(key)
+        return art
+
+
+_ART = StaticArt()
+
+# Renderer backend whose layer gets static art as textures (None = software)
+_compositor: Optional["RendererBackend"] = None
+
+
+def blit_static(
+    surf: pygame.Surface,
+    key: Hashable,
+    paint: Callable[[], pygame.Surface],
+    pos: Tuple[int, int],
+) -> None:
+    """Blit cached art built by `paint`; drawn as a texture where possible."""
+    art = _ART.get(key, paint)
+    comp = _compositor
+    if comp is not None and surf.get_abs_parent() is comp.layer:
+        ox, oy = surf.get_abs_offset()
+        comp.queue(key, art, (pos[0] + ox, pos[1] + oy))
+    else:
+        surf.blit(art, pos)
+
+
+class SoftwareBackend:
+    name = "software"
+    # The display keeps the last frame, so parts of it can be redrawn alone
+    keeps_frame = True
+
+    def __init__(self, size: Tuple[int, int], title: str):
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(title)
+
+    def begin(self) -> pygame.Surface:
+        return self.screen
+
+    def present(self, dirty: Optional[List[pygame.Rect]] = None) -> None:
+        """Show the frame; with `dirty`, only those areas need updating."""
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+    def grab(
+        self, dest: pygame.Surface, rects: Optional[List[pygame.Rect]] = None
+    ) -> Optional[List[pygame.Rect]]:
+        """Copy the drawn frame (or just `rects`) into `dest`; returns what was copied."""
+        if rects is None:
+            dest.blit(self.screen, (0, 0))
+        else:
+            for r in rects:
+                dest.blit(self.screen, r, r)
+        return rects
+
+    def close(self) -> None:
+        pass
+
+
+class RendererBackend:
+    """
+    pygame._sdl2 Renderer: static art as textures, everything else drawn in
+    software into one transparent layer that is streamed up every frame.
+
+    Static art is queued in draw order and composited below the layer, so it
+    must be drawn before dynamic content it overlaps (scenes draw background
+    and panels first).
+    """
+
+    # begin() starts an empty frame: everything is redrawn every time
+    keeps_frame = False
+
+    def __init__(self, size: Tuple[int, int], title: str, accelerated: int = -1):
+        global _compositor
+        from pygame._sdl2.video import Renderer, Texture, Window
+
+        self._Texture = Texture
+        self.window = Window(title, size)
+        try:
+            self.renderer = Renderer(self.window, accelerated=accelerated)
+        except Exception:
+            self.window.destroy()
+            raise
+        self.name = "sdl2-software" if accelerated == 0 else "sdl2"
+
+        self.layer = pygame.Surface(size, pygame.SRCALPHA)
+        self._layer_tex = Texture(self.renderer, size, streaming=True)
+        self._layer_tex.blend_mode = 1  # SDL_BLENDMODE_BLEND
+        self._textures: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._queued: List[Tuple[object, pygame.Rect]] = []
+        self._composed = False
+        _compositor = self
+
+    def begin(self) -> pygame.Surface:
+        self.layer.fill((0, 0, 0, 0))
+        self._queued.clear()
+        self._composed = False
+        return self.layer
+
+    def queue(self, key: Hashable, art: pygame.Surface, pos: Tuple[int, int]) -> None:
+        tex = self._textures.get(key)
+        if tex is None:
+            tex = self._textures[key] = self._Texture.from_surface(self.renderer, art)
+            if len(self._textures) > STATIC_ART_MAX:
+                self._textures.popitem(last=False)
+        else:
+            self._textures.move_to_end(key)
+        self._queued.append((tex, pygame.Rect(pos, art.get_size())))
+
+    def _compose(self) -> None:
+        self._layer_tex.update(self.layer)
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+        for tex, rect in self._queued:
+            tex.draw(dstrect=rect)
+        self._layer_tex.draw()
+        self._composed = True
+
+    def present(self, dirty: Optional[List[pygame.Rect]] = None) -> None:
+        # Textures are recomposited whole; `dirty` is only a hint here
+        if not self._composed:
+            self._compose()
+        self.renderer.present()
+        self._composed = False
+
+    def grab(
+        self, dest: pygame.Surface, rects: Optional[List[pygame.Rect]] = None
+    ) -> Optional[List[pygame.Rect]]:
+        """Read the composited frame back into `dest` (always whole)."""
+        if not self._composed:
+            self._compose()
+        self.renderer.to_surface(dest)
+        return None
+
+    def close(self) -> None:
+        global _compositor
+        if _compositor is self:
+            _compositor = None
+        self._textures.clear()
+        self.window.destroy()
+
+
+def create_backend(kind: str, size: Tuple[int, int], title: str):
+    """Backend for --renderer; falls back to software. Returns (backend, note)."""
+    if kind != "software":
+        try:
+            accelerated = 0 if kind == "sdl2-software" else -1
+            return RendererBackend(size, title, accelerated), ""
+        except (ImportError, pygame.error) as e:
+            note = f"{kind} renderer unavailable ({e}); using software"
+            return SoftwareBackend(size, title), note
+    return SoftwareBackend(size, title), ""
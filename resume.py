@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from protocol import Message, encode
+
+# =============================
+# Session resume extension
+# =============================
+#
+# Opt-in, negotiated after login:
+#   C: REQ_RESUME_ENABLE            S: RES_RESUME_TOKEN|<token>
+# From then on both sides number their messages ("MRLLN@<seq>|TYPE|...|")
+# and keep the last RESUME_BACKLOG sent ones. After a reconnect:
+#   C: REQ_RESUME|<token>|<last seq C received>
+#   S: RES_RESUMED|<last seq S received>  + replay of what C missed
+#   C: replays what S missed
+# or S: RES_RESUME_FAIL|<reason> and the client falls back to REQ_LOGIN.
+# Handshake messages are never numbered.
+
+RESUME_BACKLOG = 512
+
+UNSEQUENCED = frozenset(
+    {
+        "REQ_LOGIN",
+        "REQ_RESUME_ENABLE",
+        "REQ_RESUME",
+        "RES_RESUME_TOKEN",
+        "RES_RESUMED",
+        "RES_RESUME_FAIL",
+    }
+)
+
+
+class ResumeSession:
+    """One side's sequence counters and replay backlog for a resumable session."""
+
+    def __init__(self, token: str, backlog: int = RESUME_BACKLOG):
+        self.token = token
+        self.tx_seq = 0  # last sequence number we sent
+        self.rx_seq = 0  # last sequence number we accepted
+        self._backlog: Deque[Tuple[int, bytes]] = deque(maxlen=backlog)
+
+    def stamp(self, type_desc: str, *params: str) -> bytes:
+        """Encode the next outbound message and keep it for replay."""
+        self.tx_seq += 1
+        data = encode(type_desc, *params, seq=self.tx_seq)
+        self._backlog.append((self.tx_seq, data))
+        return data
+
+    def accept(self, msg: Message) -> bool:
+        """False for a duplicate (already seen) numbered message."""
+        if msg.seq is None:
+            return True
+        if msg.seq <= self.rx_seq:
+            return False
+        self.rx_seq = msg.seq
+        return True
+
+    def replay_after(self, seq: int) -> Optional[List[bytes]]:
+        """
+        Messages the peer has not seen, given the last one it has.
+        Returns None if part of the gap already fell out of the backlog.
+        """
+        while self._backlog and self._backlog[0][0] <= seq:
+            self._backlog.popleft()
+        if seq < self.tx_seq and (not self._backlog or self._backlog[0][0] != seq + 1):
+            return None
+        return [data for _, data in self._backlog]
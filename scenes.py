@@ -3,76 +3,53 @@ from typing import Optional, Tuple
 import pygame
 
 from network import TcpLineClient
+from glyphs import draw_text
+from input_router import HitIndex
 from protocol import Message
+from render import blit_static
 from state import (
     BOTTOM_HINT,
     CENTER_CARD,
+    SIDE_CARD,
     TOPBAR,
     AppState,
     H,
     SceneId,
     W,
+    hide_round_result,
     log_err,
     log_sys,
     log_tx,
+    show_round_result,
     toast,
 )
+from store import parse_state_params, round_str
 from ui_components import HUDButton, InputField, MoveButton
+from view_models import (
+    HistoryView,
+    MatchResultView,
+    RoundResultView,
+    move_letter_to_name,
+)
 
 # =============================
 # Helpers
 # =============================
 
 
-def move_letter_to_name(letter: str) -> str:
-    l = (letter or "").strip().upper()
-    if l == "R":
-        return "Rock"
-    if l == "P":
-        return "Paper"
-    if l == "S":
-        return "Scissors"
-    return ""
-
-
-def safe_first_char(s: Optional[str], fallback: str = "?") -> str:
-    if not s:
-        return fallback
-    return s[0]
-
-
-def winner_label(state: AppState, winner_id_str: str) -> str:
-    """
-    Map winner id (string) to a UI label.
-    If server provided p1Id/p2Id + names, show name; else show raw id.
-    """
+def send_request(
+    client: TcpLineClient, state: AppState, type_desc: str, *params: str
+) -> bool:
+    """Send unless the same request is still awaiting its response."""
+    if not state.pending.begin(type_desc):
+        return False
     try:
-        wid = int(winner_id_str)
+        client.send(type_desc, *params)
     except Exception:
-        return winner_id_str or "?"
-
-    if wid == 0:
-        return "Draw"
-
-    # Prefer names if available
-    if getattr(state, "p1_id", 0) == wid and getattr(state, "p1_name", ""):
-        return state.p1_name
-    if getattr(state, "p2_id", 0) == wid and getattr(state, "p2_name", ""):
-        return state.p2_name
-
-    # If id matches none (or names missing), fall back to id
-    return str(wid)
-
-
-def player_label(state: AppState, idx: int) -> str:
-    """
-    idx: 1 or 2
-    """
-    if idx == 1:
-        return state.p1_name or "P1"
-    if idx == 2:
-        return state.p2_name or "P2"
-    return "P?"
+        state.pending.cancel(type_desc)
+        raise
+    log_tx(state, type_desc, *params)
+    return True
 
 
 # =============================
@@ -80,8 +57,9 @@ def player_label(state: AppState, idx: int) -> str:
 # =============================
 
 
-def draw_background(surf: pygame.Surface) -> None:
-    w, h = surf.get_size()
+def _paint_background(size: Tuple[int, int]) -> pygame.Surface:
+    surf = pygame.Surface(size)
+    w, h = size
     for y in range(h):
         t = y / max(1, h - 1)
         r = int(10 + 10 * t)
@@ -98,6 +76,25 @@ def draw_background(surf: pygame.Surface) -> None:
         border_radius=30,
     )
     surf.blit(vignette, (0, 0))
+    return surf
+
+
+def draw_background(surf: pygame.Surface) -> None:
+    size = surf.get_size()
+    blit_static(surf, ("background", size), lambda: _paint_background(size), (0, 0))
+
+
+def _paint_panel(
+    size: Tuple[int, int], title: str, font_title: pygame.font.Font
+) -> pygame.Surface:
+    panel = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.rect(panel, (18, 18, 24, 220), panel.get_rect(), border_radius=18)
+    pygame.draw.rect(
+        panel, (120, 120, 150, 180), panel.get_rect(), width=1, border_radius=18
+    )
+    t = font_title.render(title, True, (245, 245, 255))
+    panel.blit(t, (16, 12))
+    return panel
 
 
 def draw_panel(
@@ -107,15 +104,12 @@ def draw_panel(
     font_title: pygame.font.Font,
 ) -> None:
     rect = pygame.Rect(rect_data)
-    panel = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(panel, (18, 18, 24, 220), panel.get_rect(), border_radius=18)
-    pygame.draw.rect(
-        panel, (120, 120, 150, 180), panel.get_rect(), width=1, border_radius=18
+    blit_static(
+        surf,
+        ("panel", rect.size, title, id(font_title)),
+        lambda: _paint_panel(rect.size, title, font_title),
+        rect.topleft,
     )
-    surf.blit(panel, (rect.x, rect.y))
-
-    t = font_title.render(title, True, (245, 245, 255))
-    surf.blit(t, (rect.x + 16, rect.y + 12))
 
 
 def draw_toast(
@@ -153,20 +147,7 @@ def draw_debug(
     if not state.debug_visible:
         return
 
-    r = pygame.Rect(22, 95, w - 44, h - 125)
-    overlay = pygame.Surface((r.width, r.height), pygame.SRCALPHA)
-    pygame.draw.rect(overlay, (0, 0, 0, 200), overlay.get_rect(), border_radius=18)
-    pygame.draw.rect(
-        overlay, (140, 140, 170, 160), overlay.get_rect(), width=1, border_radius=18
-    )
-    screen.blit(overlay, (r.x, r.y))
-
-    lines = state.log[-28:]
-    y = r.y + 14
-    for ln in lines:
-        t = font.render(ln, True, (230, 230, 240))
-        screen.blit(t, (r.x + 14, y))
-        y += 18
+    state.console.draw(screen, font, pygame.Rect(22, 95, w - 44, h - 125))
 
 
 def draw_waiting_screen(
@@ -184,8 +165,13 @@ def draw_waiting_screen(
 
     if move:
         # Big letter
-        m = font_xl.render(move, True, (255, 255, 255))
-        screen.blit(m, m.get_rect(center=(rect.centerx, rect.centery - 6)))
+        draw_text(
+            screen,
+            font_xl,
+            move,
+            (255, 255, 255),
+            center=(rect.centerx, rect.centery - 6),
+        )
 
         # Name under it
         mv_name = move_letter_to_name(move) or "Your move"
@@ -193,45 +179,46 @@ def draw_waiting_screen(
         screen.blit(sub, sub.get_rect(center=(rect.centerx, rect.centery + 48)))
 
 
+def round_result_view(
+    state: AppState, font_xl: pygame.font.Font, font_b: pygame.font.Font
+) -> RoundResultView:
+    return state.views.get(
+        "round_result",
+        RoundResultView.key(state),
+        lambda: RoundResultView.build(state, CENTER_CARD, font_xl, font_b),
+    )
+
+
+def match_result_view(
+    state: AppState, font_xl: pygame.font.Font, font_b: pygame.font.Font
+) -> MatchResultView:
+    return state.views.get(
+        "match_result",
+        MatchResultView.key(state),
+        lambda: MatchResultView.build(state, CENTER_CARD, font_xl, font_b),
+    )
+
+
+def history_view(
+    state: AppState, font: pygame.font.Font, font_b: pygame.font.Font
+) -> HistoryView:
+    return state.views.get(
+        "history",
+        HistoryView.key(state),
+        lambda: HistoryView.build(state, SIDE_CARD, font, font_b),
+    )
+
+
 def draw_round_result(
     screen: pygame.Surface,
     rect_data: Tuple[int, int, int, int],
-    round_str: str,
-    font_xl: pygame.font.Font,
+    view: RoundResultView,
     font_b: pygame.font.Font,
     state: AppState,
 ) -> None:
     rect = pygame.Rect(rect_data)
 
-    parts = round_str.split("|")
-    winner_id = parts[0].strip() if len(parts) >= 1 else "?"
-    p1m = parts[1].strip() if len(parts) >= 2 else "-"
-    p2m = parts[2].strip() if len(parts) >= 3 else "-"
-
-    title = font_b.render("ROUND RESULT", True, (245, 245, 255))
-    screen.blit(title, title.get_rect(center=(rect.centerx, rect.y + 40)))
-
-    # Logic for coloring
-    try:
-        wid = int(winner_id)
-    except:
-        wid = -1
-
-    w_label = winner_label(state, winner_id)
-    winner_color = (255, 255, 255)
-    if wid == 0:
-        winner_text = "It's a Draw!"
-        winner_color = (255, 255, 150)
-    else:
-        winner_text = f"Winner: {w_label}"
-        winner_color = (100, 255, 100)
-
-    winner_surf = font_b.render(winner_text, True, winner_color)
-    screen.blit(winner_surf, winner_surf.get_rect(center=(rect.centerx, rect.y + 85)))
-
-    mid_y = rect.centery + 20
-    left_center = (rect.x + rect.width // 4, mid_y)
-    right_center = (rect.x + 3 * rect.width // 4, mid_y)
+    screen.blits(view.blits, doreturn=False)
 
     pygame.draw.line(
         screen,
@@ -241,38 +228,12 @@ def draw_round_result(
         2,
     )
 
-    # Left (P1)
-    p1_text_color = (
-        (100, 255, 100) if wid == state.p1_id and wid != 0 else (200, 200, 200)
+    ttl = int(state.timers.remaining("round_result") + 0.9)
+    hint = state.views.get(
+        "round_hint",
+        ttl,
+        lambda: font_b.render(f"Next screen in {ttl}...", True, (120, 120, 140)),
     )
-    lbl_p1 = font_b.render(player_label(state, 1), True, p1_text_color)
-    screen.blit(lbl_p1, lbl_p1.get_rect(center=(left_center[0], rect.y + 115)))
-
-    mv1 = font_xl.render(safe_first_char(p1m), True, (255, 255, 255))
-    screen.blit(mv1, mv1.get_rect(center=(left_center[0], mid_y)))
-
-    full1 = font_b.render(
-        move_letter_to_name(p1m) or (p1m or "-"), True, (150, 150, 170)
-    )
-    screen.blit(full1, full1.get_rect(center=(left_center[0], mid_y + 45)))
-
-    # Right (P2)
-    p2_text_color = (
-        (100, 255, 100) if wid == state.p2_id and wid != 0 else (200, 200, 200)
-    )
-    lbl_p2 = font_b.render(player_label(state, 2), True, p2_text_color)
-    screen.blit(lbl_p2, lbl_p2.get_rect(center=(right_center[0], rect.y + 115)))
-
-    mv2 = font_xl.render(safe_first_char(p2m), True, (255, 255, 255))
-    screen.blit(mv2, mv2.get_rect(center=(right_center[0], mid_y)))
-
-    full2 = font_b.render(
-        move_letter_to_name(p2m) or (p2m or "-"), True, (150, 150, 170)
-    )
-    screen.blit(full2, full2.get_rect(center=(right_center[0], mid_y + 45)))
-
-    ttl = int(state.round_result_ttl + 0.9)
-    hint = font_b.render(f"Next screen in {ttl}...", True, (120, 120, 140))
     screen.blit(hint, hint.get_rect(center=(rect.centerx, rect.bottom - 25)))
 
 
@@ -301,13 +262,29 @@ class ConnectScene:
 
         self.btn_connect = HUDButton(pygame.Rect(x, y0 + 168, w, 48), "CONNECT")
 
+        self.hits = HitIndex(
+            (self.inp_host, self.inp_port, self.inp_name, self.btn_connect)
+        )
+
     def _send(self, type_desc: str, *params: str) -> None:
         try:
-            self.client.send(type_desc, *params)
-            log_tx(self.state, type_desc, *params)
+            send_request(self.client, self.state, type_desc, *params)
         except Exception as ex:
             log_err(self.state, f"Send failed: {ex}")
 
+    def set_endpoint(self, host: str, port: int) -> None:
+        """Point the form at another server unless the user already edited it."""
+        untouched = (
+            self.inp_host.text == self.client.host
+            and self.inp_port.text == str(self.client.port)
+        )
+        if not untouched or self.inp_host.active or self.inp_port.active:
+            return
+        self.client.host = host
+        self.client.port = port
+        self.inp_host.text = host
+        self.inp_port.text = str(port)
+
     def _connect_and_autologin(self) -> None:
         host = self.inp_host.text.strip() or "127.0.0.1"
         port_txt = self.inp_port.text.strip() or "10000"
@@ -345,7 +322,8 @@ class ConnectScene:
         self.inp_name.handle(e)
 
         if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-            if self.btn_connect.hit(e.pos):
+            hit = self.hits.at(e.pos)
+            if hit is self.btn_connect:
                 self._connect_and_autologin()
 
     def on_message(self, msg: Message) -> Optional[SceneId]:
@@ -375,6 +353,10 @@ class ConnectScene:
 
         return None
 
+    def animation_interval(self) -> Optional[float]:
+        """Seconds between redraws while idle; None = redraw only on change."""
+        return None
+
     def draw(self, screen: pygame.Surface) -> None:
         draw_background(screen)
 
@@ -383,8 +365,6 @@ class ConnectScene:
         draw_panel(screen, CENTER_CARD, "CONNECT", self.font_b)
         draw_panel(screen, BOTTOM_HINT, "INFO", self.font_b)
 
-        mouse = pygame.mouse.get_pos()
-
         title = self.font_xl.render("Connect to server", True, (245, 245, 255))
         screen.blit(title, title.get_rect(center=(cc_rect.centerx, cc_rect.y + 52)))
 
@@ -393,7 +373,7 @@ class ConnectScene:
         self.inp_name.draw(screen, self.font)
 
         self.btn_connect.enabled = True
-        self.btn_connect.draw(screen, self.font_b, mouse)
+        self.btn_connect.draw(screen, self.font_b)
 
         hint = self.font.render(
             "CONNECT will connect and immediately send REQ_LOGIN|nickname|",
@@ -456,10 +436,19 @@ class LobbyScene:
             pygame.Rect(leave_x, leave_y, leave_w, leave_h), "LEAVE LOBBY"
         )
 
+        self.hits = HitIndex(
+            (
+                self.btn_logout,
+                self.inp_lobby,
+                self.btn_create,
+                self.btn_join,
+                self.btn_leave_lobby,
+            )
+        )
+
     def _send(self, type_desc: str, *params: str):
         try:
-            self.client.send(type_desc, *params)
-            log_tx(self.state, type_desc, *params)
+            send_request(self.client, self.state, type_desc, *params)
         except Exception as e:
             log_err(self.state, f"Send failed: {e}")
 
@@ -469,22 +458,23 @@ class LobbyScene:
                 self.state.debug_visible = not self.state.debug_visible
 
         if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-            if self.btn_logout.hit(e.pos):
+            hit = self.hits.at(e.pos)
+            if hit is self.btn_logout:
                 if self.state.in_lobby:
                     self._send("REQ_LEAVE_LOBBY")
                 else:
                     self._send("REQ_LOGOUT")
 
             if self.state.in_lobby:
-                if self.btn_leave_lobby.hit(e.pos):
+                if hit is self.btn_leave_lobby:
                     self._send("REQ_LEAVE_LOBBY")
             else:
-                if self.btn_create.hit(e.pos):
+                if hit is self.btn_create:
                     name = self.inp_lobby.text.strip()
                     if name:
                         self._send("REQ_CREATE_LOBBY", name)
 
-                if self.btn_join.hit(e.pos):
+                if hit is self.btn_join:
                     name = self.inp_lobby.text.strip()
                     if name:
                         self._send("REQ_JOIN_LOBBY", name)
@@ -520,8 +510,7 @@ class LobbyScene:
             self.state.in_lobby = True
             self.state.last_move = ""
             self.state.waiting_for_opponent = False
-            self.state.round_result_visible = False
-            self.state.round_result_ttl = 0.0
+            hide_round_result(self.state)
             toast(self.state, "Game started!", 2.0)
             return SceneId.GAME
 
@@ -554,6 +543,10 @@ class LobbyScene:
 
         return None
 
+    def animation_interval(self) -> Optional[float]:
+        # "Waiting for opponent..." dots
+        return 0.25 if self.state.in_lobby else None
+
     def draw(self, screen: pygame.Surface) -> None:
         draw_background(screen)
 
@@ -569,9 +562,8 @@ class LobbyScene:
         )
         screen.blit(nick_surf, nick_rect)
 
-        mouse = pygame.mouse.get_pos()
         self.btn_logout.label = "EXIT" if self.state.in_lobby else "LOGOUT"
-        self.btn_logout.draw(screen, self.font_b, mouse)
+        self.btn_logout.draw(screen, self.font_b)
 
         panel_title = "WAITING ROOM" if self.state.in_lobby else "LOBBY SELECTION"
         draw_panel(screen, CENTER_CARD, panel_title, self.font_b)
@@ -584,13 +576,13 @@ class LobbyScene:
             info = self.font_b.render("Waiting for opponent...", True, (200, 200, 220))
             screen.blit(info, info.get_rect(center=(cc_rect.centerx, cc_rect.y + 130)))
 
-            dots = "." * (int(pygame.time.get_ticks() / 500) % 4)
+            dots = "." * (int(self.state.timers.now() * 2) % 4)
             loading = self.font_xl.render(dots, True, (255, 255, 255))
             screen.blit(
                 loading, loading.get_rect(center=(cc_rect.centerx, cc_rect.y + 160))
             )
 
-            self.btn_leave_lobby.draw(screen, self.font_b, mouse)
+            self.btn_leave_lobby.draw(screen, self.font_b)
 
         else:
             lbl = self.font_b.render("Enter Lobby Name:", True, (180, 180, 200))
@@ -602,8 +594,8 @@ class LobbyScene:
             )
 
             self.inp_lobby.draw(screen, self.font)
-            self.btn_create.draw(screen, self.font_b, mouse)
-            self.btn_join.draw(screen, self.font_b, mouse)
+            self.btn_create.draw(screen, self.font_b)
+            self.btn_join.draw(screen, self.font_b)
 
         status_txt = (
             "Status: WAITING FOR PLAYER 2"
@@ -619,10 +611,13 @@ class LobbyScene:
 
 
 class GameScene:
+    TITLE = "GAME | SCORE: "
+
     def __init__(self, client: TcpLineClient, state: AppState, fonts):
         self.client = client
         self.state = state
         self.font, self.font_b, self.font_xl, self.font_move = fonts
+        self.title_w = self.font_b.size(self.TITLE)[0]
 
         cc_rect = pygame.Rect(CENTER_CARD)
         top_rect = pygame.Rect(TOPBAR)
@@ -637,19 +632,22 @@ class GameScene:
             pygame.Rect(top_rect.right - 122, top_rect.y + 12, 110, 32), "FORFEIT"
         )
 
-    def _send(self, type_desc: str, *params: str):
+        self.hits = HitIndex((self.btn_forfeit, self.move_r, self.move_p, self.move_s))
+
+    def _send(self, type_desc: str, *params: str) -> bool:
         try:
-            self.client.send(type_desc, *params)
-            log_tx(self.state, type_desc, *params)
+            return send_request(self.client, self.state, type_desc, *params)
         except Exception as e:
             log_err(self.state, f"Send failed: {e}")
+            return False
 
     def _choose(self, move: str):
         if self.state.waiting_for_opponent or self.state.round_result_visible:
             return
-        self.state.last_move = move
-        self.state.waiting_for_opponent = True
-        self._send("REQ_MOVE", move)
+        # Wait only for a move that actually went out
+        if self._send("REQ_MOVE", move):
+            self.state.last_move = move
+            self.state.waiting_for_opponent = True
 
     def handle_event(self, e: pygame.event.Event):
         if e.type == pygame.KEYDOWN:
@@ -660,16 +658,17 @@ class GameScene:
             return
 
         if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-            if self.btn_forfeit.hit(e.pos):
+            hit = self.hits.at(e.pos)
+            if hit is self.btn_forfeit:
                 self._send("REQ_LEAVE_LOBBY")
                 return
 
             if not self.state.waiting_for_opponent:
-                if self.move_r.hit(e.pos):
+                if hit is self.move_r:
                     self._choose("R")
-                elif self.move_p.hit(e.pos):
+                elif hit is self.move_p:
                     self._choose("P")
-                elif self.move_s.hit(e.pos):
+                elif hit is self.move_s:
                     self._choose("S")
 
         if e.type == pygame.KEYDOWN and not self.state.waiting_for_opponent:
@@ -681,53 +680,25 @@ class GameScene:
                 self._choose("S")
 
     def on_message(self, msg: Message) -> Optional[SceneId]:
-        self.state.last_server_contact = pygame.time.get_ticks()
-
         if msg.type_desc == "RES_PING":
             if msg.params:
                 self._send("REQ_PONG", msg.params[0])
             return None
 
         if msg.type_desc == "RES_STATE":
-            if msg.params:
-                p_dict = {}
-                for part in msg.params[0].split(";"):
-                    if "=" in part:
-                        k, v = part.split("=", 1)
-                        p_dict[k.strip()] = v.strip()
-
-                if "score" in p_dict:
-                    try:
-                        s1, s2 = p_dict["score"].split(":")
-                        self.state.p1_wins, self.state.p2_wins = int(s1), int(s2)
-                    except Exception:
-                        pass
-
-                if "p1Id" in p_dict:
-                    try:
-                        self.state.p1_id = int(p_dict["p1Id"])
-                    except Exception:
-                        pass
-                if "p2Id" in p_dict:
-                    try:
-                        self.state.p2_id = int(p_dict["p2Id"])
-                    except Exception:
-                        pass
-                if "p1Name" in p_dict:
-                    self.state.p1_name = p_dict["p1Name"]
-                if "p2Name" in p_dict:
-                    self.state.p2_name = p_dict["p2Name"]
-
-                if "hasMoved" in p_dict:
-                    has_moved = p_dict["hasMoved"].lower() == "true"
-                    self.state.waiting_for_opponent = has_moved
-                    if not has_moved:
-                        self.state.last_move = ""
-
-                if "lastMove" in p_dict:
-                    mv = p_dict["lastMove"].strip().upper()
-                    if mv in ("R", "P", "S"):
-                        self.state.last_move = mv
+            # Scores/ids/names are reduced into the StateStore by the network
+            # thread; only the local move state is taken from here.
+            p_dict = parse_state_params(msg.params)
+            if "hasMoved" in p_dict:
+                has_moved = p_dict["hasMoved"].lower() == "true"
+                self.state.waiting_for_opponent = has_moved
+                if not has_moved:
+                    self.state.last_move = ""
+
+            if "lastMove" in p_dict:
+                mv = p_dict["lastMove"].strip().upper()
+                if mv in ("R", "P", "S"):
+                    self.state.last_move = mv
 
             return None
 
@@ -735,8 +706,7 @@ class GameScene:
             self.state.in_game = True
             self.state.waiting_for_opponent = False
             self.state.last_move = ""
-            self.state.round_result_visible = False
-            self.state.round_result_ttl = 0.0
+            hide_round_result(self.state)
             self.reconnect_wait = False
             toast(self.state, "Game started!", 2.0)
             return None
@@ -747,41 +717,21 @@ class GameScene:
             return None
 
         if msg.type_desc == "RES_ROUND_RESULT":
-            p = msg.params
-            if len(p) >= 5:
-                winner_id, p1m, p2m, s1, s2 = p[0], p[1], p[2], p[3], p[4]
-                try:
-                    self.state.p1_wins = int(s1)
-                    self.state.p2_wins = int(s2)
-                except ValueError:
-                    pass
-                self.state.last_round = f"{winner_id}|{p1m}|{p2m}"
-            else:
-                self.state.last_round = " | ".join(p)
-
             self.state.waiting_for_opponent = False
-            self.state.round_result_visible = True
-            self.state.round_result_ttl = 2.8
+            show_round_result(self.state, 2.8)
             self.state.last_move = ""
-            log_sys(self.state, f"GAME: Round result: {self.state.last_round}")
+            log_sys(self.state, f"GAME: Round result: {round_str(msg.params)}")
             return None
 
         if msg.type_desc == "RES_MATCH_RESULT":
             p = msg.params
-            try:
-                self.state.last_match_winner_id = int(p[0])
-                self.state.last_match_p1wins = int(p[1])
-                self.state.last_match_p2wins = int(p[2])
-            except Exception:
-                self.state.last_match_winner_id = 0
-                self.state.last_match_p1wins = 0
-                self.state.last_match_p2wins = 0
-
             log_sys(
                 self.state, f"GAME: Match finished. Winner ID: {p[0] if p else '?'}"
             )
 
-            if self.state.round_result_visible and self.state.round_result_ttl > 0:
+            if self.state.round_result_visible and self.state.timers.pending(
+                "round_result"
+            ):
                 self.state.pending_scene = SceneId.AFTER_MATCH
                 return None
 
@@ -801,8 +751,7 @@ class GameScene:
             self.state.in_game = False
             self.state.waiting_for_opponent = False
             self.state.last_move = ""
-            self.state.round_result_visible = False
-            self.state.round_result_ttl = 0.0
+            hide_round_result(self.state)
             return SceneId.LOBBY
 
         if msg.type_desc == "RES_LOBBY_LEFT":
@@ -813,20 +762,28 @@ class GameScene:
 
         return None
 
+    def animation_interval(self) -> Optional[float]:
+        # "Next screen in N..." countdown
+        return 0.25 if self.state.round_result_visible else None
+
     def draw(self, screen: pygame.Surface):
         draw_background(screen)
 
-        score_txt = f"SCORE: {self.state.p1_wins} - {self.state.p2_wins}"
-        draw_panel(screen, TOPBAR, f"GAME | {score_txt}", self.font_b)
+        # Static title as cached art, digits from the glyph atlas
+        draw_panel(screen, TOPBAR, self.TITLE, self.font_b)
+        draw_text(
+            screen,
+            self.font_b,
+            f"{self.state.match.p1_wins} - {self.state.match.p2_wins}",
+            (245, 245, 255),
+            topleft=(TOPBAR[0] + 16 + self.title_w, TOPBAR[1] + 12),
+        )
         draw_panel(screen, CENTER_CARD, "ROCK · PAPER · SCISSORS", self.font_b)
 
         cc = pygame.Rect(CENTER_CARD)
-        mouse = pygame.mouse.get_pos()
-        self.btn_forfeit.draw(screen, self.font_b, mouse)
+        self.btn_forfeit.draw(screen, self.font_b)
 
-        is_local_timeout = (
-            pygame.time.get_ticks() - self.state.last_server_contact > 5000
-        )
+        is_local_timeout = self.state.link_stale
 
         if self.reconnect_wait or is_local_timeout:
             overlay = pygame.Surface((cc.width, cc.height), pygame.SRCALPHA)
@@ -847,8 +804,7 @@ class GameScene:
             draw_round_result(
                 screen,
                 CENTER_CARD,
-                self.state.last_round,
-                self.font_xl,
+                round_result_view(self.state, self.font_xl, self.font_b),
                 self.font_b,
                 self.state,
             )
@@ -866,7 +822,7 @@ class GameScene:
         else:
             for b in (self.move_r, self.move_p, self.move_s):
                 b.enabled = True
-                b.draw(screen, self.font_move, self.font, mouse)
+                b.draw(screen, self.font_move, self.font)
 
         draw_toast(screen, TOPBAR, self.font, self.state)
         draw_debug(screen, self.font, self.state, W, H)
@@ -886,25 +842,30 @@ class AfterMatchScene:
         self.btn_rematch = HUDButton(pygame.Rect(x, y, w, 48), "REMATCH")
         self.btn_exit = HUDButton(pygame.Rect(x, y + 60, w, 48), "EXIT TO MENU")
 
-    def _send(self, type_desc: str, *params: str):
+        self.hits = HitIndex((self.btn_rematch, self.btn_exit))
+
+    def _send(self, type_desc: str, *params: str) -> bool:
         try:
-            self.client.send(type_desc, *params)
-            log_tx(self.state, type_desc, *params)
+            return send_request(self.client, self.state, type_desc, *params)
         except Exception as ex:
             log_err(self.state, f"Send failed: {ex}")
+            return False
 
     def handle_event(self, e: pygame.event.Event):
         if self.state.waiting_for_rematch:
             if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-                if self.btn_exit.hit(e.pos):
+                hit = self.hits.at(e.pos)
+                if hit is self.btn_exit:
                     self._send("REQ_LEAVE_LOBBY")
             return
 
         if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-            if self.btn_rematch.hit(e.pos):
-                self._send("REQ_REMATCH")
-                self.state.waiting_for_rematch = True
-            elif self.btn_exit.hit(e.pos):
+            hit = self.hits.at(e.pos)
+            if hit is self.btn_rematch:
+                # Wait only for a rematch request that actually went out
+                if self._send("REQ_REMATCH"):
+                    self.state.waiting_for_rematch = True
+            elif hit is self.btn_exit:
                 self._send("REQ_LEAVE_LOBBY")
 
     def on_message(self, msg: Message) -> Optional[SceneId]:
@@ -920,9 +881,7 @@ class AfterMatchScene:
         if msg.type_desc == "RES_GAME_STARTED":
             self.state.last_move = ""
             self.state.waiting_for_opponent = False
-            self.state.last_round = ""
-            self.state.round_result_visible = False
-            self.state.round_result_ttl = 0.0
+            hide_round_result(self.state)
             self.state.waiting_for_rematch = False
 
             toast(self.state, "Rematch started!", 2.5)
@@ -950,6 +909,9 @@ class AfterMatchScene:
 
         return None
 
+    def animation_interval(self) -> Optional[float]:
+        return None
+
     def draw(self, screen: pygame.Surface) -> None:
         draw_background(screen)
 
@@ -957,43 +919,18 @@ class AfterMatchScene:
         draw_panel(screen, CENTER_CARD, "MATCH SUMMARY", self.font_b)
         draw_panel(screen, BOTTOM_HINT, "INFO", self.font_b)
 
-        cc = pygame.Rect(CENTER_CARD)
-        mouse = pygame.mouse.get_pos()
-
-        w_id = self.state.last_match_winner_id
-        s1 = self.state.last_match_p1wins
-        s2 = self.state.last_match_p2wins
-
-        # Identity logic
-        try:
-            my_id = int(self.state.user_id)
-        except:
-            my_id = -1
-
-        is_me_winner = w_id == my_id and w_id != 0
-        title_text = "VICTORY!" if is_me_winner else "DEFEAT"
-        title_color = (100, 255, 100) if is_me_winner else (255, 100, 100)
-
-        if w_id == 0:
-            title_text = "IT'S A DRAW"
-            title_color = (255, 255, 150)
-
-        title = self.font_xl.render(title_text, True, title_color)
-        screen.blit(title, title.get_rect(center=(cc.centerx, cc.y + 60)))
-
-        score_txt = f"{self.state.p1_name}: {s1}  —  {self.state.p2_name}: {s2}"
-        score = self.font_b.render(score_txt, True, (200, 200, 220))
-        screen.blit(score, score.get_rect(center=(cc.centerx, cc.y + 110)))
+        view = match_result_view(self.state, self.font_xl, self.font_b)
+        screen.blits(view.blits, doreturn=False)
 
-        w_name = winner_label(self.state, str(w_id))
-        w_final_text = f"Grand Winner: {w_name}" if w_id != 0 else "Result: Tie"
-        winner = self.font_b.render(w_final_text, True, (255, 255, 255))
-        screen.blit(winner, winner.get_rect(center=(cc.centerx, cc.y + 150)))
+        if self.state.history is not None:
+            draw_panel(screen, SIDE_CARD, "HISTORY", self.font_b)
+            stats = history_view(self.state, self.font, self.font_b)
+            screen.blits(stats.blits, doreturn=False)
 
         self.btn_rematch.enabled = not self.state.waiting_for_rematch
-        self.btn_rematch.draw(screen, self.font_b, mouse)
+        self.btn_rematch.draw(screen, self.font_b)
         self.btn_exit.enabled = True
-        self.btn_exit.draw(screen, self.font_b, mouse)
+        self.btn_exit.draw(screen, self.font_b)
 
         if self.state.waiting_for_rematch:
             hint = self.font_b.render("Waiting for opponent…", True, (180, 180, 200))
@@ -0,0 +1,500 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from queue import Empty
+from typing import Dict, List, Optional, Sequence
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+import main as client_main  # noqa: E402
+from clock import ScaledClock  # noqa: E402
+from metrics import FRAME_SECONDS, INBOX_DEPTH  # noqa: E402
+from network import TcpLineClient  # noqa: E402
+from pending import EXPECTED  # noqa: E402
+from state import AppState, SceneId  # noqa: E402
+
+# =============================
+# Soak test
+# =============================
+#
+# Runs the real client loop (main.main) headless against mock_server.py
+# through many login -> lobby -> match -> rematch -> leave -> logout cycles.
+# The player clicks/types into the scenes' own widgets via posted pygame
+# events; the opponent is a bare TcpLineClient. Every --sample-every cycles
+# the traced heap, RSS, inbox depth, mean frame time and log length are
+# sampled; a least-squares slope per cycle over the samples after warm-up
+# must stay under the configured limits. Warm-up lasts --warmup cycles and
+# until the in-app log ring is full: the ring filling up is bounded, not
+# growth.
+#
+# Frame time is too noisy for a fixed ms/cycle limit: on a stable build the
+# fitted slope wanders around zero by more than any limit small enough to
+# catch a real regression. So frame time fails only when its trend is both
+# significant (slope over FRAME_SLOPE_SIGMAS standard errors, i.e. not
+# explained by the spread of the samples) and material (the fitted line
+# rises by more than --max-frame-growth of the mean over the sampled span).
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOBBY = "soak"
+PLAYER = "soaker"
+OPPONENT = "soak-bot"
+
+FRAME_SLOPE_SIGMAS = 3.0
+
+
+@dataclass
+class Sample:
+    cycle: int
+    elapsed_s: float
+    heap_bytes: int
+    rss_bytes: int
+    inbox_depth: int
+    frame_ms: float
+    log_lines: int
+
+
+def slope(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Least-squares slope of ys over xs (0 for fewer than two points)."""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mx = sum(xs) / n
+    my = sum(ys) / n
+    var = sum((x - mx) ** 2 for x in xs)
+    if var == 0:
+        return 0.0
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+def slope_stderr(xs: Sequence[float], ys: Sequence[float], k: float) -> float:
+    """Standard error of slope `k` fitted to ys over xs (inf below 3 points)."""
+    n = len(xs)
+    mx = sum(xs) / n if n else 0.0
+    var = sum((x - mx) ** 2 for x in xs)
+    if n < 3 or var == 0:
+        return float("inf")
+    b = sum(ys) / n - k * mx
+    resid = sum((y - (b + k * x)) ** 2 for x, y in zip(xs, ys))
+    return (resid / (n - 2) / var) ** 0.5
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # Peak, not current, outside Linux (kB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def start_mock_server(
+    wins: int, ping_interval: float
+) -> "tuple[subprocess.Popen, int]":
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(HERE, "mock_server.py"),
+            "--port",
+            "0",
+            "--wins",
+            str(wins),
+            "--ping-interval",
+            str(ping_interval),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=HERE,
+    )
+    assert proc.stdout is not None
+    line = proc.stdout.readline()
+    if "listening on" not in line:
+        proc.kill()
+        raise RuntimeError(f"mock server did not start: {line!r}")
+    return proc, int(line.rsplit(":", 1)[1])
+
+
+class SoakDriver:
+    """on_frame hook for main.main: scripts the player, opponent and sampling."""
+
+    def __init__(self, args: argparse.Namespace, opponent: TcpLineClient):
+        self.args = args
+        self.opponent = opponent
+
+        self.cycle = 0
+        self.matches = 0  # finished matches in the current cycle
+        self.leaving = False
+        self.joined = False
+        self.failure = ""
+        self.done = False
+
+        self.samples: List[Sample] = []
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.final: Optional[tracemalloc.Snapshot] = None
+
+        self._t0 = time.monotonic()
+        self._progress_at = self._t0
+        self._prev_scene: Optional[SceneId] = None
+        self._acted_on: Optional[tuple] = None
+        self._named = False
+        self._lobby_typed = False
+        self._frames = (0.0, 0)
+
+    # --- hook ---
+
+    def __call__(self, state: AppState, scenes: Dict[SceneId, object]) -> None:
+        if self.done:
+            return
+        try:
+            self._opponent_step()
+            self._player_step(state, scenes)
+        except Exception as e:
+            self._finish(f"driver error: {e!r}")
+
+    def _finish(self, failure: str = "") -> None:
+        self.failure = self.failure or failure
+        self.done = True
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    # --- opponent ---
+
+    def _opponent_step(self) -> None:
+        try:
+            err = self.opponent.errors.get_nowait()
+            raise RuntimeError(f"opponent: {err}")
+        except Empty:
+            pass
+        while True:
+            try:
+                msg = self.opponent.inbox.get_nowait()
+            except Empty:
+                return
+            if msg.type_desc == "RES_GAME_STARTED":
+                self.opponent.send("REQ_MOVE", "S")
+            elif msg.type_desc == "RES_PING" and msg.params:
+                self.opponent.send("REQ_PONG", msg.params[0])
+
+    # --- player ---
+
+    def _click(self, rect: pygame.Rect) -> None:
+        pygame.event.post(
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=rect.center, button=1)
+        )
+
+    def _type(self, rect: pygame.Rect, text: str) -> None:
+        self._click(rect)
+        for ch in text:
+            pygame.event.post(
+                pygame.event.Event(
+                    pygame.KEYDOWN, key=ord(ch), unicode=ch, mod=0, scancode=0
+                )
+            )
+
+    def _player_step(self, state: AppState, scenes: Dict[SceneId, object]) -> None:
+        now = time.monotonic()
+        if state.scene != self._prev_scene:
+            if state.scene == SceneId.AFTER_MATCH:
+                self.matches += 1
+            if state.scene == SceneId.CONNECT and self.leaving:
+                self._end_cycle(state)
+                if self.done:
+                    return
+            self._prev_scene = state.scene
+            self._progress_at = now
+        if now - self._progress_at > self.args.stall:
+            self._finish(
+                f"no progress for {self.args.stall:.0f}s in {state.scene.name}"
+                f" (cycle {self.cycle})"
+            )
+            return
+
+        # One action per distinct situation, and none while a request is open
+        if any(state.pending.in_flight(t) for t in EXPECTED):
+            return
+        situation = (
+            state.scene,
+            bool(state.username),
+            state.in_lobby,
+            state.in_game,
+            state.waiting_for_opponent,
+            state.round_result_visible,
+            state.waiting_for_rematch,
+            state.match.version,
+            self.matches,
+        )
+        if situation == self._acted_on:
+            return
+        if self._act(state, scenes):
+            self._acted_on = situation
+            self._progress_at = now
+
+    def _act(self, state: AppState, scenes: Dict[SceneId, object]) -> bool:
+        scene = scenes[state.scene]
+
+        if state.scene == SceneId.CONNECT:
+            if state.username:
+                return False
+            if not self._named:
+                self._type(scene.inp_name.rect, PLAYER)
+                self._named = True
+            self._click(scene.btn_connect.rect)
+            return True
+
+        if state.scene == SceneId.LOBBY:
+            if self.leaving and not state.in_lobby:
+                self._click(scene.btn_logout.rect)
+                return True
+            if not state.in_lobby:
+                if not self._lobby_typed:
+                    self._type(scene.inp_lobby.rect, LOBBY)
+                    self._lobby_typed = True
+                self._click(scene.btn_create.rect)
+                return True
+            if not self.joined:
+                self.opponent.send("REQ_JOIN_LOBBY", LOBBY)
+                self.joined = True
+                return True
+            return False
+
+        if state.scene == SceneId.GAME:
+            if (
+                state.waiting_for_opponent
+                or state.round_result_visible
+                or scene.reconnect_wait
+            ):
+                return False
+            pygame.event.post(
+                pygame.event.Event(
+                    pygame.KEYDOWN, key=pygame.K_r, unicode="r", mod=0, scancode=0
+                )
+            )
+            return True
+
+        if state.scene == SceneId.AFTER_MATCH:
+            if state.waiting_for_rematch:
+                return False
+            if self.matches < 2:
+                self._click(scene.btn_rematch.rect)
+                self.opponent.send("REQ_REMATCH")
+            else:
+                self._click(scene.btn_exit.rect)
+                self.leaving = True
+            return True
+
+        return False
+
+    # --- sampling ---
+
+    def _end_cycle(self, state: AppState) -> None:
+        self.cycle += 1
+        self.matches = 0
+        self.leaving = False
+        self.joined = False
+        self._acted_on = None
+
+        # Cyclic garbage (closures, tracebacks) is not growth
+        gc.collect()
+        if (
+            self.baseline is None
+            and self.cycle >= self.args.warmup
+            and state.log.total >= state.log.capacity
+        ):
+            self.baseline = tracemalloc.take_snapshot()
+        if self.baseline is not None and self.cycle % self.args.sample_every == 0:
+            self._sample(state)
+        if self.cycle >= self.args.cycles:
+            self.final = tracemalloc.take_snapshot()
+            self._finish()
+
+    def _sample(self, state: AppState) -> None:
+        frames = FRAME_SECONDS.labels()
+        total, count = frames.sum - self._frames[0], frames.count - self._frames[1]
+        self._frames = (frames.sum, frames.count)
+
+        s = Sample(
+            cycle=self.cycle,
+            elapsed_s=time.monotonic() - self._t0,
+            heap_bytes=tracemalloc.get_traced_memory()[0],
+            rss_bytes=rss_bytes(),
+            inbox_depth=int(INBOX_DEPTH.labels().value),
+            frame_ms=1000 * total / count if count else 0.0,
+            log_lines=len(state.log),
+        )
+        self.samples.append(s)
+        if not self.args.quiet:
+            print(
+                f"cycle {s.cycle:6d}  {s.elapsed_s:7.1f}s"
+                f"  heap {s.heap_bytes / 1024:9.1f} KiB"
+                f"  rss {s.rss_bytes / 2**20:7.1f} MiB"
+                f"  inbox {s.inbox_depth:3d}"
+                f"  frame {s.frame_ms:6.2f} ms"
+                f"  log {s.log_lines}",
+                file=sys.stderr,
+                flush=True,
+            )
+
+
+def check(samples: List[Sample], args: argparse.Namespace) -> List[str]:
+    """Limit violations as human-readable strings (empty = pass)."""
+    if len(samples) < 3:
+        return [f"only {len(samples)} samples; raise --cycles or lower --sample-every"]
+    xs = [s.cycle for s in samples]
+    limits = (
+        ("heap", [s.heap_bytes for s in samples], args.max_heap_slope, "B/cycle"),
+        ("rss", [s.rss_bytes for s in samples], args.max_rss_slope, "B/cycle"),
+        ("log", [s.log_lines for s in samples], args.max_log_slope, "lines/cycle"),
+    )
+    out = []
+    for name, ys, limit, unit in limits:
+        k = slope(xs, ys)
+        if k > limit:
+            out.append(f"{name} grows {k:.3f} {unit} (limit {limit})")
+
+    # Frame time: significant and material growth only (see header)
+    frames = [s.frame_ms for s in samples]
+    k = slope(xs, frames)
+    se = slope_stderr(xs, frames, k)
+    mean = sum(frames) / len(frames)
+    rise = k * (xs[-1] - xs[0]) / mean if mean > 0 else 0.0
+    sigmas = k / se if se else float("inf")
+    if sigmas > FRAME_SLOPE_SIGMAS and rise > args.max_frame_growth:
+        out.append(
+            f"frame time grows {k:.5f} ms/cycle (+{rise:.0%} over the run,"
+            f" {sigmas:.1f} standard errors; limit +{args.max_frame_growth:.0%})"
+        )
+    depth = max(s.inbox_depth for s in samples)
+    if depth > args.max_inbox:
+        out.append(f"inbox depth reached {depth} (limit {args.max_inbox})")
+    return out
+
+
+def top_growth(
+    base: tracemalloc.Snapshot, final: tracemalloc.Snapshot, n: int = 10
+) -> List[str]:
+    stats = final.compare_to(base, "lineno")
+    return [str(st) for st in stats[:n] if st.size_diff > 0]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        description="Soak the client through repeated match cycles and check growth"
+    )
+    ap.add_argument("--cycles", type=int, default=1000)
+    ap.add_argument(
+        "--warmup",
+        type=int,
+        default=20,
+        help="cycles before baseline (at least until the log ring is full)",
+    )
+    ap.add_argument("--sample-every", type=int, default=20, help="cycles per sample")
+    ap.add_argument(
+        "--time-scale",
+        type=float,
+        default=20.0,
+        help="client clock speed-up (round overlay, toasts, timeouts)",
+    )
+    ap.add_argument("--transport", default="low_latency")
+    ap.add_argument("--stall", type=float, default=15.0, help="fail after N s idle")
+    ap.add_argument("--max-heap-slope", type=float, default=64.0, help="B/cycle")
+    ap.add_argument("--max-rss-slope", type=float, default=8192.0, help="B/cycle")
+    ap.add_argument(
+        "--max-frame-growth",
+        type=float,
+        default=0.25,
+        help="fitted frame-time rise over the run, as a fraction of the mean",
+    )
+    ap.add_argument("--max-log-slope", type=float, default=float("inf"))
+    ap.add_argument("--max-inbox", type=int, default=64)
+    ap.add_argument("--report", help="write samples and verdict as JSON here")
+    ap.add_argument("--quiet", action="store_true", help="no per-sample lines")
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    server, port = start_mock_server(wins=1, ping_interval=0.5)
+    opponent = TcpLineClient("127.0.0.1", port, args.transport)
+    try:
+        opponent.connect()
+        opponent.send("REQ_LOGIN", OPPONENT)
+
+        tracemalloc.start()
+        driver = SoakDriver(args, opponent)
+
+        # The client echoes every log line to stdout; keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            client_main.main(
+                [
+                    "--server",
+                    f"127.0.0.1:{port}",
+                    "--transport",
+                    args.transport,
+                    # Scripted matches must not end up in the user's stats
+                    "--history",
+                    "off",
+                ],
+                clock=ScaledClock(args.time_scale),
+                on_frame=driver,
+            )
+        tracemalloc.stop()
+    finally:
+        opponent.close()
+        server.terminate()
+        server.wait()
+
+    if driver.failure:
+        problems = [driver.failure]
+    elif driver.baseline is None:
+        problems = [
+            f"warm-up not over after {driver.cycle} cycles (log ring not full yet);"
+            " raise --cycles"
+        ]
+    else:
+        problems = check(driver.samples, args)
+    growth: List[str] = []
+    if driver.baseline is not None and driver.final is not None:
+        growth = top_growth(driver.baseline, driver.final)
+
+    print(f"Soak: {driver.cycle} cycles, {len(driver.samples)} samples")
+    if growth:
+        print("Top heap growth since warm-up:")
+        for line in growth:
+            print("  " + line)
+    for p in problems:
+        print("FAIL " + p)
+    if not problems:
+        print("PASS")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(
+                {
+                    "cycles": driver.cycle,
+                    "samples": [asdict(s) for s in driver.samples],
+                    "growth": growth,
+                    "failures": problems,
+                },
+                f,
+                indent=2,
+            )
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
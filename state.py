@@ -1,8 +1,33 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar
 
+from console import DebugConsole
+from history import HistoryStore
+from log_buffer import LogBuffer
+from pending import PendingRequests
 from protocol import PROTOCOL_MAGIC, Message
+from store import MatchSnapshot
+from timers import TimerService
+
+V = TypeVar("V")
+
+
+class ViewModelCache:
+    """Last built view per kind, rebuilt only when its key changes."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Hashable, object]] = {}
+
+    def get(self, kind: str, key: Hashable, build: Callable[[], V]) -> V:
+        e = self._entries.get(kind)
+        if e is None or e[0] != key:
+            e = (key, build())
+            self._entries[kind] = e
+        return e[1]  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        self._entries.clear()
 
 
 class SceneId(Enum):
@@ -26,41 +51,98 @@ class AppState:
     waiting_for_opponent: bool = False
 
     # Synchronization + reconnect
-    p1_wins: int = 0
-    p2_wins: int = 0
     last_server_contact: float = 0.0
+    link_stale: bool = False
 
-    # Optional identity (server may provide via RES_STATE)
-    p1_id: int = 0
-    p2_id: int = 0
-    p1_name: str = ""
-    p2_name: str = ""
+    # Server-derived match facts (scores, ids, names, results); published
+    # from StateStore once per frame, read-only for scenes
+    match: MatchSnapshot = field(default_factory=MatchSnapshot)
 
     # Round overlay
     round_result_visible: bool = False
-    round_result_ttl: float = 0.0
-    last_round: str = ""
     last_match: str = ""
 
     # After-match
     waiting_for_rematch: bool = False
-    last_match_winner_id: int = 0
-    last_match_p1wins: int = 0
-    last_match_p2wins: int = 0
 
     # Deferred scene transition (e.g., show last round first, then go to AFTER_MATCH)
     pending_scene: Optional[SceneId] = None
 
     # Toast + debug
-    toast: str = "Welcome."
-    toast_ttl: float = 3.0
+    toast: str = ""
     debug_visible: bool = False
-    log: List[str] = field(default_factory=list)
+    log: LogBuffer = field(default_factory=LogBuffer, repr=False)
+
+    # Deadlines (toast, round overlay, watchdog, ...)
+    timers: TimerService = field(default_factory=TimerService, repr=False)
+
+    # Pre-rendered display objects (round result, match summary, ...)
+    views: ViewModelCache = field(default_factory=ViewModelCache, repr=False)
+
+    # Requests awaiting a response (dedupe, timeouts, RTT)
+    pending: PendingRequests = field(init=False, repr=False)
+
+    # Debug console view over `log` (scroll, filter, row cache)
+    console: DebugConsole = field(init=False, repr=False)
+
+    # Local match history (None = not recorded)
+    history: Optional[HistoryStore] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self.console = DebugConsole(self.log)
+        self.pending = PendingRequests(
+            self.timers, lambda type_desc: request_timed_out(self, type_desc)
+        )
+
+
+# Seconds of server silence before the game view shows "connection interrupted"
+LINK_STALE_S = 5.0
 
 
 def toast(state: AppState, msg: str, ttl: float = 3.0) -> None:
     state.toast = msg
-    state.toast_ttl = ttl
+
+    def _clear() -> None:
+        state.toast = ""
+
+    state.timers.schedule("toast", ttl, _clear)
+
+
+def request_timed_out(state: AppState, type_desc: str) -> None:
+    log_err(state, f"No response to {type_desc}.")
+    toast(state, "Server did not respond. Try again.", 3.0)
+
+
+def show_round_result(state: AppState, ttl: float = 2.8) -> None:
+    state.round_result_visible = True
+
+    def _done() -> None:
+        state.round_result_visible = False
+        if state.pending_scene is not None:
+            state.scene = state.pending_scene
+            state.pending_scene = None
+
+    state.timers.schedule("round_result", ttl, _done)
+
+
+def hide_round_result(state: AppState) -> None:
+    state.round_result_visible = False
+    state.timers.cancel("round_result")
+
+
+def note_server_contact(state: AppState, at: Optional[float] = None) -> None:
+    state.last_server_contact = state.timers.now() if at is None else at
+    state.link_stale = False
+
+    def _check() -> None:
+        silence = state.timers.now() - state.last_server_contact
+        if silence >= LINK_STALE_S:
+            state.link_stale = True
+        else:
+            state.timers.schedule("link_stale", LINK_STALE_S - silence, _check)
+
+    if not state.timers.pending("link_stale"):
+        state.timers.schedule("link_stale", LINK_STALE_S, _check)
 
 
 # Layout
@@ -69,6 +151,9 @@ M = 22
 TOPBAR = (M, M, W - 2 * M, 56)
 CENTER_CARD = ((W - 520) // 2, (H - 360) // 2, 520, 360)
 BOTTOM_HINT = (M, H - 90, W - 2 * M, 68)
+# Right of the center card (after-match history stats)
+_SIDE_X = CENTER_CARD[0] + CENTER_CARD[2] + 16
+SIDE_CARD = (_SIDE_X, CENTER_CARD[1], W - M - _SIDE_X, CENTER_CARD[3])
 
 # Filtered message types for console
 _SUPPRESS_WIRE = {"RES_PING", "REQ_PONG"}
@@ -0,0 +1,128 @@
+import dataclasses
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from protocol import Message
+
+# =============================
+# Match state store
+# =============================
+#
+# Server-derived match facts (scores, player ids/names, last round/match
+# result) are reduced from messages on the network thread into a back
+# buffer. The UI loop publishes it once per frame with swap(), so every
+# scene draws from one consistent, immutable snapshot. `version` grows on
+# every change: equal versions mean nothing server-side changed.
+
+
+@dataclass(frozen=True)
+class MatchSnapshot:
+    version: int = 0
+
+    p1_wins: int = 0
+    p2_wins: int = 0
+    p1_id: int = 0
+    p2_id: int = 0
+    p1_name: str = ""
+    p2_name: str = ""
+
+    # "winner|p1move|p2move" of the last round ("" = none yet)
+    last_round: str = ""
+
+    last_match_winner_id: int = 0
+    last_match_p1wins: int = 0
+    last_match_p2wins: int = 0
+
+
+def parse_state_params(params: List[str]) -> Dict[str, str]:
+    """RES_STATE payload "k=v;k=v;..." -> dict."""
+    out: Dict[str, str] = {}
+    if params:
+        for part in params[0].split(";"):
+            if "=" in part:
+                k, v = part.split("=", 1)
+                out[k.strip()] = v.strip()
+    return out
+
+
+def round_str(params: List[str]) -> str:
+    """RES_ROUND_RESULT params -> "winner|p1move|p2move"."""
+    if len(params) >= 5:
+        return f"{params[0]}|{params[1]}|{params[2]}"
+    return " | ".join(params)
+
+
+def reduce(snap: MatchSnapshot, msg: Message) -> Optional[MatchSnapshot]:
+    """New snapshot after `msg`, or None if it does not touch match facts."""
+    t, p = msg.type_desc, msg.params
+    changes: Dict[str, object] = {}
+
+    if t == "RES_STATE":
+        d = parse_state_params(p)
+        if "score" in d:
+            try:
+                s1, s2 = d["score"].split(":")
+                changes["p1_wins"], changes["p2_wins"] = int(s1), int(s2)
+            except ValueError:
+                pass
+        for key, attr in (("p1Id", "p1_id"), ("p2Id", "p2_id")):
+            if key in d:
+                try:
+                    changes[attr] = int(d[key])
+                except ValueError:
+                    pass
+        if "p1Name" in d:
+            changes["p1_name"] = d["p1Name"]
+        if "p2Name" in d:
+            changes["p2_name"] = d["p2Name"]
+
+    elif t == "RES_ROUND_RESULT":
+        if len(p) >= 5:
+            try:
+                changes["p1_wins"], changes["p2_wins"] = int(p[3]), int(p[4])
+            except ValueError:
+                pass
+        changes["last_round"] = round_str(p)
+
+    elif t == "RES_MATCH_RESULT":
+        try:
+            w, s1, s2 = int(p[0]), int(p[1]), int(p[2])
+        except (IndexError, ValueError):
+            w = s1 = s2 = 0
+        changes["last_match_winner_id"] = w
+        changes["last_match_p1wins"] = s1
+        changes["last_match_p2wins"] = s2
+
+    elif t == "RES_GAME_STARTED":
+        changes["last_round"] = ""
+
+    changes = {k: v for k, v in changes.items() if getattr(snap, k) != v}
+    if not changes:
+        return None
+    return dataclasses.replace(snap, version=snap.version + 1, **changes)
+
+
+class StateStore:
+    """Double buffer of MatchSnapshot: apply() on any thread, swap() per frame."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._back = MatchSnapshot()
+        self._front = self._back
+
+    @property
+    def front(self) -> MatchSnapshot:
+        return self._front
+
+    def apply(self, msg: Message) -> None:
+        with self._lock:
+            nxt = reduce(self._back, msg)
+            if nxt is not None:
+                self._back = nxt
+
+    def swap(self) -> MatchSnapshot:
+        """Publish the latest back buffer; returns the new front snapshot."""
+        with self._lock:
+            self._front = self._back
+        return self._front
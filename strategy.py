@@ -0,0 +1,193 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# =============================
+# Bot strategy engine
+# =============================
+#
+# Move choice for many bot players at once. Every bot is a slot in a set of
+# NumPy arrays; results are queued with observe(), moves with request(), and
+# tick() folds in the results and predicts every requested move in a few
+# array operations over all slots, not a Python loop per bot.
+#
+# Opponent models (each predicts the opponent's next move; the bot plays
+# what beats it):
+#   frequency  most common opponent move (decaying counts)
+#   markov     most likely opponent move after the last round's move pair
+#   pattern    longest recent opponent sequence seen before: what followed
+#   ensemble   per slot, whichever model above has scored best lately
+#   random     uniform
+# With probability `epsilon` a bot plays uniformly at random instead, so it
+# cannot be exploited deterministically.
+
+MOVES = "RPS"
+MODELS = ("random", "frequency", "markov", "pattern", "ensemble")
+
+# BEATS[m] = the move that beats m (P beats R, S beats P, R beats S)
+BEATS = np.array([1, 2, 0], dtype=np.int8)
+
+HISTORY_LEN = 32
+PATTERN_MAX = 4
+DECAY = 0.95
+EPSILON = 0.05
+
+# Columns of the per-model predictions (random, frequency, markov, pattern)
+_N_PREDICTORS = 4
+
+
+def move_index(move: str) -> int:
+    """R/P/S -> 0/1/2 (-1 if unknown)."""
+    m = move.strip().upper()
+    return MOVES.index(m) if m in ("R", "P", "S") else -1
+
+
+class StrategyEngine:
+    def __init__(self, capacity: int = 64, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self._size = 0
+        self._alloc(capacity)
+
+        # Queued until the next tick()
+        self._obs: List[Tuple[int, int, int]] = []
+        self._requests: List[int] = []
+
+    def _alloc(self, capacity: int) -> None:
+        old = self._size and {
+            k: getattr(self, k)
+            for k in ("model", "freq", "trans", "prev", "hist", "scores", "last")
+        }
+        self.capacity = capacity
+        self.model = np.zeros(capacity, dtype=np.int8)
+        self.freq = np.zeros((capacity, 3), dtype=np.float32)
+        # Markov: previous (my, opp) pair (9 states) -> opponent's next move
+        self.trans = np.zeros((capacity, 9, 3), dtype=np.float32)
+        self.prev = np.full(capacity, -1, dtype=np.int8)
+        # Opponent moves, newest last (-1 = none yet)
+        self.hist = np.full((capacity, HISTORY_LEN), -1, dtype=np.int8)
+        # Ensemble: decayed score of each predictor, and what each one played
+        self.scores = np.zeros((capacity, _N_PREDICTORS), dtype=np.float32)
+        self.last = np.full((capacity, _N_PREDICTORS), -1, dtype=np.int8)
+        if old:
+            for k, arr in old.items():
+                getattr(self, k)[: len(arr)] = arr
+
+    def add(self, model: str = "ensemble") -> int:
+        """New bot slot playing `model`; returns its slot id."""
+        if model not in MODELS:
+            raise ValueError(f"unknown strategy {model!r}")
+        if self._size == self.capacity:
+            self._alloc(self.capacity * 2)
+        slot = self._size
+        self._size += 1
+        self.model[slot] = MODELS.index(model)
+        return slot
+
+    # --- per-bot calls (cheap, queued) ---
+
+    def observe(self, slot: int, my_move: str, opp_move: str) -> None:
+        """Round result of `slot`: what it played and what the opponent played."""
+        my, opp = move_index(my_move), move_index(opp_move)
+        if my >= 0 and opp >= 0:
+            self._obs.append((slot, my, opp))
+
+    def request(self, slot: int) -> None:
+        """`slot` wants a move at the next tick()."""
+        self._requests.append(slot)
+
+    # --- batch ---
+
+    def tick(self, epsilon: float = EPSILON) -> Dict[int, str]:
+        """Apply queued results, then choose a move for every requested slot."""
+        if self._obs:
+            obs = np.array(self._obs, dtype=np.int64)
+            self._obs.clear()
+            self._observe_batch(obs[:, 0], obs[:, 1], obs[:, 2])
+        if not self._requests:
+            return {}
+        slots = np.unique(np.array(self._requests, dtype=np.int64))
+        self._requests.clear()
+        moves = self.choose(slots, epsilon)
+        return {int(s): MOVES[m] for s, m in zip(slots, moves)}
+
+    def _observe_batch(self, slots: np.ndarray, my: np.ndarray, opp: np.ndarray):
+        # A slot seen twice (two rounds between ticks) is applied in order
+        while len(slots):
+            _, first = np.unique(slots, return_index=True)
+            rest = np.ones(len(slots), dtype=bool)
+            rest[first] = False
+            self._observe_unique(slots[first], my[first], opp[first])
+            slots, my, opp = slots[rest], my[rest], opp[rest]
+
+    def _observe_unique(self, s: np.ndarray, my: np.ndarray, opp: np.ndarray):
+        # Ensemble: +1 for each predictor whose move would have won, -1 lost
+        last = self.last[s]
+        won = last == BEATS[opp][:, None]
+        lost = (last >= 0) & (BEATS[np.maximum(last, 0)] == opp[:, None])
+        self.scores[s] = self.scores[s] * DECAY + won - lost
+
+        self.freq[s] *= DECAY
+        self.freq[s, opp] += 1
+
+        p = self.prev[s]
+        known = p >= 0
+        ks, kp, ko = s[known], p[known], opp[known]
+        self.trans[ks, kp] *= DECAY
+        self.trans[ks, kp, ko] += 1
+        self.prev[s] = my * 3 + opp
+
+        self.hist[s, :-1] = self.hist[s, 1:]
+        self.hist[s, -1] = opp
+
+    def choose(self, slots: np.ndarray, epsilon: float = EPSILON) -> np.ndarray:
+        """Moves (0/1/2) for `slots`, all models evaluated as arrays."""
+        n = len(slots)
+        rand = self.rng.integers(0, 3, n).astype(np.int8)
+
+        preds = np.empty((n, _N_PREDICTORS), dtype=np.int8)
+        preds[:, 0] = rand
+        preds[:, 1] = self._predict_frequency(slots, rand)
+        preds[:, 2] = self._predict_markov(slots, rand)
+        preds[:, 3] = self._predict_pattern(slots, rand)
+        self.last[slots] = preds
+
+        model = self.model[slots]
+        ens = model == MODELS.index("ensemble")
+        col = np.where(ens, np.argmax(self.scores[slots], axis=1), model)
+        moves = preds[np.arange(n), col]
+
+        explore = self.rng.random(n) < epsilon
+        return np.where(explore, rand, moves)
+
+    def _predict_frequency(self, s: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+        f = self.freq[s]
+        seen = f.sum(axis=1) > 0
+        return np.where(seen, BEATS[np.argmax(f, axis=1)], fallback)
+
+    def _predict_markov(self, s: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+        p = self.prev[s]
+        rows = self.trans[s, np.maximum(p, 0)]
+        seen = (p >= 0) & (rows.sum(axis=1) > 0)
+        return np.where(seen, BEATS[np.argmax(rows, axis=1)], fallback)
+
+    def _predict_pattern(self, s: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+        # Moves as digits 1..3 (0 = empty); a run of k moves is one base-4
+        # number, so comparing runs is comparing ints
+        h = self.hist[s].astype(np.int16) + 1
+        n = len(s)
+        rows = np.arange(n)[:, None] * 4
+        pred = fallback.copy()
+        code = np.zeros_like(h[:, :1])
+        # Shorter matches first; a longer match found later overrides them
+        for k in range(1, PATTERN_MAX + 1):
+            # code[:, i] = the k moves ending at h[:, i + k - 1]
+            code = code[:, : h.shape[1] - k + 1] * 4 + h[:, k - 1 :]
+            suffix = code[:, -1:]
+            # Earlier runs equal to the last k moves, and the move after each
+            hit = (code[:, :-1] == suffix) & (h[:, -k] > 0)[:, None]
+            nxt = h[:, k:]
+            votes = np.bincount((rows + nxt)[hit], minlength=n * 4)
+            votes = votes.reshape(n, 4)[:, 1:]
+            found = votes.any(axis=1)
+            pred = np.where(found, BEATS[np.argmax(votes, axis=1)], pred)
+        return pred
@@ -0,0 +1,107 @@
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# =============================
+# Timer service
+# =============================
+
+
+class _Timer:
+    __slots__ = ("deadline", "seq", "callback", "repeat")
+
+    def __init__(
+        self,
+        deadline: float,
+        seq: int,
+        callback: Optional[Callable[[], None]],
+        repeat: Optional[float],
+    ):
+        self.deadline = deadline
+        self.seq = seq
+        self.callback = callback
+        self.repeat = repeat
+
+
+class TimerService:
+    """
+    Named one-shot / repeating deadlines kept in a min-heap.
+
+    Scheduling a key that is already pending replaces it; stale heap entries
+    are skipped lazily (and compacted when they pile up), so schedule and
+    cancel are O(log n) / O(1). Callbacks run on the thread calling run_due().
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: List[Tuple[float, int, str]] = []
+        self._active: Dict[str, _Timer] = {}
+        self._seq = itertools.count()
+
+    def now(self) -> float:
+        return self.clock()
+
+    def schedule(
+        self,
+        key: str,
+        delay: float,
+        callback: Optional[Callable[[], None]] = None,
+        repeat: Optional[float] = None,
+    ) -> None:
+        t = _Timer(self.clock() + max(0.0, delay), next(self._seq), callback, repeat)
+        self._active[key] = t
+        heapq.heappush(self._heap, (t.deadline, t.seq, key))
+        if len(self._heap) > 64 + 4 * len(self._active):
+            self._compact()
+
+    def cancel(self, key: str) -> None:
+        self._active.pop(key, None)
+
+    def pending(self, key: str) -> bool:
+        return key in self._active
+
+    def remaining(self, key: str) -> float:
+        t = self._active.get(key)
+        if t is None:
+            return 0.0
+        return max(0.0, t.deadline - self.clock())
+
+    def next_deadline(self) -> Optional[float]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def time_until_next(self) -> Optional[float]:
+        d = self.next_deadline()
+        if d is None:
+            return None
+        return max(0.0, d - self.clock())
+
+    def run_due(self) -> int:
+        """Fire every timer whose deadline has passed. Returns how many fired."""
+        now = self.clock()
+        fired = 0
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return fired
+
+            _, seq, key = heapq.heappop(self._heap)
+            t = self._active.pop(key)
+            if t.repeat is not None:
+                self.schedule(key, t.repeat, t.callback, t.repeat)
+            if t.callback is not None:
+                t.callback()
+            fired += 1
+
+    def _is_live(self, entry: Tuple[float, int, str]) -> bool:
+        t = self._active.get(entry[2])
+        return t is not None and t.seq == entry[1]
+
+    def _drop_stale(self) -> None:
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        self._heap = [e for e in self._heap if self._is_live(e)]
+        heapq.heapify(self._heap)
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from collections import deque
+from itertools import count
+from typing import Deque, Dict, List, Optional, Tuple
+
+# =============================
+# Latency tracing
+# =============================
+#
+# Spans across the network thread, the inbox, the scene handlers and
+# draw/present, exported as Chrome trace-event JSON (chrome://tracing,
+# ui.perfetto.dev). Off by default; every call site checks TRACER.on first,
+# so a disabled tracer costs one attribute read.
+#
+#   rx <TYPE>       network thread: message decoded and queued
+#   handle <TYPE>   UI thread: drained and handled (args: queued_ms)
+#   event <TYPE>    UI thread: input event handled; "send <REQ>" nests inside
+#                   when the handler writes to the socket
+#   draw, present   UI thread: the frame that shows the result
+#
+# A received message and an input event also open an async span
+# ("RES_ROUND_RESULT → display", "KEYDOWN → display") that ends when the
+# next frame is presented; rx → handle → present are linked by flow arrows.
+# Timestamps are time.monotonic(), the time base of --record.
+
+TRACE_MAX_EVENTS = 100_000
+
+# (ph, name, cat, ts_us, dur_us, tid, id, args)
+_Event = Tuple[str, str, str, float, float, int, int, Optional[dict]]
+
+
+def now_us() -> float:
+    return time.monotonic() * 1e6
+
+
+class Tracer:
+    def __init__(self, max_events: int = TRACE_MAX_EVENTS):
+        self.on = False
+        self.events: Deque[_Event] = deque(maxlen=max_events)
+        self._ids = count(1)
+        self._threads: Dict[int, str] = {}
+        # id(Message) -> (flow id, type, queued at); filled on the network thread
+        self._rx: Dict[int, Tuple[int, str, float]] = {}
+        # Async spans that end at the next present: (flow id, name, is_rx)
+        self._to_present: List[Tuple[int, str, bool]] = []
+
+    # --- control ---
+
+    def start(self) -> None:
+        self.events.clear()
+        self._rx.clear()
+        self._to_present.clear()
+        self.on = True
+
+    def stop(self) -> None:
+        self.on = False
+
+    def _add(
+        self,
+        ph: str,
+        name: str,
+        cat: str,
+        ts: float,
+        dur: float = 0.0,
+        id_: int = 0,
+        args: Optional[dict] = None,
+    ) -> None:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self.events.append((ph, name, cat, ts, dur, tid, id_, args))
+
+    # --- spans ---
+
+    def complete(
+        self, name: str, cat: str, t0: float, args: Optional[dict] = None
+    ) -> None:
+        self._add("X", name, cat, t0, now_us() - t0, args=args)
+
+    # --- network → display ---
+
+    def rx(self, msg, t0: float) -> None:
+        """Network thread, before `msg` is queued; `t0` = decode start."""
+        fid = next(self._ids)
+        now = now_us()
+        name = msg.type_desc
+        self._rx[id(msg)] = (fid, name, now)
+        self._add("X", f"rx {name}", "net", t0, now - t0)
+        self._add("s", "rx→display", "flow", t0, id_=fid)
+        self._add("b", f"{name} → display", "latency", t0, id_=fid)
+
+    def handled(self, msg, t0: float) -> None:
+        """UI thread, after `msg` was drained (at `t0`) and handled."""
+        entry = self._rx.pop(id(msg), None)
+        if entry is None:
+            # Received before tracing was switched on
+            self.complete(f"handle {msg.type_desc}", "ui", t0)
+            return
+        fid, name, queued = entry
+        self._add("t", "rx→display", "flow", t0, id_=fid)
+        self.complete(
+            f"handle {name}", "ui", t0, {"queued_ms": round((t0 - queued) / 1e3, 3)}
+        )
+        self._to_present.append((fid, name, True))
+
+    # --- input → display ---
+
+    def input(self, name: str, t0: float) -> None:
+        """UI thread, after input event `name` (handled since `t0`)."""
+        fid = next(self._ids)
+        self.complete(f"event {name}", "input", t0)
+        self._add("b", f"{name} → display", "latency", t0, id_=fid)
+        self._to_present.append((fid, name, False))
+
+    def presented(self, t0: float) -> None:
+        """UI thread, right after the frame presented since `t0` is on screen."""
+        now = now_us()
+        self._add("X", "present", "ui", t0, now - t0)
+        for fid, name, is_rx in self._to_present:
+            if is_rx:
+                self._add("f", "rx→display", "flow", t0, id_=fid)
+            self._add("e", f"{name} → display", "latency", now, id_=fid)
+        self._to_present.clear()
+
+    # --- export ---
+
+    def dump(self, path: str) -> int:
+        """Write the Chrome trace-event JSON; returns the number of events."""
+        out: List[dict] = [
+            {
+                "ph": "M",
+                "name": "thread_name",
+                "pid": 1,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._threads.items())
+        ]
+        for ph, name, cat, ts, dur, tid, id_, args in list(self.events):
+            ev = {"ph": ph, "name": name, "cat": cat, "ts": ts, "pid": 1, "tid": tid}
+            if ph == "X":
+                ev["dur"] = dur
+            elif ph in ("b", "e"):
+                ev["id"] = id_
+            elif ph in ("s", "t", "f"):
+                ev["id"] = id_
+                ev["bp"] = "e"
+            if args:
+                ev["args"] = args
+            out.append(ev)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+        return len(out) - len(self._threads)
+
+
+TRACER = Tracer()
@@ -2,6 +2,8 @@ from typing import Tuple
 
 import pygame
 
+from glyphs import draw_text
+
 # =============================
 # UI components
 # =============================
@@ -49,14 +51,13 @@ class HUDButton:
         self.rect = rect
         self.label = label
         self.enabled = True
+        self.hover = False  # set by input_router.HoverTracker
 
     def hit(self, pos: Tuple[int, int]) -> bool:
         return self.enabled and self.rect.collidepoint(pos)
 
-    def draw(
-        self, surf: pygame.Surface, font: pygame.font.Font, mouse: Tuple[int, int]
-    ) -> None:
-        hover = self.enabled and self.rect.collidepoint(mouse)
+    def draw(self, surf: pygame.Surface, font: pygame.font.Font) -> None:
+        hover = self.enabled and self.hover
         base = (55, 55, 70) if self.enabled else (35, 35, 45)
         if hover:
             base = (75, 75, 95)
@@ -78,6 +79,7 @@ class MoveButton:
         self.move = move
         self.title = title
         self.enabled = True
+        self.hover = False  # set by input_router.HoverTracker
 
     def hit(self, pos: Tuple[int, int]) -> bool:
         return self.enabled and self.rect.collidepoint(pos)
@@ -87,9 +89,8 @@ class MoveButton:
         surf: pygame.Surface,
         font_big: pygame.font.Font,
         font: pygame.font.Font,
-        mouse: Tuple[int, int],
     ) -> None:
-        hover = self.enabled and self.rect.collidepoint(mouse)
+        hover = self.enabled and self.hover
 
         bg = (26, 26, 34) if self.enabled else (18, 18, 22)
         edge = (160, 160, 190) if hover else (110, 110, 135)
@@ -105,8 +106,7 @@ class MoveButton:
         pygame.draw.circle(surf, (18, 18, 22), (cx, cy), r + 1)
         pygame.draw.circle(surf, edge, (cx, cy), r, width=2)
 
-        letter = font_big.render(self.move, True, (245, 245, 255))
-        surf.blit(letter, letter.get_rect(center=(cx, cy)))
+        draw_text(surf, font_big, self.move, (245, 245, 255), center=(cx, cy))
 
         title = font.render(
             self.title, True, (235, 235, 245) if self.enabled else (160, 160, 175)
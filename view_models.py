@@ -0,0 +1,310 @@
+from dataclasses import dataclass
+from typing import Hashable, Optional, Tuple
+
+import pygame
+
+from state import AppState
+
+# =============================
+# Label helpers
+# =============================
+
+
+def move_letter_to_name(letter: str) -> str:
+    l = (letter or "").strip().upper()
+    if l == "R":
+        return "Rock"
+    if l == "P":
+        return "Paper"
+    if l == "S":
+        return "Scissors"
+    return ""
+
+
+def safe_first_char(s: Optional[str], fallback: str = "?") -> str:
+    if not s:
+        return fallback
+    return s[0]
+
+
+def winner_label(state: AppState, winner_id_str: str) -> str:
+    """
+    Map winner id (string) to a UI label.
+    If server provided p1Id/p2Id + names, show name; else show raw id.
+    """
+    try:
+        wid = int(winner_id_str)
+    except Exception:
+        return winner_id_str or "?"
+
+    if wid == 0:
+        return "Draw"
+
+    # Prefer names if available
+    m = state.match
+    if m.p1_id == wid and m.p1_name:
+        return m.p1_name
+    if m.p2_id == wid and m.p2_name:
+        return m.p2_name
+
+    # If id matches none (or names missing), fall back to id
+    return str(wid)
+
+
+def opponent_name(state: AppState) -> str:
+    """Name of the other player in the current match ("" if unknown)."""
+    try:
+        my_id = int(state.user_id)
+    except ValueError:
+        return ""
+    m = state.match
+    if m.p1_id == my_id:
+        return m.p2_name or f"#{m.p2_id}"
+    if m.p2_id == my_id:
+        return m.p1_name or f"#{m.p1_id}"
+    return ""
+
+
+def player_label(state: AppState, idx: int) -> str:
+    """
+    idx: 1 or 2
+    """
+    if idx == 1:
+        return state.match.p1_name or "P1"
+    if idx == 2:
+        return state.match.p2_name or "P2"
+    return "P?"
+
+
+# =============================
+# View models
+# =============================
+#
+# Immutable, pre-rendered display objects. Draw code only blits them; they
+# are rebuilt (via AppState.views) when and only when their key changes.
+
+Blit = Tuple[pygame.Surface, Tuple[int, int]]
+
+
+def _centered(surf: pygame.Surface, center: Tuple[int, int]) -> Blit:
+    return surf, surf.get_rect(center=center).topleft
+
+
+@dataclass(frozen=True)
+class RoundResultView:
+    winner_id: int
+    blits: Tuple[Blit, ...]
+
+    @staticmethod
+    def key(state: AppState) -> Hashable:
+        return (
+            state.match.last_round,
+            state.match.p1_id,
+            state.match.p2_id,
+            state.match.p1_name,
+            state.match.p2_name,
+        )
+
+    @staticmethod
+    def build(
+        state: AppState,
+        rect_data: Tuple[int, int, int, int],
+        font_xl: pygame.font.Font,
+        font_b: pygame.font.Font,
+    ) -> "RoundResultView":
+        rect = pygame.Rect(rect_data)
+
+        parts = state.match.last_round.split("|")
+        winner_id = parts[0].strip() if len(parts) >= 1 else "?"
+        p1m = parts[1].strip() if len(parts) >= 2 else "-"
+        p2m = parts[2].strip() if len(parts) >= 3 else "-"
+
+        try:
+            wid = int(winner_id)
+        except ValueError:
+            wid = -1
+
+        if wid == 0:
+            winner_text = "It's a Draw!"
+            winner_color = (255, 255, 150)
+        else:
+            winner_text = f"Winner: {winner_label(state, winner_id)}"
+            winner_color = (100, 255, 100)
+
+        mid_y = rect.centery + 20
+        left_x = rect.x + rect.width // 4
+        right_x = rect.x + 3 * rect.width // 4
+
+        def side_color(pid: int) -> Tuple[int, int, int]:
+            return (100, 255, 100) if wid == pid and wid != 0 else (200, 200, 200)
+
+        white = (255, 255, 255)
+        muted = (150, 150, 170)
+        blits = (
+            _centered(
+                font_b.render("ROUND RESULT", True, (245, 245, 255)),
+                (rect.centerx, rect.y + 40),
+            ),
+            _centered(
+                font_b.render(winner_text, True, winner_color),
+                (rect.centerx, rect.y + 85),
+            ),
+            # Left (P1)
+            _centered(
+                font_b.render(
+                    player_label(state, 1), True, side_color(state.match.p1_id)
+                ),
+                (left_x, rect.y + 115),
+            ),
+            _centered(
+                font_xl.render(safe_first_char(p1m), True, white), (left_x, mid_y)
+            ),
+            _centered(
+                font_b.render(move_letter_to_name(p1m) or (p1m or "-"), True, muted),
+                (left_x, mid_y + 45),
+            ),
+            # Right (P2)
+            _centered(
+                font_b.render(
+                    player_label(state, 2), True, side_color(state.match.p2_id)
+                ),
+                (right_x, rect.y + 115),
+            ),
+            _centered(
+                font_xl.render(safe_first_char(p2m), True, white), (right_x, mid_y)
+            ),
+            _centered(
+                font_b.render(move_letter_to_name(p2m) or (p2m or "-"), True, muted),
+                (right_x, mid_y + 45),
+            ),
+        )
+        return RoundResultView(winner_id=wid, blits=blits)
+
+
+@dataclass(frozen=True)
+class MatchResultView:
+    blits: Tuple[Blit, ...]
+
+    @staticmethod
+    def key(state: AppState) -> Hashable:
+        return (
+            state.match.last_match_winner_id,
+            state.match.last_match_p1wins,
+            state.match.last_match_p2wins,
+            state.user_id,
+            state.match.p1_id,
+            state.match.p2_id,
+            state.match.p1_name,
+            state.match.p2_name,
+        )
+
+    @staticmethod
+    def build(
+        state: AppState,
+        rect_data: Tuple[int, int, int, int],
+        font_xl: pygame.font.Font,
+        font_b: pygame.font.Font,
+    ) -> "MatchResultView":
+        cc = pygame.Rect(rect_data)
+
+        w_id = state.match.last_match_winner_id
+        s1 = state.match.last_match_p1wins
+        s2 = state.match.last_match_p2wins
+
+        # Identity logic
+        try:
+            my_id = int(state.user_id)
+        except ValueError:
+            my_id = -1
+
+        is_me_winner = w_id == my_id and w_id != 0
+        title_text = "VICTORY!" if is_me_winner else "DEFEAT"
+        title_color = (100, 255, 100) if is_me_winner else (255, 100, 100)
+
+        if w_id == 0:
+            title_text = "IT'S A DRAW"
+            title_color = (255, 255, 150)
+
+        score_txt = f"{state.match.p1_name}: {s1}  —  {state.match.p2_name}: {s2}"
+
+        w_name = winner_label(state, str(w_id))
+        w_final_text = f"Grand Winner: {w_name}" if w_id != 0 else "Result: Tie"
+
+        blits = (
+            _centered(
+                font_xl.render(title_text, True, title_color), (cc.centerx, cc.y + 60)
+            ),
+            _centered(
+                font_b.render(score_txt, True, (200, 200, 220)),
+                (cc.centerx, cc.y + 110),
+            ),
+            _centered(
+                font_b.render(w_final_text, True, (255, 255, 255)),
+                (cc.centerx, cc.y + 150),
+            ),
+        )
+        return MatchResultView(blits=blits)
+
+
+def _streak_label(streak: int) -> str:
+    if streak > 0:
+        return f"W{streak}"
+    if streak < 0:
+        return f"L{-streak}"
+    return "-"
+
+
+@dataclass(frozen=True)
+class HistoryView:
+    blits: Tuple[Blit, ...]
+
+    @staticmethod
+    def key(state: AppState) -> Hashable:
+        h = state.history
+        version, dropped = (h.version, h.dropped) if h is not None else (-1, 0)
+        return (version, dropped, state.username, opponent_name(state))
+
+    @staticmethod
+    def build(
+        state: AppState,
+        rect_data: Tuple[int, int, int, int],
+        font: pygame.font.Font,
+        font_b: pygame.font.Font,
+    ) -> "HistoryView":
+        rect = pygame.Rect(rect_data)
+        if state.history is None:
+            return HistoryView(blits=())
+
+        me = state.username
+        opponent = opponent_name(state)
+        sections = [("All opponents", state.history.totals(me))]
+        if opponent:
+            sections.insert(0, (f"vs {opponent}", state.history.totals(me, opponent)))
+
+        white = (245, 245, 255)
+        muted = (170, 170, 190)
+        blits = []
+        x = rect.x + 16
+        y = rect.y + 52
+        for title, t in sections:
+            blits.append((font_b.render(title, True, white), (x, y)))
+            y += 30
+            rows = (
+                ("Matches", f"{t.wins}-{t.losses}-{t.draws}  ({t.win_rate:.0%})"),
+                ("Rounds", f"{t.round_wins}/{t.rounds}  ({t.round_win_rate:.0%})"),
+                (
+                    "Streak",
+                    f"{_streak_label(t.streak)}"
+                    f"  (best {_streak_label(t.best_streak)})",
+                ),
+            )
+            for label, value in rows:
+                blits.append((font.render(label, True, muted), (x, y)))
+                blits.append((font.render(value, True, white), (x + 76, y)))
+                y += 22
+            y += 18
+        # Failed writes: the totals above are missing these rows
+        if state.history.dropped:
+            warn = f"{state.history.dropped} row(s) not saved"
+            blits.append((font.render(warn, True, (255, 100, 100)), (x, y)))
+        return HistoryView(blits=tuple(blits))